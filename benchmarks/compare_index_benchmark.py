@@ -0,0 +1,161 @@
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+from io import StringIO
+from typing import List, Dict, Any, Tuple, Callable
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scripts"))
+from index_table import IndexTable
+from compare_index import SOPIndexComparator, check_duplicate_identifiers
+
+COLUMNS = ["Name", "Identifier", "Template version", "Topic", "Type", "GDI Node", "Instance version", "Nº steps", "Last modified"]
+
+def parse_args() -> Any:
+    """
+    Parses command-line arguments.
+
+    :return: Parsed arguments.
+    """
+    parser = argparse.ArgumentParser(description="Benchmarks the comparison of index tables (compare_index.py) against the previous pandas implementation, on a synthetic index")
+    parser.add_argument("-n", "--rows", type=int, default=10000, help="Number of rows of the synthetic index (default: 10000)")
+    parser.add_argument("--changed", type=float, default=0.01, help="Fraction of rows with differing values in the new index (default: 0.01)")
+    parser.add_argument("--repeat", type=int, default=3, help="Number of runs of each implementation; the best one is reported (default: 3)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the synthetic index (default: 0)")
+    return parser.parse_args()
+
+def generate_rows(n_rows: int, changed: float, seed: int = 0) -> Tuple[List[Dict], List[Dict]]:
+    """
+    Generates the rows of a synthetic existing index (node instances of SOPs), and the ones of a new index with some
+    differing values, one row less and one more.
+
+    :param n_rows: Number of rows.
+    :param changed: Fraction of rows with differing values in the new index.
+    :param seed: Seed of the random generator.
+    :return: Rows of the existing and the new index.
+    """
+    generator = random.Random(seed)
+    topics = ["Helpdesk & operations", "Data & metadata management", "Security", "Legal & compliance"]
+    existing_rows = []
+    for i in range(n_rows):
+        identifier = f"GDI-SOP{i:04d}" if i < 10000 else f"GDI-SOP{i:05d}"
+        existing_rows.append({
+            "Name": f"[{identifier}_synthetic-sop-{i}.md](./node-specific/{identifier}_synthetic-sop-{i}.md)",
+            "Identifier": identifier,
+            "Template version": f"v{generator.randint(1, 3)}",
+            "Topic": generator.choice(topics),
+            "Type": "Node-specific SOP",
+            "GDI Node": f"Node {generator.randint(1, 30)}",
+            "Instance version": f"v1.{generator.randint(0, 9)}",
+            "Nº steps": generator.randint(1, 20),
+            "Last modified": f"2024.{generator.randint(1, 12):02d}.{generator.randint(1, 28):02d}"
+        })
+
+    new_rows = [dict(row) for row in existing_rows[1:]]
+    for row in generator.sample(new_rows, int(len(new_rows) * changed)):
+        row["Nº steps"] += 1
+        row["Topic"] = generator.choice(topics)
+    new_rows.append(dict(existing_rows[0], Identifier="GDI-SOP99999"))
+    return existing_rows, new_rows
+
+def legacy_read_existing_index(file_path: str) -> "pandas.DataFrame":
+    """
+    Previous implementation of 'SOPIndexComparator.read_existing_index', based on pandas.
+    """
+    import pandas as pd
+    with open(file_path, 'r') as file:
+        lines = file.readlines()
+    start_index = 0
+    for i, line in enumerate(lines):
+        if line.strip().startswith('|'):
+            start_index = i
+            break
+    cleaned_lines = [line.strip().strip('|') for line in lines[start_index:]]
+    table_lines = [line for line in cleaned_lines if not set(line.strip()) <= {'-', ':', ' ', '|'}]
+    existing_index = pd.read_csv(StringIO('\n'.join(table_lines)), sep='|')
+    existing_index.columns = existing_index.columns.str.strip()
+    existing_index["Identifier"] = existing_index["Identifier"].str.strip()
+    return existing_index
+
+def legacy_compare_indexes(existing_index: "pandas.DataFrame", new_index: "pandas.DataFrame") -> Dict[str, Any]:
+    """
+    Previous implementation of 'SOPIndexComparator.compare_indexes', based on pandas (outer merge and 'iterrows').
+    """
+    results = {"num_existing_sops": len(existing_index), "num_new_sops": len(new_index), "differences": []}
+    if len(existing_index) != len(new_index):
+        results["differences"].append(f"Number of SOPs differs: existing ({len(existing_index)}), new ({len(new_index)})")
+    existing_index = existing_index.map(lambda x: x.strip() if isinstance(x, str) else x)
+    new_index = new_index.map(lambda x: x.strip() if isinstance(x, str) else x)
+    merged_index = existing_index.merge(new_index, on="Identifier", suffixes=('_existing', '_new'), how='outer', indicator=True)
+
+    differences = merged_index[merged_index['_merge'] != 'both']
+    for _, row in differences.iterrows():
+        message = "Missing from the new index table." if row['_merge'] == 'left_only' else "Missing from the existing index table."
+        results["differences"].append({"Identifier": row["Identifier"], "Differences": message})
+
+    common_rows = merged_index[merged_index['_merge'] == 'both']
+    for _, row in common_rows.iterrows():
+        diff = {"Identifier": row["Identifier"], "Differences": {}}
+        for col in existing_index.columns:
+            if col != "Identifier" and row[f"{col}_existing"] != row[f"{col}_new"]:
+                diff["Differences"][col] = {"existing": row[f"{col}_existing"], "new": row[f"{col}_new"]}
+        if diff["Differences"]:
+            results["differences"].append(diff)
+    return results
+
+def best_time(function: Callable[[], Any], repeat: int) -> Tuple[float, Any]:
+    """
+    Runs a function several times.
+
+    :return: Best time (in seconds) and the result of the last run.
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+def main():
+    """
+    Main function to run the benchmark.
+    """
+    args = parse_args()
+    existing_rows, new_rows = generate_rows(args.rows, args.changed, args.seed)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        existing_path = os.path.join(temp_dir, "README.md")
+        with open(existing_path, 'w') as file:
+            file.write("# Synthetic SOP Index\n" + IndexTable(COLUMNS, existing_rows).to_markdown())
+
+        comparator = SOPIndexComparator()
+
+        def compare() -> Dict[str, Any]:
+            new_index = IndexTable(COLUMNS, [dict(row) for row in new_rows])
+            check_duplicate_identifiers(new_index, "synthetic")
+            return comparator.compare_indexes(comparator.read_existing_index(existing_path), new_index)
+
+        seconds, results = best_time(compare, args.repeat)
+        print(f"Index of '{args.rows}' rows, '{len(results['differences'])}' differences")
+        print(f"- compare_index.py: {seconds:.3f}s")
+
+        try:
+            import pandas as pd
+        except ImportError:
+            print("- pandas implementation: skipped (pandas is not installed)")
+            return
+
+        def legacy_compare() -> Dict[str, Any]:
+            new_index = pd.DataFrame([dict(row) for row in new_rows], columns=COLUMNS)
+            return legacy_compare_indexes(legacy_read_existing_index(existing_path), new_index)
+
+        legacy_seconds, legacy_results = best_time(legacy_compare, args.repeat)
+        print(f"- pandas implementation: {legacy_seconds:.3f}s ({legacy_seconds / seconds:.1f}x slower)")
+        # Same results (regardless of numbers turned into floats by the outer merge)
+        if results != legacy_results:
+            raise ValueError("The results of both implementations differ")
+
+if __name__ == "__main__":
+    main()
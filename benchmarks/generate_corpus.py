@@ -0,0 +1,265 @@
+import os
+import re
+import sys
+import json
+import shutil
+import random
+import argparse
+from datetime import date, timedelta
+from typing import List, Dict, Any, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scripts"))
+from utils import load_sop, collect_sop_files
+
+REPOSITORY_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+TEMPLATE_PATH = os.path.join(REPOSITORY_ROOT, "tests", "GDI-SOP0000_sop-template-for-linting.md")
+CHARTER_PATH = os.path.join(REPOSITORY_ROOT, "docs", "GDI-SOP_charter.md")
+REPOSITORY_URL = "https://github.com/GenomicDataInfrastructure/standard-operating-procedures/blob/main"
+
+TOPICS = ["Data protection & security", "Data & metadata management", "Technical infrastructure & software development", "Helpdesk & operations"]
+NODES = ["SWE", "FIN", "LUX", "ESP", "NOR", "POR", "EST", "ITA", "NLD", "BEL"]
+PEOPLE = ["Bruce Wayne", "Diana Prince", "Clark Kent", "Selina Kyle", "Barbara Gordon", "Lucius Fox"]
+
+# Kinds of lint errors injected into the SOPs, and the (start of the) error message each of them causes
+LINT_ERRORS = {
+    "history-date": "Date is incorrectly formatted",
+    "missing-section": "Required section '### Scope' is missing",
+    "glossary-term": "Glossary mismatch",
+    "broken-link": "Unresolvable relative reference",
+    "metadata-topic": "At the metadata table, value column for 'topic' is invalid",
+    "step-numbering": "Step numbering error",
+}
+
+def parse_args() -> Any:
+    """
+    Parses command-line arguments.
+
+    :return: Parsed arguments.
+    """
+    parser = argparse.ArgumentParser(description="Generates a synthetic SOP corpus (European-level templates and their node-specific instances), based on the SOP template for linting and the real SOPs")
+    parser.add_argument("output", help="Directory of the corpus (a repository-like tree with 'sops/', 'docs/' and an empty '.git/'). Existing SOPs in it are removed")
+    parser.add_argument("-n", "--european", type=int, default=100, help="Number of European-level SOP templates (default: 100)")
+    parser.add_argument("-m", "--node-specific", type=int, default=100, help="Number of node-specific SOP instances of the templates (default: 100)")
+    parser.add_argument("--steps", type=int, default=4, help="Number of procedure steps of each SOP (default: 4)")
+    parser.add_argument("--table-rows", type=int, default=3, help="Number of rows of the Document History and step tables (default: 3)")
+    parser.add_argument("--glossary", type=int, default=8, help="Number of glossary terms of each SOP (default: 8)")
+    parser.add_argument("--links", type=int, default=4, help="Number of links to other SOPs in each SOP, half relative and half GitHub links (default: 4)")
+    parser.add_argument("--error-rate", type=float, default=0, help="Fraction of SOPs with an injected lint error (default: 0)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the random generator (default: 0)")
+    return parser.parse_args()
+
+def read_sections(file_path: str) -> Dict[str, str]:
+    """
+    Splits a markdown SOP into its '###' sections.
+
+    :param file_path: Path to the SOP file.
+    :return: Content of each section (without its header), by section title without numbering (e.g., 'Purpose').
+    """
+    sections = {}
+    title = None
+    with open(file_path, 'r') as file:
+        for line in file:
+            match = re.match(r'^###\s+(?:\d+\.\s*)?(.+?)\s*$', line)
+            if match:
+                title = match.group(1)
+                sections[title] = ""
+            elif title:
+                sections[title] += line
+    return sections
+
+def load_sources() -> Dict[str, Any]:
+    """
+    Loads the content the SOPs are generated from: the sections of the SOP template for linting, the prose of the
+    Purpose, Scope and Introduction sections of the real SOPs, and the glossary of the Charter.
+
+    :return: Sources, by name.
+    """
+    template_sections = read_sections(TEMPLATE_PATH)
+    prose = {"Purpose": [], "Scope": [], "Introduction and Background Information": []}
+    for file_path in sorted(collect_sop_files([os.path.join(REPOSITORY_ROOT, "sops")])):
+        for title, content in read_sections(file_path).items():
+            if title in prose and content.strip():
+                # Links are kept as plain text, since their targets are not part of the corpus
+                prose[title].append(re.sub(r'\[([^\]]*)\]\([^)]*\)', r'\1', content.strip()))
+    return {
+        "index": re.search(r'## Index\n.*?\n\n', open(TEMPLATE_PATH).read(), re.DOTALL).group(0),
+        "diagram": template_sections["Summary or Context Diagram"].strip(),
+        "prose": prose,
+        "glossary": sorted(load_sop(CHARTER_PATH).glossary.items())
+    }
+
+def generate_sop(sources: Dict[str, Any], generator: random.Random, identifier: int, file_name: str, node: str = None, steps: int = 4, table_rows: int = 3, glossary: int = 8, links: List[str] = (), error: str = None) -> str:
+    """
+    Generates the content of an SOP, with the structure of the SOP template for linting.
+
+    :param sources: Content the SOPs are generated from (see 'load_sources').
+    :param generator: Random generator.
+    :param identifier: SOP number (e.g., 3 for 'GDI-SOP0003').
+    :param file_name: Name of the SOP file, whose title has to match the one in the document.
+    :param node: GDI node of the node-specific instance (e.g., 'SWE').
+    :param steps: Number of procedure steps.
+    :param table_rows: Number of rows of the Document History and step tables.
+    :param glossary: Number of glossary terms.
+    :param links: Links to other SOPs.
+    :param error: Kind of lint error to inject (optional, see 'LINT_ERRORS').
+    :return: Markdown content of the SOP.
+    """
+    title = os.path.splitext(file_name)[0].split("_", 1)[1].replace("-", " ").capitalize()
+    lines = [f"# European GDI - {title}", ""]
+
+    # Metadata
+    lines += [
+        "| Metadata          | Value               |",
+        "|-------------------|---------------------|",
+        f"| Template SOP number  | ``GDI-SOP{identifier:04d}`` |",
+        f"| Template SOP version | ``v1`` |",
+        f"| Topic                | {'Synthetic topic' if error == 'metadata-topic' else generator.choice(TOPICS)} |",
+        f"| Template SOP Type    | {'Node-specific SOP' if node else 'European-level SOP'} |",
+        f"| GDI Node             | {node or ''} |",
+        f"| Instance version     | {f'``v{table_rows}``' if node else ''} |",
+        "", sources["index"].rstrip(), ""
+    ]
+
+    # Document History, most recent first
+    lines += [
+        "### 1. Document History", "",
+        "| Template Version | Instance version | Author(s) | Description of changes       | Date       |",
+        "|---------|-----------|-----------|------------------------------|------------|",
+    ]
+    day = date(2024, 12, 1) - timedelta(days=generator.randint(0, 720))
+    for row in range(table_rows):
+        template_version = "v1" if node else f"v1.{table_rows - row - 1}"
+        instance_version = f"``v{table_rows - row}``" if node else ""
+        date_str = day.strftime("%Y-%m-%d" if error == "history-date" and row == 0 else "%Y.%m.%d")
+        lines.append(f"| ``{template_version}`` | {instance_version} | {generator.choice(PEOPLE)} | Synthetic change {table_rows - row} | ``{date_str}`` |")
+        day -= timedelta(days=generator.randint(1, 60))
+    lines.append("")
+
+    # Glossary, with terms of the Charter
+    lines += [
+        "### 2. Glossary",
+        f"Find GDI SOPs common Glossary at the [**charter document**]({REPOSITORY_URL}/docs/GDI-SOP_charter.md).", "",
+        "| Abbreviation | Description                                         |",
+        "|--------------|-----------------------------------------------------|",
+    ]
+    terms = generator.sample(sources["glossary"], min(glossary, len(sources["glossary"])))
+    if error == "glossary-term":
+        terms[-1] = (f"SYNTH{identifier}", "Synthetic term missing from the Charter")
+    lines += [f"| {term} | {description} |" for term, description in sorted(terms)]
+    lines.append("")
+
+    # Roles and Responsibilities
+    lines += [
+        "### 3. Roles and Responsibilities", "",
+        "| Role       | Full name       | GDI/node role   | Organisation |",
+        "|------------|-----------------|-----------------|--------------|",
+    ]
+    lines += [f"| {role} | {generator.choice(PEOPLE)} |  |  |" for role in ["Author", "Reviewer", "Approver", "Authorizer"]]
+    lines.append("")
+
+    # Prose sections, taken from the real SOPs
+    for number, section in [(4, "Purpose"), (5, "Scope"), (6, "Introduction and Background Information")]:
+        if error == "missing-section" and section == "Scope":
+            continue
+        lines += [f"### {number}. {section}", generator.choice(sources["prose"][section]), ""]
+    lines += ["### 7. Summary or Context Diagram", sources["diagram"], ""]
+
+    # Procedure steps, each with its step table and links to other SOPs
+    lines.append("### 8. Procedure")
+    step_links = list(links) + (["../missing/GDI-SOP9999_missing.md"] if error == "broken-link" else [])
+    for step in range(1, steps + 1):
+        number = step + 1 if error == "step-numbering" and step == steps else step
+        lines += [
+            f"#### 8.{number}. < Synthetic step {number} >",
+            "| Step identifier            | When             | Who |",
+            "|:------------------|:----|:----|",
+        ]
+        lines += [f"| {number if row == 0 else f'{number}.{row}'} | After step {max(number - 1, 1)} is finished | The {generator.choice(PEOPLE)} team |" for row in range(table_rows)]
+        lines.append("")
+        step_link = step_links[step - 1::steps] if step_links else []
+        references = ", ".join(f"[GDI-SOP reference {i}]({link})" for i, link in enumerate(step_link, 1))
+        lines += [f"Carry out step {number} following the checklist{f' (see {references})' if references else ''}:", "- It is ...", "- It contains ...", ""]
+
+    # References
+    lines += [
+        "### 9. References",
+        "| Reference | Description                                          |",
+        "|-----------|------------------------------------------------------|",
+        "| [1](#)    | European GDI - SOP Charter (including Glossary)      |",
+        "| [2](#)    | European GDI - Procedures for Information Service Management (ISM) for SOPs |",
+    ]
+    return "\n".join(lines) + "\n"
+
+def generate_corpus(output: str, n_european: int, n_node_specific: int, steps: int = 4, table_rows: int = 3,
+                    glossary: int = 8, links: int = 4, error_rate: float = 0, seed: int = 0) -> List[Dict]:
+    """
+    Generates a synthetic SOP corpus in a repository-like tree: European-level templates at 'sops/european-level/', node-specific
+    instances of them at 'sops/node-specific/', the Charter at 'docs/', and an empty '.git/' so that it's taken as a repository root.
+    As the node-specific SOP of the repository, each instance has its own SOP number as 'Template SOP number' (the index table
+    is keyed by it), so the template it's an instance of is only recorded in the manifest, 'corpus.json', along with the injected lint errors.
+
+    :param output: Directory of the corpus.
+    :param n_european: Number of European-level SOP templates.
+    :param n_node_specific: Number of node-specific SOP instances of the templates.
+    :param steps: Number of procedure steps of each SOP.
+    :param table_rows: Number of rows of the Document History and step tables.
+    :param glossary: Number of glossary terms of each SOP.
+    :param links: Number of links to other SOPs in each SOP, half relative and half GitHub links.
+    :param error_rate: Fraction of SOPs with an injected lint error.
+    :param seed: Seed of the random generator.
+    :return: Manifest of the SOPs, as {'file': ..., 'identifier': ..., 'template': ..., 'node': ..., 'error': ...}.
+    """
+    if n_european + n_node_specific > 10000:
+        raise ValueError("SOP identifiers have 4 digits, so a corpus can't have more than 10000 SOPs")
+    if n_node_specific and not n_european:
+        raise ValueError("Node-specific SOP instances require at least one European-level SOP template")
+
+    generator = random.Random(seed)
+    sources = load_sources()
+    for directory in ["sops/european-level", "sops/node-specific"]:
+        shutil.rmtree(os.path.join(output, directory), ignore_errors=True)
+        os.makedirs(os.path.join(output, directory))
+    os.makedirs(os.path.join(output, "docs"), exist_ok=True)
+    os.makedirs(os.path.join(output, ".git"), exist_ok=True)
+    shutil.copy(CHARTER_PATH, os.path.join(output, "docs"))
+
+    sops: List[Tuple[int, str, Dict]] = []
+    for identifier in range(n_european):
+        sops.append((identifier, f"sops/european-level/GDI-SOP{identifier:04d}_synthetic-procedure-{identifier}.md", {}))
+    for i in range(n_node_specific):
+        identifier = n_european + i
+        node = NODES[i % len(NODES)]
+        sops.append((identifier, f"sops/node-specific/GDI-SOP{identifier:04d}_synthetic-procedure-{identifier}-{node.lower()}.md",
+                     {"template": f"GDI-SOP{generator.randrange(n_european):04d}", "node": node}))
+
+    manifest = []
+    for identifier, relative_path, instance in sops:
+        targets = [generator.choice(sops)[1] for _ in range(links)]
+        # Relative links from the folder of the SOP, and GitHub links (resolved against the corpus as a local checkout)
+        sop_links = [
+            os.path.relpath(target, os.path.dirname(relative_path)) if i % 2 == 0 else f"{REPOSITORY_URL}/{target}"
+            for i, target in enumerate(targets)
+        ]
+        error = generator.choice(sorted(LINT_ERRORS)) if generator.random() < error_rate else None
+        content = generate_sop(sources, generator, identifier, os.path.basename(relative_path), steps=steps, table_rows=table_rows,
+                               glossary=glossary, links=sop_links, node=instance.get("node"), error=error)
+        with open(os.path.join(output, relative_path), 'w') as file:
+            file.write(content)
+        manifest.append(dict({"file": relative_path, "identifier": f"GDI-SOP{identifier:04d}", "error": error}, **instance))
+
+    with open(os.path.join(output, "corpus.json"), 'w') as file:
+        json.dump({"seed": seed, "steps": steps, "table_rows": table_rows, "glossary": glossary, "links": links, "sops": manifest}, file, indent=2)
+    return manifest
+
+def main():
+    """
+    Main function to generate a synthetic SOP corpus.
+    """
+    args = parse_args()
+    manifest = generate_corpus(args.output, args.european, args.node_specific, steps=args.steps, table_rows=args.table_rows,
+                               glossary=args.glossary, links=args.links, error_rate=args.error_rate, seed=args.seed)
+    n_errors = sum(1 for sop in manifest if sop["error"])
+    print(f"Generated '{len(manifest)}' SOPs ('{n_errors}' with injected lint errors) at '{os.path.join(args.output, 'sops')}'")
+
+if __name__ == "__main__":
+    main()
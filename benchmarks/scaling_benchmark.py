@@ -0,0 +1,217 @@
+import os
+import sys
+import json
+import time
+import argparse
+import resource
+import tempfile
+import functools
+import subprocess
+from typing import List, Dict, Any, Callable
+
+SCRIPTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scripts")
+sys.path.insert(0, SCRIPTS_DIR)
+from generate_corpus import generate_corpus
+
+STAGES = ["lint", "index", "compare", "reviews"]
+
+def parse_args() -> Any:
+    """
+    Parses command-line arguments.
+
+    :return: Parsed arguments.
+    """
+    parser = argparse.ArgumentParser(description="Benchmarks how the SOP scripts scale (linter, index generation, index comparison and review check) on synthetic corpora of increasing size. "
+                                                 "Each stage runs in its own process, so that its peak memory and caches are not shared with the other stages")
+    parser.add_argument("--sizes", type=str, default="10,100,1000,10000", help="Comma-separated numbers of SOPs of the corpora (default: 10,100,1000,10000)")
+    parser.add_argument("--stages", type=str, default=",".join(STAGES), help=f"Comma-separated stages to benchmark (default: {','.join(STAGES)})")
+    parser.add_argument("--node-specific", type=float, default=0.5, help="Fraction of node-specific SOP instances in each corpus, the rest being European-level templates (default: 0.5)")
+    parser.add_argument("--steps", type=int, default=4, help="Number of procedure steps of each SOP (default: 4)")
+    parser.add_argument("--table-rows", type=int, default=3, help="Number of rows of the Document History and step tables (default: 3)")
+    parser.add_argument("--glossary", type=int, default=8, help="Number of glossary terms of each SOP (default: 8)")
+    parser.add_argument("--links", type=int, default=4, help="Number of links to other SOPs in each SOP (default: 4)")
+    parser.add_argument("--error-rate", type=float, default=0.05, help="Fraction of SOPs with an injected lint error (default: 0.05)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the synthetic corpora (default: 0)")
+    parser.add_argument("-o", "--output", type=str, help="Path to write the results as JSON, e.g., to compare them with the ones of a previous run (optional)")
+    # Internal: runs a single stage on an already generated corpus, and prints its measurements as JSON
+    parser.add_argument("--run-stage", choices=STAGES, help=argparse.SUPPRESS)
+    parser.add_argument("--corpus", type=str, help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+def timed(function: Callable, latencies: List[float]) -> Callable:
+    """
+    Wraps a function to record the duration (in seconds) of each call.
+
+    :param function: Function to wrap.
+    :param latencies: List the duration of each call is appended to.
+    :return: Wrapped function.
+    """
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            latencies.append(time.perf_counter() - start)
+    return wrapper
+
+def percentile(values: List[float], q: float) -> float:
+    """
+    Computes a percentile of some values (nearest-rank method).
+
+    :param values: Values.
+    :param q: Percentile, from 0 to 100.
+    :return: Percentile of the values (None if there are no values).
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, min(len(ordered) - 1, int(round(q / 100 * len(ordered) + 0.5)) - 1))]
+
+def peak_rss_mb() -> float:
+    """
+    Gets the peak resident set size of the current process.
+
+    :return: Peak RSS, in MB.
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Reported in bytes on macOS, and in kilobytes elsewhere
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def run_stage(stage: str, corpus: str) -> Dict[str, Any]:
+    """
+    Runs a stage on a corpus, timing it as a whole and each of its files.
+
+    :param stage: Stage to run (see 'STAGES').
+    :param corpus: Directory of the corpus (see 'generate_corpus').
+    :return: Measurements of the stage.
+    """
+    from utils import collect_sop_files
+    sop_dir = os.path.join(corpus, "sops")
+    sop_files = collect_sop_files([sop_dir])
+    latencies = []
+    details = {}
+
+    if stage == "lint":
+        import sop_linter
+        # Sequential and offline: GitHub links to the corpus are resolved against it as a local checkout
+        args = sop_linter.add_arguments(argparse.ArgumentParser()).parse_args([sop_dir, "--jobs", "1", "--links-offline"])
+        sop_linter.SOPLinter.lint_sop = timed(sop_linter.SOPLinter.lint_sop, latencies)
+        run = lambda: sop_linter.run_linter(args)
+    elif stage == "index":
+        from sop_index import SOPIndexGenerator
+        SOPIndexGenerator.get_row = timed(SOPIndexGenerator.get_row, latencies)
+        run = lambda: SOPIndexGenerator().parse_all_sops(sop_files)
+    elif stage == "compare":
+        import compare_index
+        from sop_index import SOPIndexGenerator
+        # The existing index was written beforehand (see 'write_existing_index'), so the comparison covers reading it,
+        #   generating the new index (timed per file) and comparing both
+        args = compare_index.add_arguments(argparse.ArgumentParser()).parse_args([os.path.join(corpus, "README.md"), sop_dir])
+        SOPIndexGenerator.get_row = timed(SOPIndexGenerator.get_row, latencies)
+        compare_latencies = []
+        compare_index.SOPIndexComparator.compare_indexes = timed(compare_index.SOPIndexComparator.compare_indexes, compare_latencies)
+        run = lambda: (compare_index.run_comparison(args), details.update(compare_indexes_seconds=compare_latencies[0]))
+    elif stage == "reviews":
+        import check_sop_reviews
+        args = check_sop_reviews.add_arguments(argparse.ArgumentParser()).parse_args([sop_dir])
+        # Malformed dates stop the review check, so the SOPs with that injected error are left out
+        with open(os.path.join(corpus, "corpus.json"), 'r') as file:
+            bad_dates = {os.path.join(corpus, sop["file"]) for sop in json.load(file)["sops"] if sop["error"] == "history-date"}
+        sop_files = [sop_file for sop_file in sop_files if os.path.join(corpus, os.path.relpath(sop_file, corpus)) not in bad_dates]
+        check_sop_reviews.process_sop_file = timed(check_sop_reviews.process_sop_file, latencies)
+        run = lambda: check_sop_reviews.generate_report(sop_files, args, {})
+    else:
+        raise ValueError(f"Unknown stage '{stage}'. Valid stages are: {STAGES}")
+
+    start_rss = peak_rss_mb()
+    start = time.perf_counter()
+    run()
+    seconds = time.perf_counter() - start
+
+    return dict({
+        "stage": stage,
+        "n_files": len(sop_files),
+        "seconds": seconds,
+        "files_per_second": len(sop_files) / seconds if seconds else None,
+        "p50_ms": percentile(latencies, 50) * 1000 if latencies else None,
+        "p90_ms": percentile(latencies, 90) * 1000 if latencies else None,
+        "p99_ms": percentile(latencies, 99) * 1000 if latencies else None,
+        # The rest of the time is spent in the work that is not done per file (e.g., the corpus-level rules of the linter)
+        "per_file_seconds": sum(latencies),
+        "start_rss_mb": start_rss,
+        "peak_rss_mb": peak_rss_mb()
+    }, **details)
+
+def write_existing_index(corpus: str):
+    """
+    Writes the index table of a corpus to 'README.md', as the existing index of the 'compare' stage.
+    It's generated by 'sop_index.py' in its own process, to not count its memory in the stages.
+
+    :param corpus: Directory of the corpus.
+    """
+    index_path = os.path.join(corpus, "README.md")
+    if os.path.exists(index_path):
+        os.remove(index_path)
+    subprocess.run([sys.executable, os.path.join(SCRIPTS_DIR, "sop_index.py"), os.path.join(corpus, "sops"), "-o", index_path], check=True)
+
+def benchmark_stage(stage: str, corpus: str) -> Dict[str, Any]:
+    """
+    Runs a stage on a corpus in its own process (see 'run_stage').
+
+    :param stage: Stage to run.
+    :param corpus: Directory of the corpus.
+    :return: Measurements of the stage.
+    """
+    process = subprocess.run([sys.executable, os.path.abspath(__file__), "--run-stage", stage, "--corpus", corpus],
+                             capture_output=True, text=True)
+    if process.returncode != 0:
+        raise ValueError(f"Stage '{stage}' failed on the corpus at '{corpus}':\n{process.stderr}")
+    # Scripts may print on their own, so the measurements are the last line of the output
+    return json.loads(process.stdout.strip().splitlines()[-1])
+
+def format_value(value: Any, pattern: str) -> str:
+    """
+    Formats a measurement, or '-' if it's missing.
+    """
+    return "-" if value is None else pattern.format(value)
+
+def main():
+    """
+    Main function to run the benchmark.
+    """
+    args = parse_args()
+    if args.run_stage:
+        print(json.dumps(run_stage(args.run_stage, args.corpus)))
+        return
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    stages = args.stages.split(",")
+    for stage in stages:
+        if stage not in STAGES:
+            raise ValueError(f"Unknown stage '{stage}'. Valid stages are: {STAGES}")
+
+    results = []
+    print(f"{'SOPs':>6} {'stage':<8} {'total':>9} {'files/s':>9} {'p50':>9} {'p90':>9} {'p99':>9} {'peak RSS':>9}")
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as corpus:
+            n_node_specific = int(size * args.node_specific) if size > 1 else 0
+            generate_corpus(corpus, size - n_node_specific, n_node_specific, steps=args.steps, table_rows=args.table_rows,
+                            glossary=args.glossary, links=args.links, error_rate=args.error_rate, seed=args.seed)
+            if "compare" in stages:
+                write_existing_index(corpus)
+
+            for stage in stages:
+                result = benchmark_stage(stage, corpus)
+                results.append(result)
+                print(f"{size:>6} {stage:<8} {result['seconds']:>8.3f}s {format_value(result['files_per_second'], '{:.1f}'):>9} "
+                      f"{format_value(result['p50_ms'], '{:.2f}ms'):>9} {format_value(result['p90_ms'], '{:.2f}ms'):>9} "
+                      f"{format_value(result['p99_ms'], '{:.2f}ms'):>9} {result['peak_rss_mb']:>7.1f}MB")
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump({"sizes": sizes, "seed": args.seed, "results": results}, file, indent=2)
+            file.write("\n")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+import os
+import subprocess
+from typing import List, Set, Callable
+from utils import ParsedSOP
+from link_checker import LocalRepositoryResolver
+
+def run_git(args: List[str], repo_root: str) -> str:
+    """
+    Runs a git command within a repository.
+
+    :param args: Arguments of the git command (e.g., ['diff', '--name-status']).
+    :param repo_root: Path to the repository root.
+    :return: Standard output of the command.
+    """
+    result = subprocess.run(['git'] + args, cwd=repo_root, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise ValueError(f"Git command 'git {' '.join(args)}' failed: {result.stderr.strip()}")
+    return result.stdout
+
+def get_changed_paths(git_ref: str, repo_root: str) -> Set[str]:
+    """
+    Gets the paths changed since the given git reference: committed, staged and unstaged changes, and untracked files.
+    Changes are taken from the merge base with the reference (i.e., like in a pull request). Both the old and the new
+    paths of renamed files are included.
+
+    :param git_ref: Git reference to compare with (e.g., 'origin/main').
+    :param repo_root: Path to the repository root.
+    :return: Absolute paths of the changed files.
+    """
+    try:
+        base = run_git(['merge-base', git_ref, 'HEAD'], repo_root).strip()
+    except ValueError:
+        base = git_ref  # e.g., unrelated histories
+
+    # Paths are NUL-separated and not quoted (e.g., with non-ASCII characters, as in 'GDI-SOP0003_1+mg-dac-...')
+    changed_paths = set()
+    fields = run_git(['diff', '--name-status', '-M', '-z', base], repo_root).split('\0')
+    i = 0
+    while i < len(fields) and fields[i]:
+        # e.g., 'M', 'path', or 'R095', 'old_path', 'new_path' for renames (and copies)
+        n_paths = 2 if fields[i][0] in 'RC' else 1
+        changed_paths.update(fields[i + 1:i + 1 + n_paths])
+        i += 1 + n_paths
+    changed_paths.update(run_git(['ls-files', '--others', '--exclude-standard', '-z'], repo_root).split('\0'))
+
+    return {os.path.normpath(os.path.join(repo_root, path)) for path in changed_paths if path}
+
+def get_sop_dependencies(file_path: str, sop: ParsedSOP, repo_root: str, local_resolver: LocalRepositoryResolver = None) -> Set[str]:
+    """
+    Gets the local files an SOP depends on, i.e., the files and images it links to (relative paths or
+    links to the local repository).
+
+    :param file_path: Path to the SOP file.
+    :param sop: ParsedSOP object of the SOP file.
+    :param repo_root: Path to the repository root.
+    :param local_resolver: Resolver of the links to the local repository (optional).
+    :return: Absolute paths of the files the SOP depends on.
+    """
+    dependencies = set()
+    for reference in sop.links + sop.image_paths:
+        relative_path = local_resolver.relative_path(reference) if local_resolver else None
+        if relative_path is not None:
+            dependencies.add(os.path.normpath(os.path.join(repo_root, relative_path)))
+        elif '://' not in reference and not reference.startswith(('#', 'mailto:')):
+            path_only = reference.split('#')[0].split('?')[0]
+            if not path_only:
+                continue
+            if path_only.startswith('/'):
+                dependencies.add(os.path.normpath(os.path.join(repo_root, path_only.lstrip('/'))))
+            else:
+                dependencies.add(os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(file_path)), path_only)))
+    return dependencies
+
+def select_affected_files(sop_files: List[str], changed_paths: Set[str], global_dependencies: List[str], get_sop: Callable[[str], ParsedSOP],
+                          repo_root: str, local_resolver: LocalRepositoryResolver = None) -> List[str]:
+    """
+    Selects the SOP files affected by the given changes: changed SOPs, SOPs depending on a changed (or renamed/removed)
+    file, or all of them if any of the global dependencies (e.g., the Charter) changed.
+
+    :param sop_files: List of all SOP files.
+    :param changed_paths: Absolute paths of the changed files.
+    :param global_dependencies: Paths of the files (or directories) all SOPs depend on (e.g., the Charter, or the linter itself).
+    :param get_sop: Function returning the ParsedSOP of an SOP file (e.g., from the parse cache).
+    :param repo_root: Path to the repository root.
+    :param local_resolver: Resolver of the links to the local repository (optional).
+    :return: Affected SOP files, in input order.
+    """
+    for dependency in global_dependencies:
+        dependency = os.path.abspath(dependency)
+        if any(path == dependency or path.startswith(dependency + os.sep) for path in changed_paths):
+            return list(sop_files)
+
+    affected_files = []
+    for file_path in sop_files:
+        if os.path.abspath(file_path) in changed_paths or get_sop_dependencies(file_path, get_sop(file_path), repo_root, local_resolver) & changed_paths:
+            affected_files.append(file_path)
+    return affected_files
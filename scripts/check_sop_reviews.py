@@ -1,13 +1,14 @@
 import os
 import re
+import time
 import argparse
-import requests
 import json
-from typing import List, Dict, Any
-import markdown
-from bs4 import BeautifulSoup
-from datetime import datetime
-from utils import find_tables, collect_sop_files, get_gh_issues
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import List, Dict, Any, Optional
+from datetime import datetime, timedelta
+from utils import collect_sop_files, load_sop, enable_parse_cache, read_first_table_row, ParsedSOP, DOCUMENT_HISTORY_HEADERS
+from gh_client import GitHubClient, ResponseCache, build_issue_index
 
 # GitHub authentication
 gh_token = os.getenv("GITHUB_TOKEN")
@@ -17,13 +18,22 @@ sop_id_regex = r"(GDI-SOP\d{4})"
 # Regular expression to match the date in the document history (YYYY.MM.DD)
 date_regex = r"\d{4}\.\d{2}\.\d{2}"
 
-def parse_args() -> Any:
+# Labels of the review issues
+review_labels = ["SOP-Review"]
+
+# Idempotency key of a review issue (SOP ID and due date, e.g., 'GDI-SOP0003:2025-01-01'), hidden in its body
+idempotency_key_regex = r"<!-- sop-review-key: (\S+) -->"
+
+# Disclaimer in the body of the review issues created by this script, which tells them apart from the ones created by hand
+created_by_script_text = "This GitHub issue was created automatically through the execution of `scripts/check_sop_reviews.py`"
+
+def add_arguments(parser: argparse.ArgumentParser) -> argparse.ArgumentParser:
     """
-    Parses command-line arguments.
+    Adds the command-line arguments of the review checker to a parser (e.g., the one of its subcommand in 'sop.py').
 
-    :return: Parsed arguments.
+    :param parser: Parser to add the arguments to.
+    :return: The same parser.
     """
-    parser = argparse.ArgumentParser(description="Checks if SOP files are due for review based on the dates in their Document History")
     parser.add_argument(
         "inputs", nargs="+", help="SOP file(s) or directories to check. Given directories will be explored, looking for markdown files following the SOP naming conventions"
     )
@@ -39,29 +49,64 @@ def parse_args() -> Any:
     parser.add_argument(
         "-v", "--verbosity", type=int, default=0, help="Verbosity level (0-2). 0 prints nothing; 1 prints the end report; 2 prints the report of each file at each step"
     )
-    return parser.parse_args()
+    parser.add_argument(
+        "--cache-dir", type=str, help="Directory of the on-disk parse cache (e.g., '.sop-cache'). If given, unchanged SOPs are not parsed again across runs"
+    )
+    parser.add_argument(
+        "--close-issues", action="store_true", help="Flag to close (with a comment) the open review issues of SOPs that are not due for review anymore (i.e., they were reviewed since)."
+    )
+    parser.add_argument(
+        "--dry-run", action="store_true", help="Print the plan of GH issues to create, update and close, without changing any of them. The 'GITHUB_TOKEN' environment variable is optional: without it, the open GH issues are not fetched"
+    )
+    parser.add_argument(
+        "--journal", type=str, help="Path to the journal of the applied GH issue changes (e.g., '.sop-review-journal.jsonl'). If given, a run that failed halfway can be repeated, skipping the changes that were already applied"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=2, help="Number of GH issue changes applied at the same time (default: 2). Writes are still spaced out to respect GitHub's rate limits"
+    )
+    parser.add_argument(
+        "--github-api-url", type=str, help="Base URL of the GitHub API (e.g., the one of 'gh_stub_server.py'). Default: 'GITHUB_API_URL' environment variable, or 'https://api.github.com'"
+    )
+    parser.add_argument(
+        "--gh-cache", type=str, help="Path to the on-disk cache of GitHub API responses (e.g., '.gh-cache.json'). If given, unchanged issue pages are revalidated with conditional requests, which do not count against the rate limit"
+    )
+    return parser
+
+def parse_args() -> Any:
+    """
+    Parses command-line arguments.
+
+    :return: Parsed arguments.
+    """
+    return add_arguments(argparse.ArgumentParser(description="Checks if SOP files are due for review based on the dates in their Document History")).parse_args()
 
 # Function to parse the "Document History" table and extract the last date
-def get_last_edit_date(soup: BeautifulSoup, sop_file: str) -> datetime:
+def get_last_edit_date(sop: ParsedSOP, sop_file: str) -> datetime:
     """
     Extracts the most recent date from the Document History table.
     
-    :param soup: BeautifulSoup object of the parsed SOP content.
+    :param sop: ParsedSOP object of the SOP file.
     :param sop_file: Filepath of the file being checked
     :return: Most recent date (datetime object) or None if no valid date is found.
     """
-    # Headers to match the Document History table
-    aim_headers = ["Template Version", "Instance Version", "Author(s)", "Description of changes", "Date"]
-    tables = find_tables(soup, aim_headers)
+    # Rows of the first Document History table found (assuming there's only one), matched by its headers
+    document_history_rows = sop.document_history_rows
 
-    if not tables:
+    if document_history_rows is None:
         raise ValueError(f"No Document History table was found (based on given headers) for file '{sop_file}'.")
 
-    document_history_table = tables[0]  # Use the first found table (assuming there's only one Document History table)
-    first_row = document_history_table.find_all('tr')[1:2][0] # Skip header row, and get first row, which should be the newest entry
-    columns = [col.text.strip() for col in first_row.find_all('td')]
-    if len(columns) != len(aim_headers):
-        raise ValueError(f"First row of the Document History table was found malformed (had '{len(columns)}' where it should have '{len(aim_headers)}') for file '{sop_file}'.")
+    return parse_document_history_date(document_history_rows[0], sop_file) # The first row (after the header) should be the newest entry
+
+def parse_document_history_date(columns: List[str], sop_file: str) -> datetime:
+    """
+    Validates a row of the Document History table and parses its date.
+
+    :param columns: Cell text of the row.
+    :param sop_file: Filepath of the file being checked
+    :return: Date of the row (datetime object).
+    """
+    if len(columns) != len(DOCUMENT_HISTORY_HEADERS):
+        raise ValueError(f"First row of the Document History table was found malformed (had '{len(columns)}' where it should have '{len(DOCUMENT_HISTORY_HEADERS)}') for file '{sop_file}'.")
 
     date_str = columns[4]  # The last column (5th) is expected to be the date
     if re.match(date_regex, date_str):
@@ -71,10 +116,28 @@ def get_last_edit_date(soup: BeautifulSoup, sop_file: str) -> datetime:
 
     return last_date
 
-def check_existing_github_issues(all_issues: List, sop_file: str, verbosity: int = 1) -> int:
+def read_last_edit_date(sop_file: str) -> datetime:
+    """
+    Reads the most recent date of the Document History table, reading the SOP file only up to the first row of the table
+    (see 'utils.read_first_table_row'). The whole SOP is only parsed (see 'get_last_edit_date') if the file can't be reliably
+    read that way, or if the row is missing or invalid, so that the same errors are raised.
+
+    :param sop_file: Filepath of the file being checked
+    :return: Most recent date (datetime object).
+    """
+    try:
+        columns = read_first_table_row(sop_file, DOCUMENT_HISTORY_HEADERS)
+        if columns is not None:
+            return parse_document_history_date(columns, sop_file)
+    except ValueError:  # Including 'MarkdownStructureError'
+        pass
+    return get_last_edit_date(load_sop(sop_file), sop_file)
+
+def check_existing_github_issues(issue_index: Dict[str, Dict], sop_file: str, verbosity: int = 1) -> int:
     """
     Checks if a GitHub issue already exists for the given SOP file.
 
+    :param issue_index: GitHub issues by the SOP ID in their titles (see 'gh_client.build_issue_index').
     :param sop_file: The SOP file to check.
     :return: The issue HTML URL if an existing issue is found, otherwise None.
     """
@@ -82,37 +145,74 @@ def check_existing_github_issues(all_issues: List, sop_file: str, verbosity: int
     # We extract the SOP ID from the filename (e.g., "GDI-SOP0003")
     sop_id = re.match(sop_id_regex, sop_name).group(1)
 
-    if not all_issues:
+    if not issue_index:
         if verbosity > 1:
             print(f"- Given GitHub issue list was empty. Check filtering parameters if it's not expected.")
         return None
 
-    for issue in all_issues:
-        # We have already filtered all issues by the labels, so the SOP ID in the title should do the trick
-        if sop_id in issue['title']: 
-            issue_url = issue['html_url']
-            if verbosity > 1:
-                print(f"-- Existing issue found for '{sop_file}', Issue URL: {issue_url}")
-            return issue_url
-    
+    # We have already filtered all issues by the labels, so the SOP ID in the title should do the trick
+    issue = issue_index.get(sop_id)
+    if issue:
+        issue_url = issue['html_url']
+        if verbosity > 1:
+            print(f"-- Existing issue found for '{sop_file}', Issue URL: {issue_url}")
+        return issue_url
+
     if verbosity > 1:
-        print(f"-- No existing issue was found for '{sop_id}' ('{sop_file}') in all '{len(all_issues)}' issues that were fetched.")
+        print(f"-- No existing issue was found for '{sop_id}' ('{sop_file}') in all '{len(issue_index)}' SOPs with issues that were fetched.")
     return None
 
-def create_github_issue(gh_repo: str, gh_token: str, sop_file: str, last_edit_date: datetime, days_review: int) -> int:
+def get_idempotency_key(sop_id: str, last_edit_date: datetime, days_review: int) -> str:
     """
-    Creates a GitHub issue for SOP review if it hasn't been reviewed in the last year.
-    
-    :param gh_repo: The GH repository where the new issue is created.
-    :param gh_token: GitHub token to authorize
+    Gets the idempotency key of the review issue of an SOP, made of its ID and due date. The key is kept in the body of
+    the issue, so that the same review is never requested twice (e.g., when retrying a failed run).
+
+    :param sop_id: The SOP ID (e.g., 'GDI-SOP0003').
+    :param last_edit_date: The last review date of the SOP.
+    :param days_review: The amount of days set as threshold for an SOP to have to go through review
+    :return: Idempotency key (e.g., 'GDI-SOP0003:2025-01-01').
+    """
+    return f"{sop_id}:{(last_edit_date + timedelta(days=days_review)).date()}"
+
+def get_issue_key(issue: Dict) -> Optional[str]:
+    """
+    Gets the idempotency key in the body of an issue, or None if it has none (e.g., issues created by hand).
+    """
+    match = re.search(idempotency_key_regex, issue.get('body') or '')
+    return match.group(1) if match else None
+
+def get_label_names(issue: Dict) -> List[str]:
+    """
+    Gets the names of the labels of an issue (given either as names or as label objects).
+    """
+    return [label["name"] if isinstance(label, dict) else label for label in issue.get("labels", [])]
+
+def is_created_by_script(issue: Dict) -> bool:
+    """
+    Checks if an issue was created by this script (i.e., it has an idempotency key or the disclaimer of its body),
+    and not by hand. Only the body of the issues created by this script is ever changed.
+    """
+    return get_issue_key(issue) is not None or created_by_script_text in (issue.get('body') or '')
+
+def set_issue_key(body: str, key: str) -> str:
+    """
+    Sets the idempotency key in the body of an issue, replacing the existing one if any.
+    """
+    marker = f"<!-- sop-review-key: {key} -->"
+    if re.search(idempotency_key_regex, body or ''):
+        return re.sub(idempotency_key_regex, marker, body)
+    return f"{body or ''}\n\n{marker}\n"
+
+def create_issue_payload(sop_file: str, last_edit_date: datetime, days_review: int, idempotency_key: str = None) -> Dict:
+    """
+    Creates the title, body and labels of the review issue of an SOP.
+
     :param sop_file: The SOP file being reviewed.
     :param last_edit_date: The last review date of the SOP.
     :param days_review: The amount of days set as threshold for an SOP to have to go through review
-    :return: The GitHub issue ID if the issue is created successfully, otherwise None.
+    :param idempotency_key: Idempotency key of the issue (optional, computed by default; see 'get_idempotency_key').
+    :return: Payload of the GitHub issue.
     """
-    url = f"https://api.github.com/repos/{gh_repo}/issues"
-    headers = {"Authorization": f"token {gh_token}"}
-    
     # Payload for the GitHub issue
     sop_name = os.path.basename(sop_file)
     # We extract the SOP ID from the filename (e.g., "GDI-SOP0003")
@@ -144,36 +244,27 @@ def create_github_issue(gh_repo: str, gh_token: str, sop_file: str, last_edit_da
         f"This will aid with the automatic review detection and help the maintainers know which SOPs were reviewed and by whom.\n\n"
         
         f"## Disclaimer\n"
-        f"This GitHub issue was created automatically through the execution of `scripts/check_sop_reviews.py`, likely triggered through the GitHub workflow `.github/workflows/review_reminder.yml`.\n\n"
+        f"{created_by_script_text}, likely triggered through the GitHub workflow `.github/workflows/review_reminder.yml`.\n\n"
         
         f"- To stop this behaviour, remove the automatic trigger (i.e., delete 'schedule' from the workflow file). **Only do so if you are sure** that this automatic review trigger is wrong.\n"
         f"- If this automatic trigger was a fluke, it may be due to the Document History of this SOP being malformed (e.g., recent entries being added at the bottom) "
         f"or other `SOP-review` GitHub issues not being named correctly (e.g., the SOP ID should appear in the title).\n"
     )
     
-    issue = {
+    return {
         "title": f"[SOP Review] Review due: '{sop_name}'",
-        "body": issue_body,
-        "labels": ["SOP-Review"]
+        "body": set_issue_key(issue_body, idempotency_key or get_idempotency_key(sop_id, last_edit_date, days_review)),
+        "labels": list(review_labels)
     }
-  
-    response = requests.post(url, json=issue, headers=headers)
-    
-    if response.status_code == 201:
-        issue_data = response.json()
-        issue_url = issue_data['html_url']
-        return issue_url
-    else:
-        print(f"Failed to create issue for '{sop_file}': {response.status_code}, {response.text}")
-        return None
 
-def process_sop_file(sop_file: str, args, all_issues: List[Dict]) -> Dict:
+def process_sop_file(sop_file: str, args, issue_index: Dict[str, Dict]) -> Dict:
     """
-    Processes a single SOP file, checks if it is due for review, and creates GitHub issues if necessary.
+    Processes a single SOP file, and checks if it is due for review and if it has a GitHub issue already.
+    Issues are created afterwards, once the changes of all files are planned (see 'plan_reconciliation').
 
     :param sop_file: Path to the SOP file being processed.
     :param args: Parsed command-line arguments.
-    :param all_issues: List of all open GitHub issues for comparison.
+    :param issue_index: All open GitHub issues for comparison, by SOP ID.
     :return: A dictionary with the status report for the processed SOP file.
     """
     individual_report = {
@@ -184,38 +275,27 @@ def process_sop_file(sop_file: str, args, all_issues: List[Dict]) -> Dict:
         "new_gh_issue": ""
     }
 
-    with open(sop_file, 'r') as f:
-        sop_content = f.read()
-
-    html_content = markdown.markdown(sop_content, extensions=['tables'])
-    soup = BeautifulSoup(html_content, 'html.parser')
-    last_edit_date = get_last_edit_date(soup, sop_file)
+    last_edit_date = read_last_edit_date(sop_file)
     individual_report["last_edit_date"] = str(last_edit_date)
 
     # If SOP is due for review
     if last_edit_date and (datetime.now() - last_edit_date).days > args.days_review:
         individual_report["due_review"] = True
-        existing_issue_url = check_existing_github_issues(all_issues, sop_file, args.verbosity)
-
-        if not existing_issue_url and args.create_issues:
-            issue_url = create_github_issue(
-                gh_repo=args.repository, gh_token=gh_token, sop_file=sop_file,
-                last_edit_date=last_edit_date, days_review=args.days_review
-            )
-            individual_report["new_gh_issue"] = issue_url
-        else:
+        existing_issue_url = check_existing_github_issues(issue_index, sop_file, args.verbosity)
+
+        if existing_issue_url or not args.create_issues:
             individual_report["existing_gh_issue"] = existing_issue_url
 
     return individual_report
 
 
-def generate_report(sop_files: List[str], args, all_issues: List[Dict]) -> Dict:
+def generate_report(sop_files: List[str], args, issue_index: Dict[str, Dict]) -> Dict:
     """
     Generates a report on all processed SOP files.
 
     :param sop_files: List of all SOP files to be processed.
     :param args: Parsed command-line arguments.
-    :param all_issues: List of all open GitHub issues for comparison.
+    :param issue_index: All open GitHub issues for comparison, by SOP ID.
     :return: A dictionary containing the final report.
     """
     report = {
@@ -231,7 +311,7 @@ def generate_report(sop_files: List[str], args, all_issues: List[Dict]) -> Dict:
         if args.verbosity > 1:
             print(f"- Checking input file '{sop_file}'")
 
-        individual_report = process_sop_file(sop_file, args, all_issues)
+        individual_report = process_sop_file(sop_file, args, issue_index)
         report["all_files"].append(individual_report)
 
         # Count due reviews and created issues
@@ -242,25 +322,290 @@ def generate_report(sop_files: List[str], args, all_issues: List[Dict]) -> Dict:
 
     return report
 
+def plan_reconciliation(report: Dict, issue_index: Dict[str, Dict], args) -> List[Dict]:
+    """
+    Plans the changes of the GitHub issues, so that every SOP due for review has its issue and no other SOP does:
+    - 'create': The SOP is due for review and has no issue (with '--create-issues').
+    - 'relabel': The SOP is due for review and has an issue without the review labels (e.g., created by hand), which are
+      added to it (with '--create-issues').
+    - 'rekey': The SOP is due for review and has an issue created by this script, without the idempotency key of its
+      current due date (e.g., created before the last review). The key in its body is updated (with '--create-issues').
+      The body of the issues created by hand is never changed.
+    - 'close': The SOP is not due for review anymore, but still has an open issue (with '--close-issues').
+    - 'keep': The issue of the SOP is left as it is.
+
+    :param report: Report of all processed SOP files (see 'generate_report').
+    :param issue_index: All open GitHub issues, by SOP ID.
+    :param args: Parsed command-line arguments.
+    :return: Planned changes, as {'action': ..., 'sop_id': ..., 'filepath': ..., 'key': ..., 'issue_number': ..., 'issue_url': ...},
+             along with the 'labels' to add ('relabel') and the 'previous_key' ('rekey'). An issue may have both changes.
+    """
+    plan = []
+    for individual_report in report["all_files"]:
+        sop_file = individual_report["filepath"]
+        sop_id = re.match(sop_id_regex, os.path.basename(sop_file)).group(1)
+        last_edit_date = datetime.fromisoformat(individual_report["last_edit_date"])
+        issue = (issue_index or {}).get(sop_id)
+        action = {
+            "action": "keep", "sop_id": sop_id, "filepath": sop_file,
+            "key": get_idempotency_key(sop_id, last_edit_date, args.days_review),
+            "last_edit_date": individual_report["last_edit_date"],
+            "issue_number": issue["number"] if issue else None, "issue_url": issue["html_url"] if issue else None
+        }
+        if individual_report["due_review"]:
+            if not issue:
+                if not args.create_issues:
+                    continue
+                action["action"] = "create"
+            elif args.create_issues:
+                changes = []
+                missing_labels = [label for label in review_labels if label not in get_label_names(issue)]
+                if missing_labels:
+                    changes.append(dict(action, action="relabel", labels=missing_labels))
+                if is_created_by_script(issue) and get_issue_key(issue) != action["key"]:
+                    changes.append(dict(action, action="rekey", previous_key=get_issue_key(issue)))
+                if changes:
+                    plan.extend(changes)
+                    continue
+        elif issue:
+            # Reviewed since the issue was created, so the key is the one of the closing (i.e., SOP ID and issue number)
+            action["key"] = f"{sop_id}:closed:{issue['number']}"
+            if args.close_issues:
+                action["action"] = "close"
+        else:
+            continue
+        plan.append(action)
+    return plan
 
-def main():
+def print_plan(plan: List[Dict]):
     """
-    Main function to check if SOPs need review and create GitHub issues for those due.
+    Prints the planned changes of the GitHub issues, one per line.
+    """
+    for action in plan:
+        target = action["issue_url"] or f"new issue for '{action['filepath']}'"
+        if action["action"] == "relabel":
+            change = f"add labels: {', '.join(action['labels'])}"
+        elif action["action"] == "rekey":
+            change = f"body key: {action['previous_key'] or '-'} -> {action['key']}"
+        else:
+            change = f"key: {action['key']}"
+        print(f"{action['action']:<8} {action['sop_id']}  {target}  ({change})")
+    counts = {name: sum(action["action"] == name for action in plan) for name in ["create", "relabel", "rekey", "close", "keep"]}
+    print(", ".join(f"'{count}' to {name}" for name, count in counts.items()))
+
+class ReviewJournal:
+    def __init__(self, path: str = None):
+        """
+        Journal of the applied changes of GitHub issues, appended as JSON lines right after each change.
+        Changes already in the journal (by action and idempotency key) are skipped when the run is repeated.
+
+        :param path: Path to the journal file (optional, changes are only kept in memory otherwise).
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self.entries: Dict[str, Dict] = {}
+        if path and os.path.exists(path):
+            with open(path, 'r') as file:
+                for line in file:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # e.g., the last line of a run that was killed while writing it
+                    self.entries[f"{entry['action']}:{entry['key']}"] = entry
+
+    def get(self, action: Dict) -> Optional[Dict]:
+        """
+        Gets the journal entry of a planned change, or None if it was not applied yet.
+        """
+        with self._lock:
+            return self.entries.get(f"{action['action']}:{action['key']}")
+
+    def record(self, action: Dict, issue_url: str):
+        """
+        Records an applied change, writing it to disk right away.
+        """
+        entry = {"action": action["action"], "key": action["key"], "issue_url": issue_url, "date": str(datetime.now())}
+        with self._lock:
+            self.entries[f"{entry['action']}:{entry['key']}"] = entry
+            if self.path:
+                with open(self.path, 'a') as file:
+                    file.write(json.dumps(entry) + "\n")
+                    file.flush()
+                    os.fsync(file.fileno())
+
+def find_issue_by_key(client: GitHubClient, gh_repo: str, key: str) -> Optional[Dict]:
     """
-    args = parse_args()
-    if not gh_token:
+    Looks for the open review issue with the given idempotency key (e.g., created by a request that seemed to fail).
+    """
+    for issue in client.list_issues(gh_repo, {"state": "open", "labels": ",".join(review_labels)}):
+        if get_issue_key(issue) == key:
+            return issue
+    return None
+
+def apply_action(action: Dict, client: GitHubClient, gh_repo: str, issue_index: Dict[str, Dict], days_review: int, max_attempts: int = 3, backoff_factor: float = 2) -> str:
+    """
+    Applies a planned change of a GitHub issue, retrying it with exponential backoff if it fails. Before creating an
+    issue again, it is looked up by its idempotency key, in case the failed request was applied anyway.
+
+    :param action: Planned change (see 'plan_reconciliation').
+    :param client: GitHub API client, authorized with the GitHub token.
+    :param gh_repo: The GH repository of the issues.
+    :param issue_index: All open GitHub issues, by SOP ID.
+    :param days_review: The amount of days set as threshold for an SOP to have to go through review
+    :param max_attempts: Maximum number of attempts.
+    :param backoff_factor: Base delay (in seconds) between attempts, doubled on every attempt.
+    :return: URL of the created or changed issue.
+    """
+    for attempt in range(max_attempts):
+        try:
+            if action["action"] == "create":
+                if attempt > 0:
+                    issue = find_issue_by_key(client, gh_repo, action["key"])
+                    if issue:
+                        return issue["html_url"]
+                payload = create_issue_payload(action["filepath"], datetime.fromisoformat(action["last_edit_date"]), days_review, action["key"])
+                return client.create_issue(gh_repo, payload)["html_url"]
+            if action["action"] == "relabel":
+                # Only the labels are changed, keeping the existing ones
+                labels = get_label_names(issue_index[action["sop_id"]])
+                return client.update_issue(gh_repo, action["issue_number"], {"labels": list(dict.fromkeys(labels + action["labels"]))})["html_url"]
+            if action["action"] == "rekey":
+                body = set_issue_key(issue_index[action["sop_id"]].get("body"), action["key"])
+                return client.update_issue(gh_repo, action["issue_number"], {"body": body})["html_url"]
+            if action["action"] == "close":
+                # Closing an issue twice is harmless, but the comment (with the key of the closing) is only added if it's
+                #   not there yet, e.g., added by an attempt or a run that failed to close the issue afterwards
+                if not any(get_issue_key(comment) == action["key"] for comment in client.list_comments(gh_repo, action["issue_number"])):
+                    comment = f"Closed automatically: `{os.path.basename(action['filepath'])}` was reviewed on `{action['last_edit_date'][:10]}`, according to its Document History."
+                    client.add_comment(gh_repo, action["issue_number"], set_issue_key(comment, action["key"]))
+                return client.update_issue(gh_repo, action["issue_number"], {"state": "closed", "state_reason": "completed"})["html_url"]
+            return action["issue_url"]
+        except ValueError:
+            if attempt == max_attempts - 1:
+                raise
+            time.sleep(backoff_factor * (2 ** attempt))
+
+def execute_plan(plan: List[Dict], client: GitHubClient, gh_repo: str, issue_index: Dict[str, Dict], days_review: int,
+                 journal: ReviewJournal = None, workers: int = 2, verbosity: int = 0) -> List[Dict]:
+    """
+    Applies the planned changes of the GitHub issues through a bounded queue: at most 'workers' changes are applied at
+    the same time, and the rest wait for them to finish. Changes already in the journal are skipped, and a failed change
+    does not stop the others.
+
+    :param plan: Planned changes (see 'plan_reconciliation').
+    :param client: GitHub API client, authorized with the GitHub token.
+    :param gh_repo: The GH repository of the issues.
+    :param issue_index: All open GitHub issues, by SOP ID.
+    :param days_review: The amount of days set as threshold for an SOP to have to go through review
+    :param journal: Journal of the applied changes (optional).
+    :param workers: Maximum number of changes applied at the same time.
+    :param verbosity: Level of verbosity for output messages.
+    :return: Planned changes with their outcome ('status', and 'issue_url' or 'error').
+    """
+    journal = journal or ReviewJournal()
+    outcomes = [dict(action) for action in plan]
+    pending = []
+    for outcome in outcomes:
+        entry = journal.get(outcome)
+        if outcome["action"] == "keep":
+            outcome["status"] = "unchanged"
+        elif entry:
+            outcome.update(status="journaled", issue_url=entry["issue_url"])
+        else:
+            pending.append(outcome)
+
+    with ThreadPoolExecutor(max_workers=max(workers, 1)) as executor:
+        running = {}
+        while pending or running:
+            while pending and len(running) < max(workers, 1):
+                outcome = pending.pop(0)
+                running[executor.submit(apply_action, outcome, client, gh_repo, issue_index, days_review)] = outcome
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                outcome = running.pop(future)
+                try:
+                    outcome.update(status="applied", issue_url=future.result())
+                    journal.record(outcome, outcome["issue_url"])
+                except ValueError as e:
+                    outcome.update(status="failed", error=str(e))
+                if verbosity > 1:
+                    print(f"-- {outcome['action']} '{outcome['sop_id']}': {outcome['status']} {outcome.get('issue_url') or outcome.get('error')}")
+    return outcomes
+
+
+def run_review_check(args: Any) -> Dict:
+    """
+    Checks which of the given SOPs are due for review, and creates their GitHub issues if requested.
+
+    :param args: Parsed arguments (see 'add_arguments').
+    :return: A dictionary containing the final report.
+    """
+    # A dry run doesn't change any issue, so without a token (e.g., offline) the open issues are not fetched either
+    fetch_issues = bool(gh_token) or not args.dry_run
+    if not gh_token and fetch_issues:
         raise EnvironmentError("GitHub token not found. Please set the 'GITHUB_TOKEN' environment variable.")
+    if not fetch_issues and args.verbosity > 0:
+        print("GitHub token not found, so the open GitHub issues are not fetched: the planned changes assume that no SOP has an open review issue.")
+    if args.cache_dir:
+        enable_parse_cache(args.cache_dir, verbosity=args.verbosity)
     sop_files = collect_sop_files(args.inputs)  # Collect all SOP files from the specified directory
-    all_issues = get_gh_issues(
-        gh_repo=args.repository, gh_token=gh_token, issue_params={"state": "open", "labels": "SOP-Review"}
-    )  # Collect all GH issues with the given parameters
+    # The same client (and its pooled connections) is used to fetch the issues and create the new ones
+    client = GitHubClient(
+        token=gh_token, api_url=args.github_api_url, cache=ResponseCache(args.gh_cache) if args.gh_cache else None, verbosity=args.verbosity
+    )
+    all_issues = []
+    if fetch_issues:
+        all_issues = client.list_issues(
+            gh_repo=args.repository, issue_params={"state": "open", "labels": "SOP-Review"}
+        )  # Collect all GH issues with the given parameters, across all pages
+        client.save_cache()
+
+    # Generate the final report, and check the existing issues
+    issue_index = build_issue_index(all_issues, sop_id_regex)
+    report = generate_report(sop_files, args, issue_index)
+
+    # Plan all the changes of the issues at once, and apply them (unless it's a dry run)
+    plan = plan_reconciliation(report, issue_index, args)
+    if args.dry_run:
+        report["reconciliation"] = {"dry_run": True, "issues_fetched": fetch_issues, "plan": plan}
+        return report
+
+    outcomes = execute_plan(
+        plan, client, args.repository, issue_index, args.days_review,
+        journal=ReviewJournal(args.journal), workers=args.workers, verbosity=args.verbosity
+    )
+    client.save_cache()
+    files_reports = {individual_report["filepath"]: individual_report for individual_report in report["all_files"]}
+    for outcome in outcomes:
+        if outcome["action"] == "create" and outcome.get("issue_url"):
+            files_reports[outcome["filepath"]]["new_gh_issue"] = outcome["issue_url"]
+            report["n_created_gh_issues"] += 1
+    report["reconciliation"] = {
+        "dry_run": False,
+        **{f"n_{status}": sum(outcome["status"] == status for outcome in outcomes) for status in ["applied", "journaled", "unchanged", "failed"]},
+        "actions": outcomes
+    }
+    return report
+
+def main(args: Any = None):
+    """
+    Main function to check if SOPs need review and create GitHub issues for those due.
 
-    # Generate the final report, check issues and create new ones if needed
-    report = generate_report(sop_files, args, all_issues)
+    :param args: Parsed arguments (optional, parsed from the command line by default).
+    """
+    args = args or parse_args()
+    report = run_review_check(args)
 
+    if args.dry_run:
+        print_plan(report["reconciliation"]["plan"])
     if args.verbosity > 0:
         print(json.dumps(report, indent=2), "\n")
 
+    # Changes of the issues that failed can be applied by running it again (with the same journal)
+    if not args.dry_run and report["reconciliation"]["n_failed"]:
+        exit(1)
+
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,11 +1,11 @@
 import argparse
 import os
 import json
-import pandas as pd
-from typing import Dict, Any
-from io import StringIO
+from typing import List, Dict, Any, Optional
+from index_table import IndexTable
 from sop_index import SOPIndexGenerator
-from utils import collect_sop_files
+from change_tracking import get_changed_paths
+from utils import collect_sop_files, find_repository_root, enable_parse_cache
 
 class SOPIndexComparator:
     def __init__(self, verbosity: int = 0):
@@ -16,12 +16,12 @@ class SOPIndexComparator:
         """
         self.verbosity = verbosity
 
-    def read_existing_index(self, file_path: str) -> pd.DataFrame:
+    def read_existing_index(self, file_path: str) -> IndexTable:
         """
         Reads and parses the existing SOP index markdown file.
 
         :param file_path: Path to the existing index file.
-        :return: DataFrame of the existing index.
+        :return: IndexTable of the existing index.
         """
         if not os.path.isfile(file_path):
             raise FileNotFoundError(f"File '{file_path}' does not exist.")
@@ -32,33 +32,50 @@ class SOPIndexComparator:
         with open(file_path, 'r') as file:
             lines = file.readlines()
         
-        # Identify the start of the markdown table
-        start_index = 0
-        for i, line in enumerate(lines):
+        # Identify the start of the markdown table, and take all its lines
+        table_lines = []
+        for line in lines:
             if line.strip().startswith('|'):
-                start_index = i
-                break
+                table_lines.append(line)
+            elif table_lines:
+                break  # End of the table
         
-        # Remove leading and trailing '|' characters from each line, to avoid empty columns after read as CSV
-        cleaned_lines = [line.strip().strip('|') for line in lines[start_index:]]
+        # Remove leading and trailing '|' characters from each line, to avoid empty columns when splitting them
+        cleaned_lines = [line.strip().strip('|') for line in table_lines]
         
         # Filter out lines that are just dashes, colons, whitespaces or vert. lines (format rows in Markdown)
         table_lines = [line for line in cleaned_lines if not set(line.strip()) <= {'-', ':', ' ', '|'}]
+        if not table_lines:
+            raise ValueError(f"No index table was found in the file '{file_path}'.")
 
-        table_str = '\n'.join(table_lines)
-        existing_index = pd.read_csv(StringIO(table_str), sep='|')
-        existing_index.columns = existing_index.columns.str.strip()  # Strip column names
+        columns = [column.strip() for column in table_lines[0].split('|')]
+        rows = []
+        for line in table_lines[1:]:
+            cells = line.split('|')
+            if len(cells) > len(columns):
+                raise ValueError(f"Row of the index table in '{file_path}' has more cells ('{len(cells)}') than columns ('{len(columns)}'): '{line}'")
+            rows.append({column: cell.strip() for column, cell in zip(columns, cells)})
 
+        # Numeric columns (e.g., 'Nº steps') are read as numbers
+        for column in columns:
+            numbers = parse_numbers([row.get(column) for row in rows])
+            if numbers is not None:
+                for row, number in zip(rows, numbers):
+                    row[column] = number
+
+        existing_index = IndexTable(columns, rows)
         check_duplicate_identifiers(existing_index, file_path)
 
         return existing_index
 
-    def compare_indexes(self, existing_index: pd.DataFrame, new_index: pd.DataFrame) -> Dict[str, Any]:
+    def compare_indexes(self, existing_index: IndexTable, new_index: IndexTable, max_differences: int = None) -> Dict[str, Any]:
         """
-        Compares the existing and new SOP index tables.
+        Compares the existing and new SOP index tables. Rows are aligned by their identifier, and each column is compared
+        for all aligned rows at once; the differences are only built for the rows that actually differ.
 
-        :param existing_index: DataFrame of the existing index.
-        :param new_index: DataFrame of the new index.
+        :param existing_index: IndexTable of the existing index.
+        :param new_index: IndexTable of the new index.
+        :param max_differences: Maximum number of differences to report, stopping the comparison once reached (optional).
         :return: Dictionary of comparison results.
         """
         results = {
@@ -67,78 +84,146 @@ class SOPIndexComparator:
             "differences": []
         }
 
+        def add_difference(difference: Any) -> bool:
+            """
+            Adds a difference, and returns whether the maximum number of differences was reached.
+            """
+            results["differences"].append(difference)
+            if max_differences is not None and len(results["differences"]) >= max_differences:
+                results["max_differences_reached"] = True
+                return True
+            return False
+
+        if max_differences is not None and max_differences <= 0:
+            results["max_differences_reached"] = True
+            return results
+
         # Compare the number of rows
         if len(existing_index) != len(new_index):
-            results["differences"].append(f"Number of SOPs differs: existing ({len(existing_index)}), new ({len(new_index)})")
-
-        # Strip leading and trailing whitespaces in all string columns
-        existing_index = existing_index.applymap(lambda x: x.strip() if isinstance(x, str) else x)
-        new_index = new_index.applymap(lambda x: x.strip() if isinstance(x, str) else x)
-
-        # Merge indexes to find differences in rows and column values
-        merged_index = existing_index.merge(new_index, on="Identifier", suffixes=('_existing', '_new'), how='outer', indicator=True)
-
-        # Identify rows that are present in one DataFrame but not the other
-        differences = merged_index[merged_index['_merge'] != 'both']
-        if not differences.empty:
-            for _, row in differences.iterrows():
-                diff = {"Identifier": row["Identifier"], "Differences": {}}
-                if row['_merge'] == 'left_only':
-                    diff["Differences"] = "Missing from the new index table."
-                elif row['_merge'] == 'right_only':
-                    diff["Differences"] = "Missing from the existing index table."
-                results["differences"].append(diff)
-
-        # Identify rows that are present in both DataFrames but have differing values
-        common_rows = merged_index[merged_index['_merge'] == 'both']
-        for _, row in common_rows.iterrows():
-            diff = {"Identifier": row["Identifier"], "Differences": {}}
-            row_diff = False
-            for col in existing_index.columns:
-                if col == "Identifier":
-                    continue  # Skip the Identifier column
-                col_existing = f"{col}_existing"
-                col_new = f"{col}_new"
-                if row[col_existing] != row[col_new]:
-                    diff["Differences"][col] = {"existing": row[col_existing], "new": row[col_new]}
-                    row_diff = True
-            if row_diff:
-                results["differences"].append(diff)
+            if add_difference(f"Number of SOPs differs: existing ({len(existing_index)}), new ({len(new_index)})"):
+                return results
+
+        # Index both tables by identifier (they are unique, see 'check_duplicate_identifiers')
+        existing_rows = {strip_value(row["Identifier"]): row for row in existing_index}
+        new_rows = {strip_value(row["Identifier"]): row for row in new_index}
+
+        # Identify rows that are present in one table but not the other
+        for identifier in existing_rows:
+            if identifier not in new_rows and add_difference({"Identifier": identifier, "Differences": "Missing from the new index table."}):
+                return results
+        for identifier in new_rows:
+            if identifier not in existing_rows and add_difference({"Identifier": identifier, "Differences": "Missing from the existing index table."}):
+                return results
+
+        # Identify rows that are present in both tables but have differing values, column by column
+        common_identifiers = [identifier for identifier in existing_rows if identifier in new_rows]
+        columns = [column for column in existing_index.columns if column != "Identifier"]
+        missing_columns = [column for column in columns if column not in new_index.columns]
+        if missing_columns:
+            raise ValueError(f"Columns of the existing index table are missing from the new one: {missing_columns}")
+
+        existing_values = {column: [strip_value(existing_rows[identifier].get(column)) for identifier in common_identifiers] for column in columns}
+        new_values = {column: [strip_value(new_rows[identifier].get(column)) for identifier in common_identifiers] for column in columns}
+        differing = {column: [existing != new for existing, new in zip(existing_values[column], new_values[column])] for column in columns}
+        differing_rows = [i for i, row_differs in enumerate(map(any, zip(*differing.values()))) if row_differs] if columns else []
+
+        for i in differing_rows:
+            diff = {"Identifier": common_identifiers[i], "Differences": {}}
+            for column in columns:
+                if differing[column][i]:
+                    diff["Differences"][column] = {"existing": existing_values[column][i], "new": new_values[column][i]}
+            if add_difference(diff):
+                return results
 
         return results
 
 
-def parse_args():
+def add_arguments(parser: argparse.ArgumentParser) -> argparse.ArgumentParser:
     """
-    Parses command-line arguments.
+    Adds the command-line arguments of the index comparator to a parser (e.g., the one of its subcommand in 'sop.py').
 
-    :return: Parsed arguments.
+    :param parser: Parser to add the arguments to.
+    :return: The same parser.
     """
-    parser = argparse.ArgumentParser(description="Compares existing SOP index with a newly generated index")
     parser.add_argument("existing_index", type=str, help="Path to the existing SOP index markdown file")
     parser.add_argument("inputs", nargs="+", help="SOP file(s) or directories to include in the new index")
     parser.add_argument("-v", "--verbosity", type=int, default=0, help="Verbosity level (0-2)")
-    return parser.parse_args()
+    parser.add_argument("--cache-dir", type=str, help="Directory of the on-disk parse cache (e.g., '.sop-cache'). If given, unchanged SOPs are not parsed again across runs")
+    parser.add_argument("--sidecar", type=str, help="Path to the sidecar file written by 'sop_index.py --sidecar' (e.g., 'sops/index-sidecar.json'). Only SOPs whose file changed since then are parsed, the rest are hashed")
+    parser.add_argument("--changed-since", type=str, help="Git reference (e.g., 'origin/main'). If the sidecar file or the scripts changed since then (e.g., in a pull request), the sidecar is not trusted: all SOPs are parsed, and the rows it records are checked against them")
+    parser.add_argument("--max-differences", type=int, help="Maximum number of differences to report. The comparison stops once reached (default: all)")
+    return parser
+
+def parse_args() -> Any:
+    """
+    Parses command-line arguments.
 
-def check_duplicate_identifiers(df: pd.DataFrame, source: str, column_header: str = "Identifier"):
+    :return: Parsed arguments.
+    """
+    return add_arguments(argparse.ArgumentParser(description="Compares existing SOP index with a newly generated index")).parse_args()
+
+def check_duplicate_identifiers(table: IndexTable, source: str, column_header: str = "Identifier"):
     """
-    Checks for duplicate identifiers in the given DataFrame and raises an error if any are found.
+    Checks for duplicate identifiers in the given table and raises an error if any are found.
 
-    :param df: DataFrame to check for duplicate identifiers.
+    :param table: IndexTable to check for duplicate identifiers.
     :param source: Source of the table (e.g., path to the file being checked), used for error message
     """
-    df[column_header] = df[column_header].str.strip()  # Strip leading and trailing whitespace from identifiers
-    duplicated_identifiers = df[column_header].duplicated()
-    if duplicated_identifiers.any():
-        duplicated_ids = df[duplicated_identifiers][column_header].str.strip().unique().tolist()
+    seen_ids = set()
+    duplicated_ids = []
+    for row in table:
+        row[column_header] = strip_value(row.get(column_header))  # Strip leading and trailing whitespace from identifiers
+        if row[column_header] in seen_ids and row[column_header] not in duplicated_ids:
+            duplicated_ids.append(row[column_header])
+        seen_ids.add(row[column_header])
+    if duplicated_ids:
         n_duplicated_ids = len(duplicated_ids)
         raise ValueError(f"Duplicate identifiers ('{n_duplicated_ids}' unique IDs) found in the given index table ({source}). Identifiers should be unique. See list of repeated identifiers: {duplicated_ids}")
 
-def main():
+def strip_value(value: Any) -> Any:
     """
-    Main function to run the SOP Index Comparator.
+    Strips leading and trailing whitespaces of string values, leaving the rest as they are.
     """
-    args = parse_args()
+    return value.strip() if isinstance(value, str) else value
+
+def parse_numbers(values: List[Any]) -> Optional[List[Any]]:
+    """
+    Parses the cells of a column of the existing index table as numbers (e.g., '7' as 7), if all of them are.
+
+    :param values: Cell values of the column.
+    :return: The numbers (integers if possible), or None if any of the values is not a number.
+    """
+    if not values:
+        return None
+    for conversion in [int, float]:
+        try:
+            return [conversion(value) for value in values]
+        except (ValueError, TypeError):
+            continue  # Stops at the first value that is not a number
+    return None
+
+def sidecar_changed(sidecar_path: str, git_ref: str) -> bool:
+    """
+    Checks if a sidecar file, or the scripts that generate its rows, changed since the given git reference.
+    Otherwise, it's the one of the reference (e.g., already checked when it was merged), and its rows can be trusted.
+
+    :param sidecar_path: Path to the sidecar file.
+    :param git_ref: Git reference to compare with (e.g., 'origin/main').
+    :return: Whether the sidecar or the scripts changed.
+    """
+    changed_paths = get_changed_paths(git_ref, find_repository_root(sidecar_path))
+    scripts_dir = os.path.dirname(os.path.abspath(__file__))
+    return os.path.abspath(sidecar_path) in changed_paths or any(path.startswith(scripts_dir + os.sep) for path in changed_paths)
+
+def run_comparison(args: Any) -> Dict[str, Any]:
+    """
+    Compares the existing index table with the one generated from the given SOPs.
+
+    :param args: Parsed arguments (see 'add_arguments').
+    :return: Dictionary of comparison results.
+    """
+    if args.cache_dir:
+        enable_parse_cache(args.cache_dir, verbosity=args.verbosity)
     
     comparator = SOPIndexComparator(verbosity=args.verbosity)
 
@@ -152,8 +237,14 @@ def main():
     if args.verbosity > 1:
         print(f"- Generating new index from inputs: {args.inputs}")
     sop_files = collect_sop_files(args.inputs)
-    index_generator = SOPIndexGenerator(verbosity=args.verbosity)
+    verify_sidecar = bool(args.sidecar and args.changed_since) and sidecar_changed(args.sidecar, args.changed_since)
+    if verify_sidecar and args.verbosity > 1:
+        print(f"- The sidecar file '{args.sidecar}' or the scripts changed since '{args.changed_since}'. Its rows will be checked instead of reused")
+    index_generator = SOPIndexGenerator(verbosity=args.verbosity, sidecar_path=args.sidecar, verify_sidecar=verify_sidecar)
     index_generator.parse_all_sops(sop_files)
+    if index_generator.sidecar_mismatches:
+        raise ValueError(f"The sidecar file '{args.sidecar}' records rows that do not match their SOPs, for the files: {index_generator.sidecar_mismatches}. "
+                         f"Regenerate it with 'sop_index.py --sidecar {args.sidecar}'.")
     new_index = index_generator.index_data
     check_duplicate_identifiers(new_index, f"created using '{args.inputs}' as inputs")
 
@@ -162,7 +253,16 @@ def main():
 
     if args.verbosity > 1:
         print("- Comparing indexes")
-    comparison_results = comparator.compare_indexes(existing_index, new_index)
+    return comparator.compare_indexes(existing_index, new_index, max_differences=args.max_differences)
+
+def main(args: Any = None):
+    """
+    Main function to run the SOP Index Comparator.
+
+    :param args: Parsed arguments (optional, parsed from the command line by default).
+    """
+    args = args or parse_args()
+    comparison_results = run_comparison(args)
 
     if args.verbosity > 0:
         print(json.dumps(comparison_results, indent=2),"\n")
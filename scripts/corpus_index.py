@@ -0,0 +1,116 @@
+import os
+import re
+from typing import List, Dict, Optional, Iterable, Callable
+from utils import ParsedSOP
+
+# Indexes built from the content of the SOPs (the index of SOP identifiers is always built, from the filenames)
+CONTENT_INDEXES = ["title", "template", "glossary"]
+
+class CorpusIndex:
+    def __init__(self, indexes: Iterable[str] = CONTENT_INDEXES):
+        """
+        Cross-document indexes of a corpus of SOPs, built in a single pass over their (already parsed) content,
+        so that corpus-level checks do not need to compare every pair of files.
+
+        :param indexes: Indexes to build from the content of the SOPs (see 'CONTENT_INDEXES'). SOPs are not read if none.
+        """
+        unknown_indexes = set(indexes) - set(CONTENT_INDEXES)
+        if unknown_indexes:
+            raise ValueError(f"Unknown corpus indexes: {sorted(unknown_indexes)}. They should be any of {CONTENT_INDEXES}")
+        self.indexes = set(indexes)
+        self.files: List[str] = []
+        self.by_identifier: Dict[str, List[str]] = {}
+        self.by_title: Dict[str, List[str]] = {}
+        # Node-specific SOPs (i.e., instances) by the number of their template
+        self.by_template: Dict[str, List[str]] = {}
+        self.glossary_definitions: Dict[str, Dict[str, List[str]]] = {}
+        # Description of each glossary term in each file, as written (i.e., not normalized), to report inconsistencies
+        self.glossary_descriptions: Dict[str, Dict[str, str]] = {}
+        self.titles: Dict[str, str] = {}
+
+    @classmethod
+    def build(cls, file_paths: Iterable[str], get_sop: Callable[[str], ParsedSOP], indexes: Iterable[str] = CONTENT_INDEXES) -> "CorpusIndex":
+        """
+        Builds the indexes of the given SOP files.
+
+        :param file_paths: Paths to the SOP files (duplicates are ignored).
+        :param get_sop: Function returning the ParsedSOP of an SOP file (only called if any content index is built).
+        :param indexes: Indexes to build from the content of the SOPs (see 'CONTENT_INDEXES').
+        :return: Index of the corpus.
+        """
+        corpus = cls(indexes)
+        for file_path in dict.fromkeys(file_paths):
+            corpus.add(file_path, get_sop(file_path) if corpus.indexes else None)
+        return corpus
+
+    def add(self, file_path: str, sop: Optional[ParsedSOP]):
+        """
+        Adds an SOP to the indexes.
+
+        :param file_path: Path to the SOP file.
+        :param sop: ParsedSOP object of the SOP file (None if no content index is built).
+        """
+        self.files.append(file_path)
+
+        identifier = get_filename_identifier(file_path)
+        if identifier:
+            self.by_identifier.setdefault(identifier, []).append(file_path)
+
+        if "title" in self.indexes:
+            title = next((text for level, text in sop.headings if level == 1), None)
+            if title:
+                self.titles[file_path] = title
+                self.by_title.setdefault(title.lower(), []).append(file_path)
+
+        if "template" in self.indexes:
+            # European-level SOPs are templates themselves, so only the template number of node-specific SOPs refers to another SOP
+            template = get_template_number(sop)
+            if template and "node-specific" in (get_metadata_value(sop, "template sop type") or "").lower():
+                self.by_template.setdefault(template, []).append(file_path)
+
+        if "glossary" in self.indexes:
+            for term, description in sop.glossary.items():
+                definitions = self.glossary_definitions.setdefault(term, {})
+                definitions.setdefault(normalize_definition(description), []).append(file_path)
+                self.glossary_descriptions.setdefault(term, {})[file_path] = description
+
+def get_filename_identifier(file_path: str) -> Optional[str]:
+    """
+    Gets the SOP identifier from the filename (e.g., 'GDI-SOP0001' from 'GDI-SOP0001_some-title.md').
+
+    :param file_path: Path to the SOP file.
+    :return: SOP identifier, or None if the filename does not follow the naming conventions.
+    """
+    match = re.match(r"^(GDI-SOP\d{4})_", os.path.basename(file_path))
+    return match.group(1) if match else None
+
+def get_template_number(sop: ParsedSOP) -> Optional[str]:
+    """
+    Gets the 'Template SOP number' of the metadata table of an SOP (e.g., 'GDI-SOP0001').
+
+    :param sop: ParsedSOP object of the SOP file.
+    :return: Template SOP number, or None if missing.
+    """
+    return get_metadata_value(sop, "template sop number")
+
+def get_metadata_value(sop: ParsedSOP, name: str) -> Optional[str]:
+    """
+    Gets a value of the metadata table of an SOP, without code formatting (e.g., 'Node-specific SOP' for 'template sop type').
+
+    :param sop: ParsedSOP object of the SOP file.
+    :param name: Name of the metadata (lowercase).
+    :return: Value of the metadata, or None if missing.
+    """
+    for columns in sop.metadata_rows or []:
+        if len(columns) == 2 and columns[0].lower() == name:
+            return columns[1].strip('`').strip() or None
+    return None
+
+def normalize_definition(description: str) -> str:
+    """
+    Normalizes a glossary description for comparison (i.e., whitespace, upper/lowercase and trailing period).
+
+    :param description: Glossary description.
+    :return: Normalized description.
+    """
+    return re.sub(r'\s+', ' ', description).strip().rstrip('.').lower()
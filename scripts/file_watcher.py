@@ -0,0 +1,68 @@
+import os
+import time
+from typing import List, Dict, Set, Tuple
+
+class PollingWatcher:
+    def __init__(self, paths: List[str], interval: float = 0.5):
+        """
+        Watches files and directories for changes by periodically polling their modification time and size,
+        so that it works on any platform without extra dependencies. Hidden files and directories (e.g., '.git') are ignored.
+
+        :param paths: Paths to the files or directories to watch (recursively).
+        :param interval: Seconds between polls.
+        """
+        self.paths = list(dict.fromkeys(os.path.abspath(path) for path in paths))
+        self.interval = interval
+        self.state = self.snapshot()
+
+    def snapshot(self) -> Dict[str, Tuple[int, int]]:
+        """
+        Takes the modification time and size of all the watched files.
+
+        :return: Modification time (in nanoseconds) and size of each file, by absolute path.
+        """
+        state = {}
+        for path in self.paths:
+            if os.path.isfile(path):
+                self._stat(path, state)
+            elif os.path.isdir(path):
+                for root, dirs, files in os.walk(path):
+                    dirs[:] = [directory for directory in dirs if not directory.startswith('.')]
+                    for file in files:
+                        if not file.startswith('.'):
+                            self._stat(os.path.join(root, file), state)
+        return state
+
+    @staticmethod
+    def _stat(file_path: str, state: Dict[str, Tuple[int, int]]):
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return  # e.g., removed while walking
+        state[file_path] = (stat.st_mtime_ns, stat.st_size)
+
+    def poll(self) -> Set[str]:
+        """
+        Checks for changes since the last poll.
+
+        :return: Absolute paths of the modified, added and removed files.
+        """
+        state = self.snapshot()
+        changed_paths = {path for path in state.keys() | self.state.keys() if state.get(path) != self.state.get(path)}
+        self.state = state
+        return changed_paths
+
+    def wait(self) -> Set[str]:
+        """
+        Waits until any watched file changes. Changes are collected until a poll finds no more of them,
+        so that saving several files at once (or an editor writing a file in steps) is handled as one change.
+
+        :return: Absolute paths of the modified, added and removed files.
+        """
+        changed_paths = set()
+        while True:
+            time.sleep(self.interval)
+            new_changes = self.poll()
+            if not new_changes and changed_paths:
+                return changed_paths
+            changed_paths |= new_changes
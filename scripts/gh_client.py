@@ -0,0 +1,384 @@
+import os
+import re
+import json
+import time
+import tempfile
+import threading
+from email.utils import parsedate_to_datetime
+from typing import List, Dict, Any, Optional, TYPE_CHECKING
+from urllib.parse import urlencode
+
+# The network stack is only imported once a request is made, so that offline runs don't load it
+if TYPE_CHECKING:
+    import requests
+
+# Base URLs of GitHub's API and web server. They can be overridden with the same environment variables as in GitHub Actions
+#   (e.g., to point at GitHub Enterprise, or at the local stand-in server of 'gh_stub_server.py')
+DEFAULT_API_URL = "https://api.github.com"
+DEFAULT_SERVER_URL = "https://github.com"
+
+# SOP identifiers, as they appear in the titles of the issues (e.g., "[SOP Review] Review due: 'GDI-SOP0003_...'")
+SOP_ID_REGEX = r"(GDI-SOP\d{4})"
+
+# Response statuses of server-side errors that are worth retrying
+SERVER_ERROR_STATUSES = {500, 502, 503, 504}
+
+def get_api_url(api_url: str = None) -> str:
+    """
+    Gets the base URL of the GitHub API: the given one, the 'GITHUB_API_URL' environment variable, or 'https://api.github.com'.
+    """
+    return (api_url or os.getenv("GITHUB_API_URL") or DEFAULT_API_URL).rstrip('/')
+
+def get_server_url(server_url: str = None) -> str:
+    """
+    Gets the base URL of the GitHub web server: the given one, the 'GITHUB_SERVER_URL' environment variable, or 'https://github.com'.
+    """
+    return (server_url or os.getenv("GITHUB_SERVER_URL") or DEFAULT_SERVER_URL).rstrip('/')
+
+def to_server_url(url: str, server_url: str = None) -> str:
+    """
+    Rewrites a GitHub URL (e.g., 'https://github.com/owner/repo/blob/main/README.md', as written in the SOPs)
+    to point at the configured GitHub web server (see 'get_server_url'). Other URLs are returned as they are.
+    """
+    server_url = get_server_url(server_url)
+    if server_url != DEFAULT_SERVER_URL and url.startswith(DEFAULT_SERVER_URL + '/'):
+        return server_url + url[len(DEFAULT_SERVER_URL):]
+    return url
+
+class ResponseCache:
+    def __init__(self, path: str):
+        """
+        On-disk cache of the responses to GET requests of the GitHub API, keyed by URL. Each response is stored with its
+        ETag, so that it is revalidated with a conditional request ('If-None-Match'): unchanged responses are answered
+        with '304 Not Modified', which does not count against the rate limit.
+
+        :param path: Path to the JSON file of the cache (e.g., '.gh-cache.json').
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        try:
+            with open(path, 'r') as file:
+                self.entries: Dict[str, Dict] = json.load(file)
+        except (OSError, ValueError):
+            # A missing or corrupted cache is just an empty one
+            self.entries = {}
+
+    def get(self, url: str) -> Optional[Dict]:
+        """
+        Gets the cached response of a URL, as {'etag': ..., 'data': ..., 'next': ...}, or None if it is not cached.
+        """
+        with self._lock:
+            return self.entries.get(url)
+
+    def put(self, url: str, etag: str, data: Any, next_url: Optional[str]):
+        """
+        Stores the response of a URL.
+
+        :param url: The URL (including its query).
+        :param etag: ETag of the response.
+        :param data: JSON content of the response.
+        :param next_url: URL of the next page of the response, if paginated.
+        """
+        with self._lock:
+            self.entries[url] = {"etag": etag, "data": data, "next": next_url}
+
+    def save(self):
+        """
+        Writes the cache to disk. The file is written to a temporary file first and then atomically moved into place.
+        """
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w') as file:
+                with self._lock:
+                    json.dump(self.entries, file, sort_keys=True)
+            os.replace(tmp_path, self.path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+class GitHubClient:
+    def __init__(self, token: str = None, api_url: str = None, session: "requests.Session" = None,
+                 cache: ResponseCache = None, timeout: float = 30, max_retries: int = 3, backoff_factor: float = 1,
+                 max_wait: float = 120, write_interval: float = 1, verbosity: int = 0):
+        """
+        Client of the GitHub REST API, over a pooled HTTP session. GET requests are paginated through the 'Link' header
+        (with the maximum page size), and revalidated with their ETag if a response cache is given. Rate limits are honored:
+        requests wait for the primary rate limit to reset ('X-RateLimit-Reset') and for the delay requested on secondary
+        rate limits ('Retry-After'), and mutating requests are spaced out, as recommended by GitHub.
+
+        :param token: GitHub token to authorize (optional, anonymous requests otherwise).
+        :param api_url: Base URL of the API (optional, see 'get_api_url').
+        :param session: HTTP session to reuse (optional).
+        :param cache: Cache of the responses to GET requests (optional).
+        :param timeout: Timeout (in seconds) of each request.
+        :param max_retries: Maximum number of retries of each request (on rate limits or server-side errors).
+        :param backoff_factor: Base delay (in seconds) between retries of server-side errors, doubled on every retry.
+        :param max_wait: Maximum number of seconds to wait for a rate limit. Requests fail instead of waiting longer.
+        :param write_interval: Minimum number of seconds between mutating requests (e.g., creating issues).
+        :param verbosity: Level of verbosity for output messages.
+        """
+        self.token = token
+        self.api_url = get_api_url(api_url)
+        self.cache = cache
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_wait = max_wait
+        self.write_interval = write_interval
+        self.verbosity = verbosity
+        self._session = session
+
+        self.requests_made = 0
+        self.rate_limit_remaining: Optional[int] = None
+        self.rate_limit_reset: Optional[float] = None
+        self._last_write = 0.0
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+
+    @property
+    def session(self) -> "requests.Session":
+        """
+        HTTP session with the authorization and API headers, created on first use.
+        """
+        with self._lock:
+            if self._session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+                self._session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=4)
+                self._session.mount("http://", adapter)
+                self._session.mount("https://", adapter)
+                self._session.headers.update({"Accept": "application/vnd.github+json", "X-GitHub-Api-Version": "2022-11-28"})
+                if self.token:
+                    self._session.headers["Authorization"] = f"token {self.token}"
+            return self._session
+
+    def url(self, path: str, params: Dict = None) -> str:
+        """
+        Builds the URL of an API path (e.g., '/repos/{owner}/{repo}/issues'), with its query parameters.
+        """
+        url = path if path.startswith(('http://', 'https://')) else f"{self.api_url}/{path.lstrip('/')}"
+        return f"{url}?{urlencode(sorted(params.items()))}" if params else url
+
+    def request(self, method: str, path: str, params: Dict = None, json_data: Any = None, headers: Dict = None) -> "requests.Response":
+        """
+        Makes a request to the API, waiting for rate limits and retrying server-side errors.
+
+        :param method: HTTP method (e.g., 'GET', 'POST').
+        :param path: API path or full URL (e.g., the one of the next page).
+        :param params: Query parameters (optional).
+        :param json_data: JSON body (optional).
+        :param headers: Extra headers (optional).
+        :return: Final response (any status, e.g., 304 on conditional requests).
+        """
+        import requests
+        url = self.url(path, params)
+        mutating = method.upper() not in ["GET", "HEAD"]
+        for attempt in range(self.max_retries + 1):
+            self._wait_for_rate_limit()
+            if mutating:
+                self._space_writes()
+            try:
+                response = self.session.request(method, url, json=json_data, headers=headers, timeout=self.timeout)
+            except requests.RequestException as e:
+                # A failed mutating request may have been applied anyway, so it is up to the caller to check it before retrying
+                if attempt == self.max_retries or mutating:
+                    raise ValueError(f"GitHub API request '{method} {url}' failed: {e}")
+                time.sleep(self.backoff_factor * (2 ** attempt))
+                continue
+            with self._lock:
+                self.requests_made += 1
+            self._update_rate_limit(response)
+
+            delay = self._retry_delay(attempt, response, mutating)
+            if delay is None or attempt == self.max_retries:
+                return response
+            if self.verbosity > 1:
+                print(f"-- GitHub API request '{method} {url}' returned '{response.status_code}'. Retrying in {delay:.1f}s")
+            time.sleep(delay)
+        return response
+
+    def _update_rate_limit(self, response: "requests.Response"):
+        """
+        Keeps track of the remaining requests of the primary rate limit, from the headers of a response.
+        """
+        remaining = response.headers.get('X-RateLimit-Remaining')
+        reset = response.headers.get('X-RateLimit-Reset')
+        if remaining is not None and reset is not None:
+            with self._lock:
+                self.rate_limit_remaining = int(remaining)
+                self.rate_limit_reset = float(reset)
+
+    def _wait_for_rate_limit(self):
+        """
+        Waits until the primary rate limit resets if no requests are left, or fails if it would take longer than 'max_wait'.
+        """
+        with self._lock:
+            if self.rate_limit_remaining != 0 or self.rate_limit_reset is None:
+                return
+            delay = self.rate_limit_reset - time.time() + 1
+        if delay > self.max_wait:
+            raise ValueError(f"GitHub API rate limit exceeded. It resets in {delay:.0f}s, more than the maximum wait of {self.max_wait}s")
+        if delay > 0:
+            if self.verbosity > 0:
+                print(f"- GitHub API rate limit exceeded. Waiting {delay:.0f}s until it resets")
+            time.sleep(delay)
+        with self._lock:
+            self.rate_limit_remaining = None
+
+    def _space_writes(self):
+        """
+        Waits so that mutating requests are at least 'write_interval' seconds apart (to avoid secondary rate limits).
+        """
+        with self._write_lock:
+            delay = self._last_write + self.write_interval - time.time()
+            if delay > 0:
+                time.sleep(delay)
+            self._last_write = time.time()
+
+    def _retry_delay(self, attempt: int, response: "requests.Response", mutating: bool = False) -> Optional[float]:
+        """
+        Computes the delay before retrying a request, if it is worth retrying.
+
+        :param attempt: Number of the failed attempt (starting at 0).
+        :param response: Response of the attempt.
+        :param mutating: Whether the request modifies data. Rejected by rate limits, they are retried as well,
+            but not on server-side errors, as they may have been applied anyway.
+        :return: Delay in seconds, or None if the request should not be retried.
+        """
+        if response.status_code in (403, 429):
+            retry_after = response.headers.get('Retry-After')
+            if retry_after:  # Secondary rate limit
+                try:
+                    delay = float(retry_after)
+                except ValueError:
+                    try:
+                        delay = parsedate_to_datetime(retry_after).timestamp() - time.time()
+                    except (TypeError, ValueError):
+                        delay = self.backoff_factor * (2 ** attempt)
+            elif response.headers.get('X-RateLimit-Remaining') == '0' and response.headers.get('X-RateLimit-Reset'):  # Primary rate limit
+                delay = float(response.headers['X-RateLimit-Reset']) - time.time() + 1
+            elif response.status_code == 429:
+                delay = self.backoff_factor * (2 ** attempt)
+            else:
+                return None  # e.g., missing permissions
+            if delay > self.max_wait:
+                raise ValueError(f"GitHub API rate limit exceeded. Retrying would take {delay:.0f}s, more than the maximum wait of {self.max_wait}s")
+            return max(delay, 0)
+        if response.status_code in SERVER_ERROR_STATUSES and not mutating:
+            return self.backoff_factor * (2 ** attempt)
+        return None
+
+    def get_pages(self, path: str, params: Dict = None) -> List[Any]:
+        """
+        Gets all the items of a paginated list, following the 'next' links of the responses (with 100 items per page).
+        Pages are revalidated with their ETag if cached, so unchanged pages are not downloaded again.
+
+        :param path: API path of the list (e.g., '/repos/{owner}/{repo}/issues').
+        :param params: Query parameters (optional).
+        :return: Items of all pages.
+        """
+        items = []
+        url = self.url(path, dict(params or {}, per_page=100))
+        while url:
+            cached = self.cache.get(url) if self.cache else None
+            response = self.request("GET", url, headers={"If-None-Match": cached["etag"]} if cached and cached["etag"] else None)
+            if response.status_code == 304 and cached:
+                data, next_url = cached["data"], cached["next"]
+            elif response.status_code == 200:
+                data = response.json()
+                next_url = response.links.get('next', {}).get('url')
+                if self.cache and response.headers.get('ETag'):
+                    self.cache.put(url, response.headers['ETag'], data, next_url)
+            else:
+                raise ValueError(f"Failed to fetch '{url}' from the GitHub API: {response.status_code}, {response.text}")
+            items.extend(data)
+            url = next_url
+        return items
+
+    def list_issues(self, gh_repo: str, issue_params: Dict = None) -> List[Dict]:
+        """
+        Gets all GH issues (not pull requests) of a repository with specific criteria, across all pages.
+
+        :param gh_repo: GitHub repository path (e.g., 'GenomicDataInfrastructure/standard-operating-procedures').
+        :param issue_params: Parameters used to filter the GH issues (e.g., '{"state": "open", "labels": "SOP-Review"}').
+        :return: List of issues.
+        """
+        issues = self.get_pages(f"/repos/{gh_repo}/issues", issue_params)
+        # GH's API treats issues and pull requests similarly, so we filter them here
+        return [issue for issue in issues if "pull_request" not in issue]
+
+    def create_issue(self, gh_repo: str, issue: Dict) -> Dict:
+        """
+        Creates a GH issue.
+
+        :param gh_repo: GitHub repository path.
+        :param issue: Issue to create (e.g., {'title': ..., 'body': ..., 'labels': [...]}).
+        :return: Created issue.
+        """
+        response = self.request("POST", f"/repos/{gh_repo}/issues", json_data=issue)
+        if response.status_code != 201:
+            raise ValueError(f"Failed to create GH issue '{issue.get('title')}': {response.status_code}, {response.text}")
+        return response.json()
+
+    def update_issue(self, gh_repo: str, issue_number: int, fields: Dict) -> Dict:
+        """
+        Updates a GH issue (e.g., its body, labels or state).
+
+        :param gh_repo: GitHub repository path.
+        :param issue_number: Number of the issue.
+        :param fields: Fields to update (e.g., {'state': 'closed', 'state_reason': 'completed'}).
+        :return: Updated issue.
+        """
+        response = self.request("PATCH", f"/repos/{gh_repo}/issues/{issue_number}", json_data=fields)
+        if response.status_code != 200:
+            raise ValueError(f"Failed to update GH issue '#{issue_number}': {response.status_code}, {response.text}")
+        return response.json()
+
+    def list_comments(self, gh_repo: str, issue_number: int) -> List[Dict]:
+        """
+        Gets all the comments of a GH issue, across all pages.
+
+        :param gh_repo: GitHub repository path.
+        :param issue_number: Number of the issue.
+        :return: List of comments.
+        """
+        return self.get_pages(f"/repos/{gh_repo}/issues/{issue_number}/comments")
+
+    def add_comment(self, gh_repo: str, issue_number: int, body: str) -> Dict:
+        """
+        Comments on a GH issue.
+
+        :param gh_repo: GitHub repository path.
+        :param issue_number: Number of the issue.
+        :param body: Markdown content of the comment.
+        :return: Created comment.
+        """
+        response = self.request("POST", f"/repos/{gh_repo}/issues/{issue_number}/comments", json_data={"body": body})
+        if response.status_code != 201:
+            raise ValueError(f"Failed to comment on GH issue '#{issue_number}': {response.status_code}, {response.text}")
+        return response.json()
+
+    def save_cache(self):
+        """
+        Writes the response cache to disk, if any.
+        """
+        if self.cache:
+            self.cache.save()
+
+def build_issue_index(issues: List[Dict], id_regex: str = SOP_ID_REGEX) -> Dict[str, Dict]:
+    """
+    Indexes issues by the SOP identifiers in their titles. If several issues mention the same SOP, the first one is kept.
+
+    :param issues: List of issues (e.g., from 'GitHubClient.list_issues').
+    :param id_regex: Regular expression of the identifiers.
+    :return: Issue of each SOP identifier.
+    """
+    index = {}
+    for issue in issues:
+        for sop_id in re.findall(id_regex, issue.get('title') or ''):
+            index.setdefault(sop_id, issue)
+    return index
@@ -0,0 +1,401 @@
+import os
+import re
+import json
+import time
+import random
+import hashlib
+import argparse
+import threading
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Dict, Any, Tuple
+from urllib.parse import urlsplit, parse_qs, urlencode, unquote
+
+# Prefix of the API paths, as in GitHub Enterprise (i.e., the API and the web server share the same host)
+API_PREFIX = "/api/v3"
+
+ISSUES_PATH_RE = re.compile(r'^/repos/([^/]+)/([^/]+)/issues$')
+ISSUE_PATH_RE = re.compile(r'^/repos/([^/]+)/([^/]+)/issues/(\d+)$')
+COMMENTS_PATH_RE = re.compile(r'^/repos/([^/]+)/([^/]+)/issues/(\d+)/comments$')
+BLOB_PATH_RE = re.compile(r'^/([^/]+)/([^/]+)/(?:blob|tree)/([^/]+)(?:/(.*))?$')
+
+class StubState:
+    def __init__(self, issues: List[Dict] = None, blob_root: str = None, latency: float = 0, jitter: float = 0,
+                 error_rate: float = 0, secondary_rate_limit_rate: float = 0, rate_limit: int = 5000,
+                 rate_limit_window: float = 3600, seed: int = 0):
+        """
+        State of the local stand-in of the GitHub API and web server: its issues, the files behind its blob/tree URLs,
+        its rate limit, the latency and errors it injects, and counters of the requests it served.
+
+        :param issues: Issues of every repository, as {'title': ..., 'body': ..., 'labels': [...], 'state': ...} (optional).
+        :param blob_root: Directory that blob/tree URLs are resolved against, regardless of their owner, repository and
+            branch (optional). Without it, all blob/tree URLs exist.
+        :param latency: Seconds added to every response.
+        :param jitter: Maximum random seconds added on top of the latency.
+        :param error_rate: Fraction of requests answered with a '502 Bad Gateway'.
+        :param secondary_rate_limit_rate: Fraction of API requests answered with a secondary rate limit ('403' with 'Retry-After').
+        :param rate_limit: Number of API requests allowed per window (primary rate limit). 304 responses don't count.
+        :param rate_limit_window: Seconds of each rate limit window.
+        :param seed: Seed of the random latency and errors, so that runs are reproducible.
+        """
+        self.blob_root = os.path.abspath(blob_root) if blob_root else None
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.secondary_rate_limit_rate = secondary_rate_limit_rate
+        self.rate_limit = rate_limit
+        self.rate_limit_window = rate_limit_window
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+
+        self.issues: Dict[int, Dict] = {}
+        self.comments: Dict[int, List[Dict]] = {}
+        for issue in issues or []:
+            self.add_issue(issue)
+        self.rate_limit_used = 0
+        self.rate_limit_reset = time.time() + rate_limit_window
+        self.stats = {"requests": 0, "not_modified": 0, "errors": 0, "rate_limited": 0, "created": 0, "updated": 0, "comments": 0}
+
+    def add_issue(self, fields: Dict) -> Dict:
+        """
+        Adds an issue, numbered after the last one.
+
+        :param fields: Fields of the issue (e.g., {'title': ..., 'body': ..., 'labels': ['SOP-Review']}).
+        :return: The added issue.
+        """
+        with self.lock:
+            number = max(self.issues, default=0) + 1
+            now = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+            issue = {
+                "number": number, "title": fields.get("title", ""), "body": fields.get("body"), "state": fields.get("state", "open"),
+                "labels": [{"name": label} for label in fields.get("labels", [])], "created_at": now, "updated_at": now
+            }
+            if fields.get("pull_request"):
+                issue["pull_request"] = {}
+            self.issues[number] = issue
+            return issue
+
+    def take_request(self) -> Tuple[bool, int]:
+        """
+        Takes one request from the primary rate limit, starting a new window once the current one is over.
+
+        :return: Whether the request is allowed, and the number of requests left in the window.
+        """
+        with self.lock:
+            if time.time() >= self.rate_limit_reset:
+                self.rate_limit_used = 0
+                self.rate_limit_reset = time.time() + self.rate_limit_window
+            if self.rate_limit_used >= self.rate_limit:
+                return False, 0
+            self.rate_limit_used += 1
+            return True, self.rate_limit - self.rate_limit_used
+
+    def draw(self, rate: float) -> bool:
+        """
+        Draws whether an injected event (e.g., an error) happens, with the given probability.
+        """
+        with self.lock:
+            return rate > 0 and self.random.random() < rate
+
+    def delay(self) -> float:
+        """
+        Draws the latency of a response, in seconds.
+        """
+        with self.lock:
+            return self.latency + (self.random.uniform(0, self.jitter) if self.jitter else 0)
+
+    def count(self, name: str):
+        with self.lock:
+            self.stats[name] += 1
+
+class StubRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive, so that pooled sessions reuse their connections
+    disable_nagle_algorithm = True  # Headers and body are written separately, which would otherwise wait for delayed ACKs
+    server: "StubServer"
+
+    def log_message(self, format: str, *args: Any):
+        if self.server.verbosity > 1:
+            super().log_message(format, *args)
+
+    def do_GET(self):
+        self.handle_request("GET")
+
+    def do_HEAD(self):
+        self.handle_request("HEAD")
+
+    def do_POST(self):
+        self.handle_request("POST")
+
+    def do_PATCH(self):
+        self.handle_request("PATCH")
+
+    def handle_request(self, method: str):
+        """
+        Routes a request to the API (paths starting with '/api/v3') or to the blob/tree URLs of the web server,
+        after injecting the latency and the errors.
+        """
+        state = self.server.state
+        state.count("requests")
+        url = urlsplit(self.path)
+        path = unquote(url.path)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        body = self.read_body()
+
+        delay = state.delay()
+        if delay:
+            time.sleep(delay)
+        if state.draw(state.error_rate):
+            state.count("errors")
+            return self.send_json(502, {"message": "Server Error (injected)"})
+
+        if path == "/_stub/stats":
+            with state.lock:
+                return self.send_json(200, dict(state.stats, issues=len(state.issues)))
+        if not path.startswith(API_PREFIX + "/"):
+            return self.handle_blob(method, path)
+
+        path = path[len(API_PREFIX):]
+        if state.draw(state.secondary_rate_limit_rate):
+            state.count("rate_limited")
+            return self.send_json(403, {"message": "You have exceeded a secondary rate limit (injected)"}, {"Retry-After": "1"})
+
+        if method == "GET" and ISSUES_PATH_RE.match(path):
+            return self.list_issues(path, query)
+        allowed, remaining = state.take_request()
+        rate_headers = {"X-RateLimit-Limit": str(state.rate_limit), "X-RateLimit-Remaining": str(remaining), "X-RateLimit-Reset": str(int(state.rate_limit_reset))}
+        if not allowed:
+            state.count("rate_limited")
+            return self.send_json(403, {"message": "API rate limit exceeded"}, rate_headers)
+
+        if method == "POST" and ISSUES_PATH_RE.match(path):
+            issue = state.add_issue(body)
+            state.count("created")
+            return self.send_json(201, self.with_urls(issue, path), rate_headers)
+        match = ISSUE_PATH_RE.match(path)
+        if match and method in ("GET", "PATCH"):
+            with state.lock:
+                issue = state.issues.get(int(match.group(3)))
+                if issue and method == "PATCH":
+                    issue.update({key: value for key, value in body.items() if key in ("title", "body", "state", "state_reason")})
+                    if "labels" in body:
+                        issue["labels"] = [{"name": label} for label in body["labels"]]
+                    issue["updated_at"] = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+            if not issue:
+                return self.send_json(404, {"message": "Not Found"}, rate_headers)
+            if method == "PATCH":
+                state.count("updated")
+            return self.send_json(200, self.with_urls(issue, path.rsplit('/', 1)[0]), rate_headers)
+        match = COMMENTS_PATH_RE.match(path)
+        if match and method == "GET":
+            with state.lock:
+                comments = list(state.comments.get(int(match.group(3)), [])) if int(match.group(3)) in state.issues else None
+            if comments is None:
+                return self.send_json(404, {"message": "Not Found"}, rate_headers)
+            return self.send_json(200, comments, rate_headers)
+        if match and method == "POST":
+            with state.lock:
+                if int(match.group(3)) not in state.issues:
+                    issue = None
+                else:
+                    issue = state.issues[int(match.group(3))]
+                    comment = {"id": sum(len(comments) for comments in state.comments.values()) + 1, "body": body.get("body")}
+                    state.comments.setdefault(issue["number"], []).append(comment)
+            if not issue:
+                return self.send_json(404, {"message": "Not Found"}, rate_headers)
+            state.count("comments")
+            return self.send_json(201, comment, rate_headers)
+        return self.send_json(404, {"message": "Not Found"}, rate_headers)
+
+    def list_issues(self, path: str, query: Dict[str, str]):
+        """
+        Lists the issues of a repository, filtered by state and labels, one page at a time ('page' and 'per_page',
+        with the 'Link' header). Pages are answered with an ETag, and with '304 Not Modified' to conditional requests
+        with the same one, which don't count against the rate limit.
+        """
+        state = self.server.state
+        page = max(int(query.get("page", 1)), 1)
+        per_page = min(max(int(query.get("per_page", 30)), 1), 100)
+        labels = {label for label in query.get("labels", "").split(",") if label}
+        issue_state = query.get("state", "open")
+        with state.lock:
+            issues = [
+                issue for _, issue in sorted(state.issues.items(), reverse=True)  # Newest first, as in GitHub
+                if issue_state in ("all", issue["state"]) and labels <= {label["name"] for label in issue["labels"]}
+            ]
+        n_pages = max((len(issues) + per_page - 1) // per_page, 1)
+        data = [self.with_urls(issue, path) for issue in issues[(page - 1) * per_page:page * per_page]]
+        content = json.dumps(data).encode('utf-8')
+        etag = f'"{hashlib.sha256(content).hexdigest()[:32]}"'
+
+        links = {}
+        base_url = f"http://{self.headers.get('Host')}{API_PREFIX}{path}"
+        for rel, number in [("prev", page - 1), ("next", page + 1), ("first", 1), ("last", n_pages)]:
+            if 1 <= number <= n_pages and (rel in ("prev", "next") or page != number):
+                links[rel] = f"{base_url}?{urlencode(dict(query, page=number, per_page=per_page))}"
+        headers = {"ETag": etag}
+        if links:
+            headers["Link"] = ", ".join(f'<{url}>; rel="{rel}"' for rel, url in links.items())
+
+        if self.headers.get("If-None-Match") == etag:
+            state.count("not_modified")
+            return self.send_json(304, None, headers)
+        allowed, remaining = state.take_request()
+        headers.update({"X-RateLimit-Limit": str(state.rate_limit), "X-RateLimit-Remaining": str(remaining), "X-RateLimit-Reset": str(int(state.rate_limit_reset))})
+        if not allowed:
+            state.count("rate_limited")
+            return self.send_json(403, {"message": "API rate limit exceeded"}, {key: value for key, value in headers.items() if key.startswith("X-")})
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(content)))
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(content)
+
+    def handle_blob(self, method: str, path: str):
+        """
+        Answers the blob/tree URLs of the web server (e.g., '/owner/repo/blob/main/README.md'), with '200' if the file
+        exists in the blob root (or if there's no blob root), and '404' otherwise.
+        """
+        match = BLOB_PATH_RE.match(path)
+        blob_root = self.server.state.blob_root
+        exists = bool(match)
+        if match and blob_root:
+            relative_path = os.path.normpath((match.group(4) or '').strip('/') or '.')
+            exists = not relative_path.startswith('..') and os.path.exists(os.path.join(blob_root, relative_path))
+        content = b"" if method == "HEAD" else (b"OK" if exists else b"Not Found")
+        self.send_response(200 if exists else 404)
+        self.send_header("Content-Type", "text/plain")
+        self.send_header("Content-Length", "2" if exists else "9")
+        self.end_headers()
+        self.wfile.write(content)
+
+    def with_urls(self, issue: Dict, issues_path: str) -> Dict:
+        """
+        Adds the API and web URLs of an issue (based on the host of the request).
+        """
+        host = self.headers.get('Host')
+        owner_repo = issues_path[len("/repos/"):-len("/issues")]
+        return dict(issue, url=f"http://{host}{API_PREFIX}{issues_path}/{issue['number']}", html_url=f"http://{host}/{owner_repo}/issues/{issue['number']}")
+
+    def read_body(self) -> Dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return {}
+        try:
+            return json.loads(self.rfile.read(length))
+        except ValueError:
+            return {}
+
+    def send_json(self, status: int, data: Any, headers: Dict[str, str] = None):
+        content = b"" if data is None else json.dumps(data).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(content)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(content)
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, state: StubState, host: str = "127.0.0.1", port: int = 0, verbosity: int = 0):
+        """
+        Local stand-in of the GitHub API and web server, to test and benchmark the scripts offline. Point the scripts at it
+        with 'GITHUB_API_URL' and 'GITHUB_SERVER_URL' (see 'api_url' and 'server_url'), or with their command-line flags.
+        Implemented endpoints:
+            - GET/POST '/api/v3/repos/{owner}/{repo}/issues' (with 'state', 'labels', 'page' and 'per_page')
+            - GET/PATCH '/api/v3/repos/{owner}/{repo}/issues/{number}'
+            - GET/POST '/api/v3/repos/{owner}/{repo}/issues/{number}/comments' (comments are listed in a single page)
+            - HEAD/GET '/{owner}/{repo}/blob/{branch}/{path}' (and 'tree')
+            - GET '/_stub/stats' (counters of the served requests)
+
+        :param state: State of the server (issues, blob root, rate limit, injected latency and errors).
+        :param host: Host to listen on.
+        :param port: Port to listen on (0 picks a free one).
+        :param verbosity: Level of verbosity for output messages (2 logs every request).
+        """
+        self.state = state
+        self.verbosity = verbosity
+        super().__init__((host, port), StubRequestHandler)
+
+    @property
+    def server_url(self) -> str:
+        return f"http://{self.server_address[0]}:{self.server_address[1]}"
+
+    @property
+    def api_url(self) -> str:
+        return self.server_url + API_PREFIX
+
+    def start(self) -> "StubServer":
+        """
+        Serves requests in a background thread (e.g., within a benchmark). Stop it with 'shutdown'.
+        """
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+def generate_issues(n_issues: int, labels: List[str] = None, start: int = 1) -> List[Dict]:
+    """
+    Generates synthetic SOP review issues, one per SOP ID (e.g., "[SOP Review] Review due: 'GDI-SOP0001_synthetic-sop.md'").
+
+    :param n_issues: Number of issues.
+    :param labels: Labels of the issues (default: ['SOP-Review']).
+    :param start: First SOP number.
+    :return: Fields of the issues.
+    """
+    return [
+        {"title": f"[SOP Review] Review due: 'GDI-SOP{number:04d}_synthetic-sop.md'", "body": "Synthetic issue", "labels": list(labels or ["SOP-Review"])}
+        for number in range(start, start + n_issues)
+    ]
+
+def parse_args() -> Any:
+    """
+    Parses command-line arguments.
+
+    :return: Parsed arguments.
+    """
+    parser = argparse.ArgumentParser(description="Local stand-in of the GitHub API (issues) and web server (blob/tree URLs), to test and benchmark the scripts offline")
+    parser.add_argument("--host", type=str, default="127.0.0.1", help="Host to listen on (default: '127.0.0.1')")
+    parser.add_argument("-p", "--port", type=int, default=8000, help="Port to listen on (default: 8000)")
+    parser.add_argument("--issues", type=int, default=0, help="Number of synthetic open 'SOP-Review' issues to start with (default: 0)")
+    parser.add_argument("--issues-file", type=str, help="JSON file with a list of issues to start with (e.g., [{\"title\": ..., \"body\": ..., \"labels\": [...]}])")
+    parser.add_argument("--blob-root", type=str, help="Directory that blob/tree URLs are resolved against (e.g., '.'). Without it, all blob/tree URLs exist")
+    parser.add_argument("--latency", type=float, default=0, help="Seconds added to every response (default: 0)")
+    parser.add_argument("--jitter", type=float, default=0, help="Maximum random seconds added on top of the latency (default: 0)")
+    parser.add_argument("--error-rate", type=float, default=0, help="Fraction of requests answered with a '502' (default: 0)")
+    parser.add_argument("--secondary-rate-limit-rate", type=float, default=0, help="Fraction of API requests answered with a secondary rate limit (default: 0)")
+    parser.add_argument("--rate-limit", type=int, default=5000, help="API requests allowed per rate limit window (default: 5000)")
+    parser.add_argument("--rate-limit-window", type=float, default=3600, help="Seconds of each rate limit window (default: 3600)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the random latency and errors (default: 0)")
+    parser.add_argument("-v", "--verbosity", type=int, default=1, help="Verbosity level (0-2). 0 prints nothing; 1 prints the URLs to use; 2 logs every request")
+    return parser.parse_args()
+
+def main():
+    """
+    Main function to run the stand-in server until interrupted.
+    """
+    args = parse_args()
+    issues = generate_issues(args.issues)
+    if args.issues_file:
+        with open(args.issues_file, 'r') as file:
+            issues += json.load(file)
+    state = StubState(
+        issues=issues, blob_root=args.blob_root, latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+        secondary_rate_limit_rate=args.secondary_rate_limit_rate, rate_limit=args.rate_limit,
+        rate_limit_window=args.rate_limit_window, seed=args.seed
+    )
+    server = StubServer(state, host=args.host, port=args.port, verbosity=args.verbosity)
+    if args.verbosity > 0:
+        print(f"Serving a GitHub stand-in with '{len(state.issues)}' issues. Point the scripts at it with:")
+        print(f"  export GITHUB_API_URL={server.api_url} GITHUB_SERVER_URL={server.server_url}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
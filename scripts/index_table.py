@@ -0,0 +1,226 @@
+import io
+import re
+import csv
+import json
+import math
+from typing import List, Dict, Any, Iterator, Iterable, TextIO
+
+try:
+    from wcwidth import wcswidth as _width  # Same as 'tabulate', counting wide characters (e.g., emojis) as 2 columns
+except ImportError:
+    _width = len
+
+# Numbers with thousands separators (e.g., '1,000.5'), also parsed as numbers in the Markdown table
+THOUSANDS_NUMBER_PATTERN = re.compile(r"^(([+-]?[0-9]{1,3})(?:,([0-9]{3}))*)?(?(1)\.[0-9]*|\.[0-9]+)?$")
+
+class IndexTable:
+    def __init__(self, columns: List[str] = None, rows: List[Dict[str, Any]] = None):
+        """
+        Lightweight row-store table of the SOP index (i.e., a list of records sharing the same columns), with writers
+        of its Markdown, CSV and JSON formats. Outputs are the same as the ones of pandas' 'to_markdown' (i.e., 'tabulate'
+        pipe tables), 'to_csv' and 'to_json', without depending on them.
+
+        :param columns: Names of the columns, in order (optional, the keys of the first row by default).
+        :param rows: Rows of the table, as {column: value} (optional).
+        """
+        self.rows: List[Dict[str, Any]] = list(rows or [])
+        self.columns: List[str] = list(columns) if columns is not None else list(self.rows[0]) if self.rows else []
+
+    @classmethod
+    def from_records(cls, records: Iterable[Dict[str, Any]]) -> "IndexTable":
+        """
+        Creates a table from a list of records, with the columns of all of them in order of appearance.
+
+        :param records: Rows of the table, as {column: value}.
+        :return: Table of the records.
+        """
+        rows = list(records)
+        columns = list(dict.fromkeys(column for row in rows for column in row))
+        return cls(columns, rows)
+
+    @property
+    def empty(self) -> bool:
+        return not self.rows
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return iter(self.rows)
+
+    def __str__(self) -> str:
+        return self.to_markdown()
+
+    def column(self, name: str) -> List[Any]:
+        """
+        Returns the values of a column (None where missing).
+        """
+        return [row.get(name) for row in self.rows]
+
+    def sort_by(self, column: str):
+        """
+        Sorts the rows by the values of a column, in place. Sorting is stable, and rows missing the value go last.
+        """
+        self.rows.sort(key=lambda row: (row.get(column) is None, row.get(column) if row.get(column) is not None else ""))
+
+    def iter_markdown(self) -> Iterator[str]:
+        """
+        Generates the lines of the table in Markdown format, as a pipe table with cells padded to the width of each column.
+        Numeric columns are right-aligned, and the rest left-aligned.
+        """
+        header_widths = [_width(column) + 2 for column in self.columns]
+        if not self.rows:
+            yield "| " + " | ".join(pad(column, width, "left") for column, width in zip(self.columns, header_widths)) + " |"
+            yield "|" + "|".join("-" * (width + 2) for width in header_widths) + "|"
+            return
+
+        columns_cells = []
+        aligns = []
+        for column in self.columns:
+            values = self.column(column)
+            column_type = get_column_type(values)
+            cells = [format_cell(value, column_type) for value in values]
+            if column_type in (int, float):
+                aligns.append("right")
+                # Decimal points are aligned (i.e., padding with trailing spaces)
+                decimals = [get_decimals(cell) for cell in cells]
+                cells = [cell + " " * (max(decimals) - cell_decimals) for cell, cell_decimals in zip(cells, decimals)]
+            else:
+                aligns.append("left")
+                cells = [cell.strip() for cell in cells]
+            columns_cells.append(cells)
+
+        widths = [max(header_width, *(_width(cell) for cell in cells)) for header_width, cells in zip(header_widths, columns_cells)]
+        yield "| " + " | ".join(pad(column, width, align) for column, width, align in zip(self.columns, widths, aligns)) + " |"
+        yield "|" + "|".join(":" + "-" * (width + 1) if align == "left" else "-" * (width + 1) + ":" for width, align in zip(widths, aligns)) + "|"
+        for row_cells in zip(*columns_cells):
+            yield "| " + " | ".join(pad(cell, width, align) for cell, width, align in zip(row_cells, widths, aligns)) + " |"
+
+    def iter_csv(self) -> Iterator[str]:
+        """
+        Generates the lines of the table in CSV format (with header, minimal quoting and '\\n' line endings).
+        """
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+        for row in [self.columns] + [[row.get(column) for column in self.columns] for row in self.rows]:
+            writer.writerow(["" if value is None else value for value in row])
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    def iter_json(self) -> Iterator[str]:
+        """
+        Generates the table in JSON format, as a list of records, one record at a time. Like pandas, separators have
+        no spaces, non-ASCII characters and slashes are escaped, and records are indented by 2 spaces.
+        """
+        if not self.rows:
+            yield "[]"
+            return
+        for i, row in enumerate(self.rows):
+            record = json.dumps({column: row.get(column) for column in self.columns}, indent=2, separators=(",", ":"))
+            yield ("[\n" if i == 0 else ",\n") + "\n".join("  " + line for line in record.replace("/", "\\/").splitlines())
+        yield "\n]"
+
+    def to_markdown(self) -> str:
+        return "\n".join(self.iter_markdown())
+
+    def to_csv(self) -> str:
+        return "".join(self.iter_csv())
+
+    def to_json(self) -> str:
+        return "".join(self.iter_json())
+
+    def write(self, stream: TextIO, output_format: str = "markdown"):
+        """
+        Writes the table to a stream in the given format, without building the whole output in memory first.
+
+        :param stream: Stream to write to (e.g., a file).
+        :param output_format: Format of the output table ('markdown', 'csv', 'json').
+        """
+        if output_format == "markdown":
+            for i, line in enumerate(self.iter_markdown()):
+                stream.write(("\n" if i else "") + line)
+        elif output_format == "csv":
+            stream.writelines(self.iter_csv())
+        elif output_format == "json":
+            stream.writelines(self.iter_json())
+        else:
+            raise ValueError(f"Unknown output format '{output_format}'. It should be any of 'markdown', 'csv' or 'json'")
+
+    def to_dataframe(self) -> "pandas.DataFrame":
+        """
+        Converts the table into a pandas DataFrame (pandas is an optional dependency, only needed here).
+        """
+        import pandas as pd
+        return pd.DataFrame(self.rows, columns=self.columns)
+
+def get_cell_type(value: Any) -> type:
+    """
+    Gets the type of a cell value for the Markdown table, parsing numbers from strings (e.g., '1.50' is a float).
+    Empty values are of type None, so that they do not change the type of the column.
+
+    :param value: Cell value.
+    :return: None, bool, int, float or str.
+    """
+    if value is None or value == "":
+        return None
+    if isinstance(value, bool) or value in ("True", "False"):
+        return bool
+    if isinstance(value, int) or (isinstance(value, str) and (is_convertible(int, value) or (THOUSANDS_NUMBER_PATTERN.match(value) and "." not in value))):
+        return int
+    if isinstance(value, float) or (isinstance(value, str) and (is_number(value) or THOUSANDS_NUMBER_PATTERN.match(value))):
+        return float
+    return str
+
+def get_column_type(values: List[Any]) -> type:
+    """
+    Gets the most generic type of the values of a column (None < bool < int < float < str).
+    """
+    order = [None, bool, int, float, str]
+    return max((get_cell_type(value) for value in values), key=order.index, default=None)
+
+def is_convertible(conversion: type, value: str) -> bool:
+    try:
+        conversion(value)
+        return True
+    except (ValueError, TypeError):
+        return False
+
+def is_number(value: str) -> bool:
+    """
+    Checks if a string is a number, excluding the ones overflowing to infinity (e.g., '1e999', but not 'inf' itself).
+    """
+    if not is_convertible(float, value):
+        return False
+    number = float(value)
+    return not (math.isinf(number) or math.isnan(number)) or value.lower() in ["inf", "-inf", "nan"]
+
+def format_cell(value: Any, column_type: type) -> str:
+    """
+    Formats a cell value according to the type of its column (e.g., floats in the shortest notation, '1.50' as '1.5').
+    """
+    if value is None or value == "":
+        return ""
+    if column_type is float:
+        try:
+            return format(float(value.replace(",", "") if isinstance(value, str) else value), "g")
+        except (ValueError, TypeError):
+            return f"{value}"
+    return f"{value}"
+
+def get_decimals(cell: str) -> int:
+    """
+    Gets the number of characters after the decimal point of a formatted number (-1 if none).
+    """
+    if not (is_number(cell) or THOUSANDS_NUMBER_PATTERN.match(cell)) or is_convertible(int, cell):
+        return -1
+    position = cell.rfind(".")
+    position = cell.lower().rfind("e") if position < 0 else position
+    return len(cell) - position - 1 if position >= 0 else -1
+
+def pad(cell: str, width: int, align: str) -> str:
+    """
+    Pads a cell to the given visible width, to the right (left-aligned) or to the left (right-aligned).
+    """
+    padding = " " * max(width - _width(cell), 0)
+    return cell + padding if align == "left" else padding + cell
@@ -0,0 +1,354 @@
+import os
+import re
+import json
+import time
+import subprocess
+import tempfile
+import threading
+from email.utils import parsedate_to_datetime
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Optional, TYPE_CHECKING
+from urllib.parse import urlsplit, unquote
+from gh_client import get_server_url, to_server_url
+
+# The network stack is only imported once a request is made, so that offline runs don't load it
+if TYPE_CHECKING:
+    import requests
+
+# Response statuses that are worth retrying (i.e., rate limiting and server-side errors)
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+class LinkCache:
+    def __init__(self, path: str, positive_ttl_days: float = 7, negative_ttl_days: float = 1):
+        """
+        On-disk cache of the resolution of remote links across runs. For each URL, it stores its response status,
+        whether it is resolvable, when it was checked, and its validators (ETag/Last-Modified) to revalidate it
+        with a conditional request once it becomes stale.
+
+        :param path: Path to the JSON file of the cache (e.g., '.links-cache.json').
+        :param positive_ttl_days: Days during which resolvable links are not checked again.
+        :param negative_ttl_days: Days during which unresolvable links are not checked again.
+        """
+        self.path = path
+        self.positive_ttl_seconds = positive_ttl_days * 24 * 60 * 60
+        self.negative_ttl_seconds = negative_ttl_days * 24 * 60 * 60
+        self._lock = threading.Lock()
+        try:
+            with open(path, 'r') as file:
+                self.entries: Dict[str, Dict] = json.load(file)
+        except (OSError, ValueError):
+            # A missing or corrupted cache is just an empty one
+            self.entries = {}
+
+    def get(self, url: str) -> Optional[Dict]:
+        """
+        Gets the cache entry of a URL.
+
+        :param url: The URL.
+        :return: Cache entry, or None if the URL is not cached.
+        """
+        with self._lock:
+            return self.entries.get(url)
+
+    def is_fresh(self, entry: Dict) -> bool:
+        """
+        Checks if a cache entry can be used without checking its URL again (i.e., its TTL has not expired).
+
+        :param entry: Cache entry.
+        :return: True if fresh, False if stale.
+        """
+        ttl = self.positive_ttl_seconds if entry["resolvable"] else self.negative_ttl_seconds
+        return time.time() - entry["checked_at"] <= ttl
+
+    def put(self, url: str, response: "requests.Response"):
+        """
+        Stores the resolution of a URL from the response to its request.
+
+        :param url: The URL.
+        :param response: Final response (after redirects) to the request of the URL.
+        """
+        entry = {
+            "status": response.status_code,
+            "resolvable": response.status_code != 404,
+            "checked_at": time.time(),
+            "etag": response.headers.get('ETag'),
+            "last_modified": response.headers.get('Last-Modified')
+        }
+        with self._lock:
+            self.entries[url] = entry
+
+    def touch(self, url: str):
+        """
+        Marks a cached URL as checked now (i.e., after a successful revalidation).
+
+        :param url: The URL.
+        """
+        with self._lock:
+            self.entries[url] = dict(self.entries[url], checked_at=time.time())
+
+    def save(self):
+        """
+        Writes the cache to disk. The file is written to a temporary file first and then atomically moved into place.
+        """
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w') as file:
+                with self._lock:
+                    json.dump(self.entries, file, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+class LocalRepositoryResolver:
+    def __init__(self, root: str, repository: str = "GenomicDataInfrastructure/standard-operating-procedures", branch: str = "main", git_ref: str = None):
+        """
+        Resolves the GitHub blob/tree URLs of a repository and branch against its local checkout, without any request.
+
+        :param root: Path to the root of the local checkout.
+        :param repository: GitHub repository whose URLs are resolved locally (e.g., 'GenomicDataInfrastructure/standard-operating-procedures').
+        :param branch: Branch whose URLs are resolved locally (e.g., 'main').
+        :param git_ref: Git reference (e.g., 'origin/main') to resolve the URLs against, instead of the working tree (optional).
+        """
+        self.root = os.path.abspath(root)
+        self.git_ref = git_ref
+        # Owner and repository names are case-insensitive in GitHub, branch names are not
+        self.url_regex = re.compile(
+            rf'^https://github\.com/{re.escape(repository)}/(?:blob|tree)/(?-i:{re.escape(branch)})(?:/([^?#]*))?(?:[?#].*)?$',
+            re.IGNORECASE
+        )
+
+    def relative_path(self, url: str) -> Optional[str]:
+        """
+        Gets the path within the repository that a URL points to, if it is a blob/tree URL of the repository and branch.
+
+        :param url: The URL.
+        :return: Path relative to the repository root ('.' for the root itself), or None if the URL is not a local one.
+        """
+        match = self.url_regex.match(url)
+        if not match:
+            return None
+        return os.path.normpath(unquote(match.group(1) or '').strip('/') or '.')
+
+    def resolve(self, url: str) -> Optional[bool]:
+        """
+        Resolves a URL against the local checkout, if it points to a file or directory of the repository and branch.
+
+        :param url: The URL to check.
+        :return: True if the file or directory exists, False if not, or None if the URL is not a local one.
+        """
+        relative_path = self.relative_path(url)
+        if relative_path is None:
+            return None
+        if relative_path == '..' or relative_path.startswith('..' + os.sep) or os.path.isabs(relative_path):
+            return False  # Outside of the repository
+
+        if self.git_ref:
+            object_name = f"{self.git_ref}:" if relative_path == '.' else f"{self.git_ref}:{relative_path.replace(os.sep, '/')}"
+            result = subprocess.run(['git', 'cat-file', '-e', object_name], cwd=self.root, capture_output=True)
+            return result.returncode == 0
+        return os.path.exists(os.path.join(self.root, relative_path))
+
+class RemoteLinkChecker:
+    def __init__(self, max_workers: int = 8, per_host_limit: int = 4, timeout: float = 10, max_retries: int = 3,
+                 backoff_factor: float = 0.5, max_backoff: float = 30, request_budget: int = 1000,
+                 session: "requests.Session" = None, cache: LinkCache = None, offline: bool = False,
+                 local_resolver: LocalRepositoryResolver = None, server_url: str = None, verbosity: int = 0):
+        """
+        Checks whether remote links are resolvable, resolving each unique link only once per run.
+        Links are resolved concurrently over a pooled HTTP session, with a limit of concurrent requests per host,
+        timeouts, retries with exponential backoff on rate limiting or server-side errors, and a maximum number
+        of requests per run.
+
+        :param max_workers: Maximum number of links resolved at the same time.
+        :param per_host_limit: Maximum number of concurrent requests to the same host.
+        :param timeout: Timeout (in seconds) of each request.
+        :param max_retries: Maximum number of retries of each link.
+        :param backoff_factor: Base delay (in seconds) between retries, doubled on every retry.
+        :param max_backoff: Maximum delay (in seconds) between retries, including the ones requested by the server.
+        :param request_budget: Maximum number of requests made by the checker.
+        :param session: HTTP session to reuse (optional).
+        :param cache: Cache of the links checked in previous runs (optional).
+        :param offline: Whether to answer only from the cache, without making any request.
+        :param local_resolver: Resolver of the links to the local repository, checked without any request (optional).
+        :param server_url: Base URL of the GitHub web server the GitHub links are requested from (optional, see 'gh_client.get_server_url').
+            Links are still cached and reported as written in the SOPs.
+        :param verbosity: Level of verbosity for output messages.
+        """
+        self.max_workers = max_workers
+        self.per_host_limit = per_host_limit
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.request_budget = request_budget
+        self.cache = cache
+        self.offline = offline
+        self.local_resolver = local_resolver
+        self.server_url = get_server_url(server_url)
+        self.verbosity = verbosity
+        self._session = session
+
+        # Resolved links: True if resolvable, False if not, None if it could not be checked (e.g., budget exhausted, still failing after all retries, or not cached in offline mode)
+        self.results: Dict[str, Optional[bool]] = {}
+        self.requests_made = 0
+        self._lock = threading.Lock()
+        self._host_semaphores: Dict[str, threading.BoundedSemaphore] = {}
+
+    @property
+    def session(self) -> "requests.Session":
+        """
+        HTTP session with a connection pool sized for the concurrent requests, created on first use.
+        """
+        with self._lock:
+            if self._session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+                self._session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=self.max_workers, pool_maxsize=self.max_workers)
+                self._session.mount('https://', adapter)
+                self._session.mount('http://', adapter)
+            return self._session
+
+    def check(self, urls: Iterable[str]) -> Dict[str, Optional[bool]]:
+        """
+        Resolves all the given links concurrently, skipping duplicates and links already resolved.
+
+        :param urls: Links to check.
+        :return: Resolution of each of the given links (see 'results').
+        """
+        urls = list(dict.fromkeys(urls))
+        unresolved = [url for url in urls if url not in self.results]
+        if unresolved:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(unresolved))) as executor:
+                for url, resolvable in zip(unresolved, executor.map(self._resolve, unresolved)):
+                    self.results[url] = resolvable
+
+            if self.verbosity > 1:
+                print(f"- Checked '{len(unresolved)}' remote links with '{self.requests_made}' requests in total")
+
+        return {url: self.results[url] for url in urls}
+
+    def is_resolvable(self, url: str) -> Optional[bool]:
+        """
+        Checks if a remote link is resolvable (does not return 404), resolving it if it hasn't been done already.
+
+        :param url: The URL to check.
+        :return: True if resolvable, False if not, or None if it could not be checked.
+        """
+        if url not in self.results:
+            self.check([url])
+        return self.results[url]
+
+    def forget_local_results(self):
+        """
+        Forgets the resolution of the links to the local repository, so that they are resolved again
+        (e.g., after files of the checkout were added, renamed or removed).
+        """
+        if self.local_resolver:
+            self.results = {url: resolvable for url, resolvable in self.results.items() if self.local_resolver.relative_path(url) is None}
+
+    def _host_semaphore(self, url: str) -> threading.BoundedSemaphore:
+        """
+        Gets the semaphore limiting the concurrent requests to the host of the given URL.
+        """
+        host = urlsplit(url).netloc.lower()
+        with self._lock:
+            if host not in self._host_semaphores:
+                self._host_semaphores[host] = threading.BoundedSemaphore(self.per_host_limit)
+            return self._host_semaphores[host]
+
+    def _take_request(self) -> bool:
+        """
+        Takes one request from the budget of the run.
+
+        :return: True if the request can be made, False if the budget is exhausted.
+        """
+        with self._lock:
+            if self.requests_made >= self.request_budget:
+                return False
+            self.requests_made += 1
+            return True
+
+    def _retry_delay(self, attempt: int, response: "requests.Response" = None) -> float:
+        """
+        Computes the delay before retrying a request, honoring the 'Retry-After' header of the response if any.
+
+        :param attempt: Number of the failed attempt (starting at 0).
+        :param response: Response of the failed attempt (optional).
+        :return: Delay in seconds.
+        """
+        delay = self.backoff_factor * (2 ** attempt)
+        retry_after = response.headers.get('Retry-After') if response is not None else None
+        if retry_after:
+            try:
+                delay = float(retry_after)
+            except ValueError:
+                try:
+                    delay = parsedate_to_datetime(retry_after).timestamp() - time.time()
+                except (TypeError, ValueError):
+                    pass
+        return min(max(delay, 0), self.max_backoff)
+
+    def save_cache(self):
+        """
+        Writes the cache of links to disk, if any.
+        """
+        if self.cache:
+            self.cache.save()
+
+    def _resolve(self, url: str) -> Optional[bool]:
+        """
+        Resolves a single link, against the local repository if it points to it, from the cache if its entry is
+        still fresh, or with a HEAD request otherwise. Stale cache entries are revalidated with a conditional request.
+        Only a 404 response makes a link unresolvable.
+
+        :param url: The URL to check.
+        :return: True if resolvable, False if not, or None if it could not be checked (budget exhausted, or still
+            failing after all retries).
+        """
+        if self.local_resolver:
+            resolvable = self.local_resolver.resolve(url)
+            if resolvable is not None:
+                return resolvable
+
+        entry = self.cache.get(url) if self.cache else None
+        if entry and (self.offline or self.cache.is_fresh(entry)):
+            return entry["resolvable"]
+        if self.offline:
+            return None
+
+        headers = {}
+        if entry and entry.get("etag"):
+            headers['If-None-Match'] = entry["etag"]
+        if entry and entry.get("last_modified"):
+            headers['If-Modified-Since'] = entry["last_modified"]
+
+        import requests
+
+        for attempt in range(self.max_retries + 1):
+            if not self._take_request():
+                return None
+            # Only the request itself holds the per-host slot, so other links to the host go on while this one waits to retry
+            with self._host_semaphore(url):
+                try:
+                    response = self.session.head(to_server_url(url, self.server_url), allow_redirects=True, timeout=self.timeout, headers=headers)
+                except requests.RequestException:
+                    response = None  # Timeouts and connection errors are retried as well
+
+            if response is not None and response.status_code not in RETRY_STATUSES:
+                if response.status_code == 304 and entry:
+                    # Not modified since it was cached
+                    self.cache.touch(url)
+                    return entry["resolvable"]
+                if self.cache:
+                    self.cache.put(url, response)
+                return response.status_code != 404
+            if attempt < self.max_retries:
+                time.sleep(self._retry_delay(attempt, response))
+
+        # Still failing after all retries (e.g., timing out or rate limited): it could not be checked, which is not the same as broken
+        return None
@@ -0,0 +1,114 @@
+import os
+import json
+import time
+import hashlib
+import tempfile
+from typing import Dict, Optional
+
+class ParseCache:
+    def __init__(self, cache_dir: str = ".sop-cache", version: str = "", max_size_mb: float = 50, max_age_days: float = 30, verbosity: int = 0):
+        """
+        Content-addressed on-disk cache of the structured data extracted from SOP files.
+        Entries are keyed by the SHA-256 of the file content and the parser/extractor version,
+        so any change to either of them results in a cache miss.
+
+        :param cache_dir: Directory where the cache entries are stored (e.g., '.sop-cache').
+        :param version: Version string of the parser/extractor, part of every cache key.
+        :param max_size_mb: Maximum total size (in MB) of the cache entries kept after eviction.
+        :param max_age_days: Entries not used for this amount of days are evicted.
+        :param verbosity: Level of verbosity for output messages.
+        """
+        self.cache_dir = cache_dir
+        self.version = version
+        self.max_size_bytes = max_size_mb * 1024 * 1024
+        self.max_age_seconds = max_age_days * 24 * 60 * 60
+        self.verbosity = verbosity
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def entry_path(self, content_hash: str) -> str:
+        """
+        Builds the path of the cache entry of the given content hash.
+
+        :param content_hash: SHA-256 hash of the file content.
+        :return: Path to the cache entry file.
+        """
+        key = hashlib.sha256(f"{content_hash}:{self.version}".encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, content_hash: str) -> Optional[Dict]:
+        """
+        Gets the cached data of the given content hash.
+
+        :param content_hash: SHA-256 hash of the file content.
+        :return: Cached data, or None if there is no (valid) cache entry.
+        """
+        path = self.entry_path(content_hash)
+        try:
+            with open(path, 'r') as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            # Missing, evicted in the meantime or corrupted entries are all treated as misses
+            self.misses += 1
+            return None
+
+        try:
+            os.utime(path)  # Keep track of its last use for the eviction policy
+        except OSError:
+            pass
+
+        self.hits += 1
+        return data
+
+    def put(self, content_hash: str, data: Dict):
+        """
+        Stores the data of the given content hash in the cache.
+        The entry is written to a temporary file first and then atomically moved into place,
+        so concurrent readers and writers never see a partially written entry.
+
+        :param content_hash: SHA-256 hash of the file content.
+        :param data: JSON serializable data to store.
+        """
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w') as file:
+                json.dump(data, file)
+            os.replace(tmp_path, self.entry_path(content_hash))
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def evict(self):
+        """
+        Evicts the entries that have not been used for longer than the maximum age, and then
+        the least recently used ones until the cache fits within the maximum size.
+        """
+        now = time.time()
+        entries = []
+        for file_name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, file_name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue  # Removed by a concurrent process
+            # Leftovers of interrupted writes are also cleaned up
+            if file_name.endswith(".json") or now - stat.st_mtime > 60 * 60:
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+        entries.sort()  # Least recently used first
+        total_size = sum(size for _, size, _ in entries)
+        n_evicted = 0
+        for mtime, size, path in entries:
+            if now - mtime <= self.max_age_seconds and total_size <= self.max_size_bytes and path.endswith(".json"):
+                continue
+            try:
+                os.remove(path)
+                n_evicted += 1
+            except OSError:
+                pass
+            total_size -= size
+
+        if self.verbosity > 1:
+            print(f"- Evicted '{n_evicted}' entries from the parse cache at '{self.cache_dir}'")
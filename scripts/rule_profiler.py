@@ -0,0 +1,127 @@
+from typing import List, Dict, Optional
+
+# Key of the records of the corpus-level rules, which are not bound to a single file
+CORPUS_KEY = "(corpus)"
+
+class RuleProfiler:
+    def __init__(self, top: int = 10, budget: float = None, budget_action: str = "warn"):
+        """
+        Accounts the time spent and issues emitted by each linting rule on each file, separately from the
+        time spent parsing each file (read, markdown render, soup, ...), and summarizes it for the whole corpus.
+
+        :param top: Number of slowest rules/files listed in the summary.
+        :param budget: Maximum number of seconds a rule may take on a single file (optional).
+        :param budget_action: Whether exceeding the budget is reported as a 'warn'ing or an error ('fail').
+        """
+        if budget_action not in ["warn", "fail"]:
+            raise ValueError(f"Invalid rule budget action '{budget_action}'. It should be either 'warn' or 'fail'")
+        self.top = top
+        self.budget = budget
+        self.budget_action = budget_action
+        # Per file: parse timings, and calls, seconds and issues of each rule
+        self.records: Dict[str, Dict] = {}
+
+    def options(self) -> Dict:
+        """
+        Returns the options of the profiler, to create an equivalent one (e.g., in a worker process).
+        """
+        return {"top": self.top, "budget": self.budget, "budget_action": self.budget_action}
+
+    def _record(self, file_key: str) -> Dict:
+        return self.records.setdefault(file_key, {"parse": {}, "rules": {}, "budget_exceeded": []})
+
+    def add_rule_call(self, file_key: str, rule_name: str, seconds: float, issues: int) -> bool:
+        """
+        Accounts a call of a rule on a file.
+
+        :param file_key: Path to the SOP file (or CORPUS_KEY for corpus-level rules).
+        :param rule_name: Name of the rule.
+        :param seconds: Seconds spent by the rule (excluding parsing).
+        :param issues: Number of issues emitted by the rule.
+        :return: True if the rule exceeded the time budget, False otherwise.
+        """
+        record = self._record(file_key)
+        rule_record = record["rules"].setdefault(rule_name, {"calls": 0, "seconds": 0, "issues": 0})
+        rule_record["calls"] += 1
+        rule_record["seconds"] += seconds
+        rule_record["issues"] += issues
+
+        if self.budget is not None and seconds > self.budget:
+            record["budget_exceeded"].append({"rule": rule_name, "seconds": seconds})
+            return True
+        return False
+
+    def set_parse_timings(self, file_key: str, timings: Dict[str, float]):
+        """
+        Sets the seconds spent in each parse phase of a file.
+
+        :param file_key: Path to the SOP file.
+        :param timings: Seconds spent in each parse phase (e.g., {'read': 0.001, 'markdown': 0.02}).
+        """
+        self._record(file_key)["parse"] = dict(timings)
+
+    def pop(self, file_key: str) -> Optional[Dict]:
+        """
+        Removes and returns the record of a file (e.g., to send it from a worker process to the main one).
+        """
+        return self.records.pop(file_key, None)
+
+    def merge(self, file_key: str, record: Optional[Dict]):
+        """
+        Adds the record of a file taken from another profiler (see 'pop').
+        """
+        if record is not None:
+            self.records[file_key] = record
+
+    def has_failures(self) -> bool:
+        """
+        Checks if any rule exceeded the time budget, and it should make the linting fail.
+        """
+        return self.budget_action == "fail" and any(record["budget_exceeded"] for record in self.records.values())
+
+    def summary(self) -> Dict:
+        """
+        Summarizes the records of all files: totals per parse phase, per rule and per file, the slowest
+        rules, files and rule calls, and the rule calls exceeding the time budget.
+
+        :return: JSON serializable summary.
+        """
+        parse_seconds = {}
+        rules = {}
+        files = {}
+        rule_calls = []
+        budget_exceeded = []
+        for file_key, record in self.records.items():
+            for phase, seconds in record["parse"].items():
+                parse_seconds[phase] = parse_seconds.get(phase, 0) + seconds
+            for rule_name, rule_record in record["rules"].items():
+                total = rules.setdefault(rule_name, {"calls": 0, "seconds": 0, "issues": 0})
+                for key in total:
+                    total[key] += rule_record[key]
+                rule_calls.append({"rule": rule_name, "file": file_key, "seconds": rule_record["seconds"]})
+            files[file_key] = {
+                "parse_seconds": sum(record["parse"].values()),
+                "rules_seconds": sum(rule_record["seconds"] for rule_record in record["rules"].values()),
+                "issues": sum(rule_record["issues"] for rule_record in record["rules"].values())
+            }
+            budget_exceeded.extend(dict(exceeded, file=file_key) for exceeded in record["budget_exceeded"])
+
+        def top(items: List[Dict], seconds) -> List[Dict]:
+            return sorted(items, key=seconds, reverse=True)[:self.top]
+
+        summary = {
+            "total_seconds": _round(sum(parse_seconds.values()) + sum(rule["seconds"] for rule in rules.values())),
+            "parse_seconds": {phase: _round(seconds) for phase, seconds in parse_seconds.items()},
+            "rules": {name: dict(rule, seconds=_round(rule["seconds"])) for name, rule in rules.items()},
+            "files": {file_key: dict(file, parse_seconds=_round(file["parse_seconds"]), rules_seconds=_round(file["rules_seconds"])) for file_key, file in files.items()},
+            "slowest_rules": [{"rule": name, "seconds": _round(rule["seconds"])} for name, rule in top(list(rules.items()), lambda item: item[1]["seconds"])],
+            "slowest_files": [{"file": file_key, "seconds": _round(file["parse_seconds"] + file["rules_seconds"])} for file_key, file in top(list(files.items()), lambda item: item[1]["parse_seconds"] + item[1]["rules_seconds"])],
+            "slowest_rule_calls": [dict(call, seconds=_round(call["seconds"])) for call in top(rule_calls, lambda call: call["seconds"])],
+        }
+        if self.budget is not None:
+            summary["budget_seconds"] = self.budget
+            summary["budget_exceeded"] = [dict(exceeded, seconds=_round(exceeded["seconds"])) for exceeded in budget_exceeded]
+        return summary
+
+def _round(seconds: float) -> float:
+    return round(seconds, 6)
@@ -0,0 +1,140 @@
+import argparse
+import json
+import shlex
+from typing import List, Dict, Any, Callable
+import sop_linter
+import sop_index
+import compare_index
+import check_sop_reviews
+from utils import collect_sop_files, enable_parse_cache
+
+# Subcommands running each of the scripts on their own, with the same arguments as the standalone script
+SUBCOMMANDS = {
+    "lint": (sop_linter, "Lints SOP markdown files (same as 'sop_linter.py')"),
+    "index": (sop_index, "Generates an index table of SOPs (same as 'sop_index.py')"),
+    "compare": (compare_index, "Compares existing SOP index with a newly generated index (same as 'compare_index.py')"),
+    "reviews": (check_sop_reviews, "Checks if SOP files are due for review (same as 'check_sop_reviews.py')"),
+}
+
+def parse_args() -> Any:
+    """
+    Parses command-line arguments.
+
+    :return: Parsed arguments.
+    """
+    parser = argparse.ArgumentParser(description="Single entry point of the SOP scripts, running any of them or several of them at once ('check')")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    for command, (module, description) in SUBCOMMANDS.items():
+        module.add_arguments(subparsers.add_parser(command, help=description, description=description))
+
+    check_parser = subparsers.add_parser(
+        "check", help="Runs several stages over the same SOPs, parsing each of them only once, and prints a combined report",
+        description="Runs several stages over the same SOPs, parsing each of them only once, and prints a combined report with the exit status of each stage"
+    )
+    check_parser.add_argument(
+        "inputs", nargs="+", help="SOP file(s) or directories to check. Given directories will be explored, looking for markdown files following the SOP naming conventions"
+    )
+    check_parser.add_argument("--lint", action="store_true", help="Lint the SOPs")
+    check_parser.add_argument("--index-compare", type=str, metavar="EXISTING_INDEX", help="Compare the given existing index (e.g., 'sops/README.md') with the one of the SOPs")
+    check_parser.add_argument("--reviews", action="store_true", help="Check if the SOPs are due for review (requires the 'GITHUB_TOKEN' environment variable, unless it's a dry run)")
+    check_parser.add_argument("--lint-args", type=str, default="", help="Extra arguments of the linting stage, as given to 'sop_linter.py' (e.g., \"--skip-rules resolvable-references\")")
+    check_parser.add_argument("--compare-args", type=str, default="", help="Extra arguments of the index comparison stage, as given to 'compare_index.py'")
+    check_parser.add_argument("--reviews-args", type=str, default="", help="Extra arguments of the review stage, as given to 'check_sop_reviews.py' (e.g., \"-dr 180\")")
+    check_parser.add_argument("-v", "--verbosity", type=int, default=0, help="Verbosity level (0-2). 0 prints nothing; 1 prints the combined report; 2 prints the progress of each stage as well")
+    check_parser.add_argument("--cache-dir", type=str, help="Directory of the on-disk parse cache (e.g., '.sop-cache'). If given, unchanged SOPs are not parsed again across runs")
+    return parser.parse_args()
+
+def parse_stage_args(module: Any, arguments: List[str], extra_arguments: str) -> Any:
+    """
+    Parses the arguments of a stage with the parser of its script, as if it was run on its own.
+
+    :param module: Module of the script (e.g., sop_linter).
+    :param arguments: Arguments given by the 'check' subcommand.
+    :param extra_arguments: Extra arguments given by the user, as a single string (they take precedence).
+    :return: Parsed arguments of the stage.
+    """
+    parser = module.add_arguments(argparse.ArgumentParser(prog=module.__name__))
+    return parser.parse_args(arguments + shlex.split(extra_arguments))
+
+def run_stage(name: str, stage: Callable[[], Dict], verbosity: int = 0) -> Dict:
+    """
+    Runs a stage of the 'check' subcommand, turning any exception into a failed stage so that the rest still run.
+
+    :param name: Name of the stage.
+    :param stage: Function running the stage, returning its exit status and report (as {'exit_status': ..., 'report': ...}).
+    :param verbosity: Level of verbosity for output messages.
+    :return: Exit status and report of the stage, or the error that made it fail.
+    """
+    if verbosity > 1:
+        print(f"- Running stage '{name}'")
+    try:
+        return stage()
+    except Exception as e:
+        return {"exit_status": 1, "error": f"{type(e).__name__}: {e}"}
+
+def run_check(args: Any) -> Dict:
+    """
+    Runs the selected stages over the same SOPs. All stages run in this process, so each SOP is read and parsed
+    only once, and every stage is fed from the same in-memory documents.
+
+    :param args: Parsed arguments of the 'check' subcommand.
+    :return: Combined report, with the exit status and report of each stage.
+    """
+    if not (args.lint or args.index_compare or args.reviews):
+        raise ValueError("At least one stage has to be selected (i.e., '--lint', '--index-compare' or '--reviews')")
+    if args.cache_dir:
+        enable_parse_cache(args.cache_dir, verbosity=args.verbosity)
+    common_arguments = list(args.inputs) + ["-v", str(args.verbosity)]
+
+    def lint() -> Dict:
+        # Linting in this process (i.e., '-j 1'), so that the parsed SOPs are kept for the following stages
+        lint_args = parse_stage_args(sop_linter, common_arguments + ["-j", "1", "--output-format", "json"], args.lint_args)
+        report, has_errors = sop_linter.run_linter(lint_args)
+        return {"exit_status": int(has_errors), "report": json.loads(report) if report else None}
+
+    def index_compare() -> Dict:
+        compare_args = parse_stage_args(compare_index, [args.index_compare] + common_arguments, args.compare_args)
+        comparison_results = compare_index.run_comparison(compare_args)
+        return {"exit_status": int(len(comparison_results["differences"]) > 0), "report": comparison_results}
+
+    def reviews() -> Dict:
+        reviews_args = parse_stage_args(check_sop_reviews, common_arguments, args.reviews_args)
+        report = check_sop_reviews.run_review_check(reviews_args)
+        # Issue changes that failed make the stage fail (the dry run has no outcomes)
+        return {"exit_status": int(bool(report["reconciliation"].get("n_failed"))), "report": report}
+
+    stages = {}
+    if args.lint:
+        stages["lint"] = run_stage("lint", lint, args.verbosity)
+    if args.index_compare:
+        stages["index_compare"] = run_stage("index_compare", index_compare, args.verbosity)
+    if args.reviews:
+        stages["reviews"] = run_stage("reviews", reviews, args.verbosity)
+
+    return {
+        "n_input_files": len(collect_sop_files(args.inputs)),
+        "exit_status": max(stage["exit_status"] for stage in stages.values()),
+        "stages": stages
+    }
+
+def main():
+    """
+    Main function to run any of the SOP scripts, or several of them at once.
+    """
+    args = parse_args()
+    if args.command != "check":
+        SUBCOMMANDS[args.command][0].main(args)
+        return
+
+    report = run_check(args)
+    if args.verbosity > 0:
+        print(json.dumps(report, indent=2), "\n")
+
+    # These exit codes will be interpreted downstream
+    exit(report["exit_status"])
+
+if __name__ == "__main__":
+    """
+    To run it as a standalone script besides importing bits of it
+    """
+    main()
@@ -1,41 +1,95 @@
 import argparse
 import os
 import re
-import pandas as pd
-import markdown
-from bs4 import BeautifulSoup
-from typing import List, Dict
-from utils import find_tables, collect_sop_files, count_procedure_steps, build_hyperlink
+import json
+import hashlib
+from typing import List, Dict, Any
+from index_table import IndexTable
+from utils import collect_sop_files, count_procedure_steps_in_headings, build_hyperlink, load_sop, enable_parse_cache, EXTRACTOR_VERSION, ParsedSOP, METADATA_HEADERS, DOCUMENT_HISTORY_HEADERS
+
+# Version of the sidecar file, changed whenever the extracted rows may change (i.e., along with the SOP extractor)
+SIDECAR_VERSION = f"1:{EXTRACTOR_VERSION}"
 
 class SOPIndexGenerator:
-    def __init__(self, verbosity: int = 0):
+    def __init__(self, verbosity: int = 0, sidecar_path: str = None, verify_sidecar: bool = False):
         """
         Initializes the SOPIndexGenerator with verbosity settings.
 
         :param verbosity: Level of verbosity for output messages.
+        :param sidecar_path: Path to a sidecar file written by a previous run (see 'write_sidecar'). Rows of SOPs whose
+            file has not changed since then are taken from it instead of parsing the SOP (optional).
+        :param verify_sidecar: Whether the sidecar can not be trusted (e.g., it was edited in a pull request). If so, all
+            SOPs are parsed, and the rows it records for unchanged files are checked against them (see 'sidecar_mismatches').
         """
         self.verbosity = verbosity
-        self.index_data = pd.DataFrame()
+        self.index_data = IndexTable()
+        # Source file and content hash of the SOP of each row, by identifier
+        self.sources: Dict[str, Dict[str, str]] = {}
+        self.sidecar_rows = self.read_sidecar(sidecar_path) if sidecar_path else {}
+        self.verify_sidecar = verify_sidecar
+        self.n_reused_rows = 0
+        self.sidecar_mismatches: List[str] = []  # SOP files whose row in the sidecar is not the parsed one, despite the same hash
+
+    def read_sidecar(self, sidecar_path: str) -> Dict[str, Dict]:
+        """
+        Reads the rows recorded in a sidecar file, by source file. A missing or outdated sidecar is ignored.
+
+        :param sidecar_path: Path to the sidecar file.
+        :return: Content hash and row of each recorded SOP, as {absolute path: {'hash': ..., 'row': {...}}}.
+        """
+        if not os.path.isfile(sidecar_path):
+            if self.verbosity > 1:
+                print(f"- Sidecar file '{sidecar_path}' not found. All SOPs will be parsed")
+            return {}
+        with open(sidecar_path, 'r') as file:
+            sidecar = json.load(file)
+        if sidecar.get("version") != SIDECAR_VERSION:
+            if self.verbosity > 1:
+                print(f"- Sidecar file '{sidecar_path}' is outdated (version '{sidecar.get('version')}'). All SOPs will be parsed")
+            return {}
+
+        sidecar_dir = os.path.dirname(os.path.abspath(sidecar_path))
+        return {os.path.normpath(os.path.join(sidecar_dir, entry["file"])): entry for entry in sidecar["sops"].values()}
+
+    def get_row(self, file_path: str) -> Dict:
+        """
+        Gets the row of an SOP file, from the sidecar if the file has not changed since it was written, or parsing it otherwise.
 
-    def parse_sop(self, file_path: str) -> Dict:
+        :param file_path: Path to the SOP file.
+        :return: Dictionary of parsed metadata.
+        """
+        # The file is only read once, whether its row is reused or parsed
+        with open(file_path, 'rb') as file:
+            raw_content = file.read()
+        content_hash = hashlib.sha256(raw_content).hexdigest()
+        entry = self.sidecar_rows.get(os.path.abspath(file_path))
+        if entry and entry["hash"] == content_hash and not self.verify_sidecar:
+            row = dict(entry["row"])
+            self.n_reused_rows += 1
+        else:
+            row = self.parse_sop(file_path, raw_content)
+            # Rows are compared as written to the sidecar (i.e., as JSON)
+            if entry and entry["hash"] == content_hash and json.loads(json.dumps(row)) != entry["row"]:
+                self.sidecar_mismatches.append(file_path)
+        self.sources[row["Identifier"]] = {"file": file_path, "hash": content_hash}
+        return row
+
+    def parse_sop(self, file_path: str, raw_content: bytes = None) -> Dict:
         """
         Parses a single SOP file to extract relevant metadata.
 
         :param file_path: Path to the SOP file.
+        :param raw_content: Content of the file, if already read (optional).
         :return: Dictionary of parsed metadata.
         """
         if self.verbosity > 1:
             print(f"-- Parsing SOP file '{file_path}' to extract information")
 
-        with open(file_path, 'r') as file:
-            content = file.read()
+        sop = load_sop(file_path, raw_content)
 
-        html_content = markdown.markdown(content, extensions=['tables'])
-        soup = BeautifulSoup(html_content, 'html.parser')
-
-        metadata = self.extract_metadata(soup, file_path)
-        num_steps = count_procedure_steps(soup)
-        last_modified_date = self.extract_last_modified_date(soup, file_path)
+        metadata = self.extract_metadata(sop, file_path)
+        num_steps = count_procedure_steps_in_headings(sop.headings)
+        last_modified_date = self.extract_last_modified_date(sop, file_path)
         name_with_link = build_hyperlink(file_path)
 
         return {
@@ -50,23 +104,20 @@ class SOPIndexGenerator:
             "Last modified": last_modified_date
         }
     
-    def extract_metadata(self, soup: BeautifulSoup, file_path: str) -> Dict[str, str]:
+    def extract_metadata(self, sop: ParsedSOP, file_path: str) -> Dict[str, str]:
         """
         Extracts metadata from the metadata table in the SOP file.
 
-        :param soup: BeautifulSoup object of the parsed SOP content.
+        :param sop: ParsedSOP object of the SOP file.
         :param file_path: Path to the SOP file.
         :return: Dictionary of extracted metadata.
         """
-        metadata_table_headers = ["Metadata", "Value"]
-        try:
-            metadata_table = find_tables(soup, metadata_table_headers)[0]
-        except IndexError:
-            raise IndexError(f"Metadata table is missing from the file '{file_path}'. Could not find the table based on the given headers '{metadata_table_headers}'.")
+        metadata_rows = sop.metadata_rows
+        if metadata_rows is None:
+            raise IndexError(f"Metadata table is missing from the file '{file_path}'. Could not find the table based on the given headers '{METADATA_HEADERS}'.")
 
         metadata = {}
-        for row in metadata_table.find_all('tr')[1:]:
-            columns = [col.text.strip() for col in row.find_all('td')]
+        for columns in metadata_rows:
             if len(columns) == 2:
                 metadata[columns[0].lower()] = columns[1]
             else:
@@ -74,23 +125,21 @@ class SOPIndexGenerator:
         
         return metadata
 
-    def extract_last_modified_date(self, soup: BeautifulSoup, file_path: str) -> str:
+    def extract_last_modified_date(self, sop: ParsedSOP, file_path: str) -> str:
         """
         Extracts the last modified date from the 'Document History' section of the SOP.
 
-        :param soup: BeautifulSoup object of the parsed SOP content.
+        :param sop: ParsedSOP object of the SOP file.
         :param file_path: Path to the SOP file.
         :return: Last modified date as a string.
         """
-        document_history_headers = ["Template Version", "Instance version", "Author(s)", "Description of changes", "Date"]
-        try:
-            document_history_table = find_tables(soup, document_history_headers)[0]
-        except IndexError:
-            raise IndexError(f"Document History table is missing from the file '{file_path}'. Could not find the table based on the given headers '{document_history_headers}'.")
+        document_history_rows = sop.document_history_rows
+        if document_history_rows is None:
+            raise IndexError(f"Document History table is missing from the file '{file_path}'. Could not find the table based on the given headers '{DOCUMENT_HISTORY_HEADERS}'.")
 
         # The top row will be the most recent, and thus the last modification
-        first_row = document_history_table.find_all('tr')[1]
-        date_column = first_row.find_all('td')[4].text.strip()
+        first_row = document_history_rows[0]
+        date_column = first_row[4]
         last_modified_date = re.sub(r'[`*_]', '', date_column)  # Remove any formatting characters
 
         return last_modified_date
@@ -104,17 +153,39 @@ class SOPIndexGenerator:
         if self.verbosity > 1:
             print("- Parsing of all SOP files")
 
-        parsed_data = [self.parse_sop(file) for file in sop_files]
-        self.index_data = pd.DataFrame(parsed_data)
+        parsed_data = [self.get_row(file) for file in sop_files]
+        self.index_data = IndexTable.from_records(parsed_data)
+        if self.verbosity > 1 and self.sidecar_rows:
+            print(f"- Reused the rows of '{self.n_reused_rows}' unchanged SOPs from the sidecar file, and parsed the other '{len(sop_files) - self.n_reused_rows}'")
 
         if self.index_data.empty:
             raise ValueError(f"The newly created index table was empty! Check if there were any inputs (list of files: {sop_files}).")
 
-        self.index_data.sort_values(by="Identifier", inplace=True)
+        self.index_data.sort_by("Identifier")
 
         if self.verbosity > 1:
             print("- Finished parsing all SOP files")
 
+    def write_sidecar(self, sidecar_path: str):
+        """
+        Writes a sidecar file of the index table, mapping the identifier of each SOP to the path (relative to the sidecar)
+        and content hash of its file, and to its row. Later runs given this sidecar only parse the SOPs that changed since.
+
+        :param sidecar_path: Path to the sidecar file (overwritten if it exists).
+        """
+        sidecar_dir = os.path.dirname(os.path.abspath(sidecar_path))
+        sops = {}
+        for row in self.index_data:
+            source = self.sources[row["Identifier"]]
+            relative_path = os.path.relpath(os.path.abspath(source["file"]), sidecar_dir).replace(os.sep, '/')
+            sops[row["Identifier"]] = {"file": relative_path, "hash": source["hash"], "row": row}
+
+        with open(sidecar_path, 'w') as file:
+            json.dump({"version": SIDECAR_VERSION, "sops": sops}, file, indent=2)
+            file.write("\n")
+        if self.verbosity > 0:
+            print(f"- Sidecar file of the index table saved to {sidecar_path}")
+
     def generate_index(self, output_format: str = 'markdown') -> str:
         """
         Generates the index table in the specified format.
@@ -126,42 +197,58 @@ class SOPIndexGenerator:
             print(f"- Generating index table in '{output_format}' format")
 
         if output_format == 'markdown':
-            return self.index_data.to_markdown(index=False)
+            return self.index_data.to_markdown()
 
         elif output_format == 'csv':
-            return self.index_data.to_csv(index=False)
+            return self.index_data.to_csv()
 
         elif output_format == 'json':
-            return self.index_data.to_json(orient='records', indent=2)
+            return self.index_data.to_json()
 
         return ""
 
-def parse_args():
+def add_arguments(parser: argparse.ArgumentParser) -> argparse.ArgumentParser:
     """
-    Parses command-line arguments.
+    Adds the command-line arguments of the index table generator to a parser (e.g., the one of its subcommand in 'sop.py').
 
-    :return: Parsed arguments.
+    :param parser: Parser to add the arguments to.
+    :return: The same parser.
     """
-    parser = argparse.ArgumentParser(description="Generates an index table of SOPs")
     parser.add_argument("inputs", nargs="+", help="SOP file(s) or directories to include in the index table")
     parser.add_argument("-f", "--format", choices=["markdown", "csv", "json"], default="markdown", help="Output table format")
     parser.add_argument("-o", "--output", type=str, help="Output file path to write table")
     parser.add_argument("-v", "--verbosity", type=int, default=0, help="Verbosity level (0-2)")
-    return parser.parse_args()
+    parser.add_argument("--cache-dir", type=str, help="Directory of the on-disk parse cache (e.g., '.sop-cache'). If given, unchanged SOPs are not parsed again across runs")
+    parser.add_argument("--sidecar", type=str, help="Path to the sidecar file of the index table (e.g., 'sops/index-sidecar.json'), with the content hash and row of each SOP. It is (over)written after generating the table, and rows of unchanged SOPs are taken from it")
+    return parser
 
-def main() -> str:
+def parse_args() -> Any:
     """
-    Main function to run the SOP Index Generator.
+    Parses command-line arguments.
+
+    :return: Parsed arguments.
+    """
+    return add_arguments(argparse.ArgumentParser(description="Generates an index table of SOPs")).parse_args()
+
+def run_index(args: Any) -> str:
+    """
+    Generates the index table of the given SOPs, and writes it to the output file if given.
+
+    :param args: Parsed arguments (see 'add_arguments').
+    :return: Formatted index table as a string.
     """
-    args = parse_args()
+    if args.cache_dir:
+        enable_parse_cache(args.cache_dir, verbosity=args.verbosity)
     sop_files = collect_sop_files(args.inputs)
 
     if not sop_files:
         raise FileNotFoundError(f"No SOP documents were found for the given inputs: '{args.inputs}'")
 
-    index_generator = SOPIndexGenerator(verbosity=args.verbosity)
+    index_generator = SOPIndexGenerator(verbosity=args.verbosity, sidecar_path=args.sidecar)
     index_generator.parse_all_sops(sop_files)
     index_table = index_generator.generate_index(args.format)
+    if args.sidecar:
+        index_generator.write_sidecar(args.sidecar)
 
     if args.output:
         if not os.path.exists(args.output):
@@ -171,10 +258,20 @@ def main() -> str:
                 print(f"- Index table generated and saved to {args.output}")
         else:
             raise FileExistsError(f"Output file '{args.output}' already exists and will not be overwritten.")
-    else:
-        if args.verbosity > 0:
-            print(index_table)
-    
+
+    return index_table
+
+def main(args: Any = None) -> str:
+    """
+    Main function to run the SOP Index Generator.
+
+    :param args: Parsed arguments (optional, parsed from the command line by default).
+    """
+    args = args or parse_args()
+    index_table = run_index(args)
+    if not args.output and args.verbosity > 0:
+        print(index_table)
+
     return index_table
 
 if __name__ == "__main__":
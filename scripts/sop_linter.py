@@ -1,101 +1,314 @@
 import argparse
 import os
 import re
+import io
+import sys
 import json
-from typing import List, Dict, Any
+import time
+import contextlib
+import queue
+import multiprocessing
+from typing import List, Dict, Set, Tuple, Any, Callable, NamedTuple, Iterable, TextIO
 from packaging.version import Version, InvalidVersion
-import markdown
 from bs4 import BeautifulSoup
-from utils import find_tables, collect_sop_files, parse_glossary, is_remote_reference_resolvable, get_image_paths
+from link_checker import RemoteLinkChecker, LinkCache, LocalRepositoryResolver
+from corpus_index import CorpusIndex, CONTENT_INDEXES, get_filename_identifier
+from rule_profiler import RuleProfiler, CORPUS_KEY
+from change_tracking import get_changed_paths, select_affected_files
+from file_watcher import PollingWatcher
+from utils import collect_sop_files, find_repository_root, load_sop, forget_sop, load_glossary_index, enable_parse_cache, ParsedSOP, GlossaryIndex
+
+# Artefacts that linting rules may require, and the ones among them that require reading the SOP content
+ARTEFACTS = ["headings", "tables", "sections", "soup", "glossary", "charter_glossary", "links", "images", "filesystem", "network"]
+CONTENT_ARTEFACTS = ["headings", "tables", "sections", "soup", "glossary", "links", "images"]
+
+# Corpus indexes (see 'CorpusIndex') built from each artefact
+CORPUS_INDEXES = {"headings": "title", "tables": "template", "glossary": "glossary"}
+
+class LintRule(NamedTuple):
+    """
+    Linting rule registered through 'lint_rule'.
+    """
+    id: str
+    method_name: str
+    severity: str
+    requires: Tuple[str, ...]
+    corpus: bool
+    description: str
+
+# Registry of all linting rules by ID, in the order they are run
+RULES: Dict[str, LintRule] = {}
+
+def lint_rule(rule_id: str, severity: str = "error", requires: Iterable[str] = (), corpus: bool = False):
+    """
+    Registers a method of the SOPLinter as a linting rule.
+
+    :param rule_id: ID of the rule, used to select or skip it (e.g., 'metadata-table').
+    :param severity: Default severity of the issues reported by the rule ('error' or 'warning').
+    :param requires: Artefacts the rule needs (see 'ARTEFACTS'), so that only the ones needed by the selected rules are computed.
+    :param corpus: Whether it is a corpus-level rule (i.e., it checks the index of all SOPs instead of a single SOP).
+    """
+    unknown_artefacts = set(requires) - set(ARTEFACTS)
+    if unknown_artefacts:
+        raise ValueError(f"Unknown artefacts required by linting rule '{rule_id}': {sorted(unknown_artefacts)}")
+
+    def register(method: Callable) -> Callable:
+        # First paragraph of the docstring
+        description = " ".join(line.strip() for line in (method.__doc__ or "").strip().split("\n\n")[0].split("\n"))
+        RULES[rule_id] = LintRule(rule_id, method.__name__, severity, tuple(requires), corpus, description)
+        return method
+    return register
+
+def select_rules(rules: List[str] = None, skip_rules: List[str] = None) -> List[str]:
+    """
+    Selects the IDs of the linting rules to run.
+
+    :param rules: IDs of the rules to run (optional, all by default).
+    :param skip_rules: IDs of the rules not to run (optional).
+    :return: IDs of the selected rules, in the order they are run.
+    """
+    unknown_rules = [rule_id for rule_id in (rules or []) + (skip_rules or []) if rule_id not in RULES]
+    if unknown_rules:
+        raise ValueError(f"Unknown linting rules: {unknown_rules}. Available rules are: {list(RULES)}")
+    return [rule_id for rule_id in RULES if (not rules or rule_id in rules) and rule_id not in (skip_rules or [])]
+
+class NDJSONReporter:
+    def __init__(self, stream: TextIO = None):
+        """
+        Streaming reporter of the linting results, writing one JSON record per line as soon as each file is linted,
+        and only keeping the counters needed for the final summary and exit code.
+
+        :param stream: Stream where the records are written (optional, standard output by default). None to only keep the counters.
+        """
+        self.stream = stream
+        self.files = 0
+        self.errors = 0
+        self.warnings = 0
+
+    def write(self, record: Dict):
+        """
+        Writes a record as a single line of JSON.
+        """
+        if self.stream:
+            self.stream.write(json.dumps(record) + "\n")
+            self.stream.flush()  # So that it can be consumed while the linting is still running
+
+    def report_file(self, file_path: str, results: Dict, phase: str = "file"):
+        """
+        Reports the results of a file.
+
+        :param file_path: Path to the SOP file.
+        :param results: Errors and warnings of the file.
+        :param phase: Linting phase of the results ('file' for SOP-level rules, 'corpus' for corpus-level ones).
+        """
+        if phase == "file":
+            self.files += 1
+        self.errors += len(results["errors"])
+        self.warnings += len(results["warnings"])
+        self.write({"type": phase, "file": file_path, "errors": results["errors"], "warnings": results["warnings"]})
+
+    def report_summary(self, profile: Dict = None) -> bool:
+        """
+        Reports the summary of the whole run, preceded by the profiling summary in its own record (if enabled).
+
+        :param profile: Profiling summary, if enabled (optional).
+        :return: Whether there are errors or not.
+        """
+        if profile is not None:
+            self.write({"type": "profile", "profile": profile})
+        self.write({"type": "summary", "files": self.files, "errors": self.errors, "warnings": self.warnings})
+        return self.errors > 0
 
 class SOPLinter:
-    def __init__(self, verbosity: int = 0, strict: bool = False, required_sections: dict = {}):
+    def __init__(self, verbosity: int = 0, strict: bool = False, required_sections: dict = {}, reference_glossaries: List[str] = [], link_checker: RemoteLinkChecker = None,
+                 profiler: RuleProfiler = None, rules: List[str] = None, reporter: NDJSONReporter = None, release_files: bool = False):
         """
         Initializes the SOPLinter with verbosity and strict mode settings.
 
         :param verbosity: Level of verbosity for output messages.
         :param strict: Whether to treat warnings as errors.
+        :param required_sections: Required sections, as {name: (heading level, text contained in the title)} (e.g., {"### Procedure": (3, "Procedure")}).
+        :param reference_glossaries: Paths to other documents whose glossaries are accepted besides the Charter one (optional).
+        :param link_checker: Checker of the remote GitHub links, shared by all files (optional).
+        :param profiler: Profiler of the time spent by each linting rule, and of the time budget of the rules (optional).
+        :param rules: IDs of the linting rules to run (optional, all by default). See 'select_rules'.
+        :param reporter: Streaming reporter, to report each file as soon as it is linted instead of in 'generate_report' (optional).
+        :param release_files: Whether to release the parsed content and results of each file once linted (always if streaming).
         """
         self.verbosity = verbosity
         self.strict = strict
         self.results = {}
-        self.tables = {}
+        self.sops = {}
         self.required_sections = required_sections
+        self.reference_glossaries = reference_glossaries
+        self.charter_glossary = None
+        self.repository_identifiers = None
+        self.link_checker = link_checker or RemoteLinkChecker(verbosity=verbosity)
+        self.profiler = profiler
+        self.rules = [RULES[rule_id] for rule_id in select_rules(rules)]
+        self.current_rule = None  # Linting rule being run, whose severity is the default one of the reported issues
+        self.reporter = reporter
+        self.release_files = release_files or reporter is not None
+
+    def requires(self, artefact: str, corpus: bool = None) -> bool:
+        """
+        Checks if any of the selected linting rules requires the given artefact.
 
-    def lint_sop(self, file_path: str, all_inputs: List[str] = []):
+        :param artefact: Name of the artefact (see 'ARTEFACTS').
+        :param corpus: Whether to only consider corpus-level rules (True) or SOP-level ones (False) (optional).
+        :return: True if the artefact is required, False otherwise.
+        """
+        return any(artefact in rule.requires for rule in self.rules if corpus is None or rule.corpus == corpus)
+
+    def lint_sop(self, file_path: str):
         """
         Lints a single SOP file for compliance with the required rules.
 
         :param file_path: Path to the SOP file.
-        :param all_inputs: List of all input filepaths to compare with.
         """
         if self.verbosity > 1:
             print(f"- Starting linting for {file_path}")
 
         self.results[file_path] = {"errors": [], "warnings": []}
-        self.tables[file_path] = None
-        with open(file_path, 'r') as file:
-            content = file.read()
-
-        html_content = markdown.markdown(content, extensions=['tables'])
-        soup = BeautifulSoup(html_content, 'html.parser')
-
-        # We iterate one by one over the linting rules
-        self.lr_check_title(soup, file_path)
-        self.lr_check_required_sections(soup, file_path)
-        self.lr_check_non_empty_sections(soup, file_path)
-        self.lr_check_metadata_table(soup, file_path)
-        self.lr_check_document_history(soup, file_path)
-        self.lr_check_roles_and_responsibilities(soup, file_path)
-        self.lr_check_procedure_step_numbering(soup, file_path)
-        self.lr_check_step_consistency(soup, file_path)
-        self.lr_check_glossary_in_charter(soup, file_path)
-        self.lr_check_undefined_acronyms(soup, file_path)
-        self.lr_check_resolvable_references(soup, file_path)
-        self.lr_check_identifier_and_casing(file_path, all_inputs)
-        self.lr_check_title_match(soup, file_path)
-        self.lr_check_image_paths(soup, file_path)
+        # The SOP is only read if a selected rule needs its content, and its markdown is only rendered
+        #   if a rule needs the soup (i.e., not on parse cache hits for table/link rules)
+        needs_content = any(self.requires(artefact, corpus=False) for artefact in CONTENT_ARTEFACTS)
+        sop = self.get_sop(file_path) if needs_content else None
+
+        # We iterate one by one over the selected linting rules
+        for rule in self.rules:
+            if not rule.corpus:
+                self.run_rule(rule, sop, file_path)
+        if self.profiler and sop:
+            self.profiler.set_parse_timings(file_path, sop.timings)
+        if self.release_files:
+            self.release_sop(file_path)
 
         if self.verbosity > 1:
             print(f"- Finished linting for {file_path}")
             print(json.dumps(self.results[file_path], indent=2),"\n")
+        if self.reporter:
+            self.reporter.report_file(file_path, self.results.pop(file_path))
+
+    def add_results(self, file_path: str, results: Dict, profile_record: Dict = None):
+        """
+        Adds the results of a file linted elsewhere (e.g., in a worker process), as if it was linted by 'lint_sop'.
+
+        :param file_path: Path to the SOP file.
+        :param results: Errors and warnings of the file.
+        :param profile_record: Profiling record of the file, if enabled (optional).
+        """
+        if self.profiler:
+            self.profiler.merge(file_path, profile_record)
+        if self.reporter:
+            self.reporter.report_file(file_path, results)
+        else:
+            self.results[file_path] = results
+
+    def release_sop(self, file_path: str):
+        """
+        Releases the memory used by an SOP file (i.e., its parsed content), once it is not needed anymore.
+
+        :param file_path: Path to the SOP file.
+        """
+        self.sops.pop(file_path, None)
+        forget_sop(file_path)
 
-    def lr_check_title(self, soup: BeautifulSoup, file_path: str):
+    def run_rule(self, rule: LintRule, sop: ParsedSOP, file_path: str):
+        """
+        Runs a linting rule on an SOP file, printing the issues it reports (verbosity 2), and accounting its time
+        and issues if profiling is enabled. The time spent parsing the SOP within the rule (e.g., rendering its
+        markdown) is accounted as parse time instead.
+
+        :param rule: Linting rule, whose method takes the ParsedSOP object and the path of the SOP file.
+        :param sop: ParsedSOP object of the SOP file (None if no selected rule needs its content).
+        :param file_path: Path to the SOP file.
+        """
+        file_results = self.results.setdefault(file_path, {"errors": [], "warnings": []})
+        issues_before = {issue_type: len(issues) for issue_type, issues in file_results.items()}
+        parse_before = sop.parse_seconds() if sop else 0
+        start = time.perf_counter()
+        with self.running(rule):
+            getattr(self, rule.method_name)(sop, file_path)
+        seconds = max(time.perf_counter() - start - ((sop.parse_seconds() if sop else 0) - parse_before), 0)
+        new_issues = {issue_type: issues[issues_before[issue_type]:] for issue_type, issues in file_results.items()}
+
+        if self.verbosity > 1 and any(new_issues.values()):
+            # Only the issues reported by this rule, not all the ones of the file so far
+            print(f"{json.dumps(new_issues, indent=2)}\n")
+
+        if self.profiler and self.profiler.add_rule_call(file_path, rule.method_name, seconds, sum(len(issues) for issues in new_issues.values())):
+            self.report_issue(
+                f"Linting rule '{rule.method_name}' took {seconds:.3f} seconds, exceeding its time budget of {self.profiler.budget} seconds.",
+                file_path,
+                severity="error" if self.profiler.budget_action == "fail" else "warning"
+            )
+
+    def run_corpus_rule(self, rule: LintRule, corpus: CorpusIndex):
+        """
+        Runs a corpus-level linting rule, accounting its time and issues if profiling is enabled.
+
+        :param rule: Corpus-level linting rule, whose method takes the index of the SOP files.
+        :param corpus: Index of the SOP files.
+        """
+        if not self.profiler:
+            with self.running(rule):
+                getattr(self, rule.method_name)(corpus)
+            return
+
+        issues_before = sum(len(issues) for file_results in self.results.values() for issues in file_results.values())
+        start = time.perf_counter()
+        with self.running(rule):
+            getattr(self, rule.method_name)(corpus)
+        seconds = time.perf_counter() - start
+        issues = sum(len(issues) for file_results in self.results.values() for issues in file_results.values()) - issues_before
+        self.profiler.add_rule_call(CORPUS_KEY, rule.method_name, seconds, issues)
+
+    @contextlib.contextmanager
+    def running(self, rule: LintRule):
+        """
+        Sets the linting rule being run, whose severity is the one of the issues it reports (see 'report_issue').
+
+        :param rule: Linting rule.
+        """
+        self.current_rule = rule
+        try:
+            yield
+        finally:
+            self.current_rule = None
+
+    @lint_rule("title", requires=["headings"])
+    def lr_check_title(self, sop: ParsedSOP, file_path: str):
         """
         Checks if the SOP title follows the required format.
 
-        :param soup: BeautifulSoup object of the parsed SOP content.
+        :param sop: ParsedSOP object of the SOP file.
         :param file_path: Path to the SOP file.
         """
         if self.verbosity > 1:
             print("-- Linting rule: checking title...")
 
-        first_header = soup.find('h1')
-        if not first_header or not first_header.text.startswith("European GDI - "):
-            self.report_issue(f"Title must start with '# European GDI - ' followed by the SOP title. Current title: '{first_header.text}'", file_path, error=True)
-
-        if self.verbosity > 1:
-            print(f"{json.dumps(self.results[file_path], indent=2)}\n")
+        first_header = next((text for level, text in sop.headings if level == 1), None)
+        if not first_header or not first_header.startswith("European GDI - "):
+            self.report_issue(f"Title must start with '# European GDI - ' followed by the SOP title. Current title: '{first_header or ''}'", file_path)
 
-    def lr_check_metadata_table(self, soup: BeautifulSoup, file_path: str):
+    @lint_rule("metadata-table", requires=["tables"])
+    def lr_check_metadata_table(self, sop: ParsedSOP, file_path: str):
         """
         Checks if the metadata table is correctly formatted and contains proper content.
 
-        :param soup: BeautifulSoup object of the parsed SOP content.
+        :param sop: ParsedSOP object of the SOP file.
         :param file_path: Path to the SOP file.
         """
         if self.verbosity > 1:
             print("-- Linting rule: checking metadata table...")
 
-        metadata_table_headers = ["Metadata", "Value"]
-        table_find_result = self.find_tables(soup = soup, file_path = file_path, aim_headers = metadata_table_headers)
+        rows = sop.metadata_rows # Table rows, without the header row
 
-        if not table_find_result:
-            self.report_issue("Metadata table is missing or incorrectly formatted.", file_path, error=True)
+        if rows is None:
+            self.report_issue("Metadata table is missing or incorrectly formatted.", file_path)
             return
         
-        metadata_table = table_find_result[0]
-        rows = metadata_table.find_all('tr') # Table rows (tr)
         # Expected format of the "Value" column of each row
         expected_metadata = {
             "template sop number": r"GDI-SOP\d{4}", # e.g.: GDI-SOP0001
@@ -109,10 +322,9 @@ class SOPLinter:
         table_dict = {}
 
         # Iterate over each table row, applying its validation rule
-        for row in rows[1:]:  # Skip the header row
-            columns = [col.text.strip() for col in row.find_all('td')]
+        for columns in rows:
             if not len(columns) == 2:
-                self.report_issue(f"Metadata table row is incorrectly formatted (2 columns are expected): '{' | '.join(columns)}'.", file_path, error=True)
+                self.report_issue(f"Metadata table row is incorrectly formatted (2 columns are expected): '{' | '.join(columns)}'.", file_path)
                 continue
             key, value = columns[0], columns[1]
             table_dict[key.lower()] = value
@@ -130,30 +342,30 @@ class SOPLinter:
                 # We only want to evaluate each key Node-specific key format if any is present.
                 #   Otherwise, it could be a Node-specific SOP template (correct without these keys)
                 if all(table_dict.get(key) in [None, "", []] for key in node_specific_keys):
-                    self.report_issue(f"At the metadata table, value column for '{key}' was empty. If the SOP is a Node-specific SOP Instance (not a template), it should have a value.", file_path, warning=True)
+                    self.report_issue(f"At the metadata table, value column for '{key}' was empty. If the SOP is a Node-specific SOP Instance (not a template), it should have a value.", file_path, severity="warning")
                     continue
 
             if key in expected_metadata:
                 # Depending on the type of format rules for each row, we apply them differently
                 if isinstance(expected_metadata[key], str) and not re.match(expected_metadata[key], value):
                     # e.g., GDI-SOP0001
-                    self.report_issue(f"At the metadata table, value column for '{key}' is incorrectly formatted: '{value}'. It should follow the regex '{expected_metadata[key]}'", file_path, error=True)
+                    self.report_issue(f"At the metadata table, value column for '{key}' is incorrectly formatted: '{value}'. It should follow the regex '{expected_metadata[key]}'", file_path)
                 elif callable(expected_metadata[key]) and not expected_metadata[key](value):
                     # e.g., v1.0.2
-                    self.report_issue(f"At the metadata table, value column for '{key}' is incorrectly formatted: '{value}'.", file_path, error=True)
+                    self.report_issue(f"At the metadata table, value column for '{key}' is incorrectly formatted: '{value}'.", file_path)
                 elif isinstance(expected_metadata[key], list) and value.lower() not in [item.lower() for item in expected_metadata[key]]:
                     # e.g., Node-specific SOP
-                    self.report_issue(f"At the metadata table, value column for '{key}' is invalid: '{value}'. It's value should be one of: {expected_metadata[key]}", file_path, error=True)
+                    self.report_issue(f"At the metadata table, value column for '{key}' is invalid: '{value}'. It's value should be one of: {expected_metadata[key]}", file_path)
             else:
-                self.report_issue(f"Unexpected row in the metadata table: '{' | '.join([key, value])}'.", file_path, warning=True)
+                self.report_issue(f"Unexpected row in the metadata table: '{' | '.join([key, value])}'.", file_path, severity="warning")
 
         for key in expected_metadata.keys():
             if key.lower() not in table_dict.keys():
-                self.report_issue(f"Metadata row '{key}' is missing from the metadata table.", file_path, error=True)
+                self.report_issue(f"Metadata row '{key}' is missing from the metadata table.", file_path)
 
         try:
             if table_dict["template sop type"] == "European-level SOP" and (table_dict["gdi node"] or table_dict["instance version"]):
-                self.report_issue("European-level SOPs should not have 'GDI Node' or 'Instance version' values in the metadata table.", file_path, error=True)
+                self.report_issue("European-level SOPs should not have 'GDI Node' or 'Instance version' values in the metadata table.", file_path)
         except Exception:
             # The missing rows are already reported above
             pass
@@ -167,61 +379,53 @@ class SOPLinter:
             if parent_directory != expected_folder:
                 self.report_issue(
                     f"SOP type '{table_dict['template sop type']}' should be in the '{expected_folder}' folder, but the file path shows it's in '{parent_directory}'.",
-                    file_path,
-                    error=True
+                    file_path
                 )
         except KeyError:
             # SOP type errors (e.g., missing type) should be reported by metadata checks
             pass
 
-        if self.verbosity > 1:
-            print(f"{json.dumps(self.results[file_path], indent=2)}\n")
-
-    def lr_check_required_sections(self, soup: BeautifulSoup, file_path: str):
+    @lint_rule("required-sections", requires=["sections"])
+    def lr_check_required_sections(self, sop: ParsedSOP, file_path: str):
         """
         Checks if all required sections are present in the SOP.
 
-        :param soup: BeautifulSoup object of the parsed SOP content.
+        :param sop: ParsedSOP object of the SOP file.
         :param file_path: Path to the SOP file.
         """
         if self.verbosity > 1:
             print("-- Linting rule: checking required sections...")       
 
-        for section, selector in self.required_sections.items():
-            if not soup.select_one(selector):
-                self.report_issue(f"Required section '{section}' is missing.", file_path, error=True)
-
-        if self.verbosity > 1:
-            print(f"{json.dumps(self.results[file_path], indent=2)}\n")
+        for section, (level, title) in self.required_sections.items():
+            if not sop.sections.find_containing(level, title):
+                self.report_issue(f"Required section '{section}' is missing.", file_path)
 
-    def lr_check_document_history(self, soup: BeautifulSoup, file_path: str):
+    @lint_rule("document-history", requires=["tables"])
+    def lr_check_document_history(self, sop: ParsedSOP, file_path: str):
         """
         Checks the 'Document History' table for proper version increments, non-empty change descriptions, 
         valid author names, and valid date formats.
 
-        :param soup: BeautifulSoup object of the parsed SOP content.
+        :param sop: ParsedSOP object of the SOP file.
         :param file_path: Path to the SOP file.
         """
         if self.verbosity > 1:
             print("-- Linting rule: checking Document History table...")
 
-        aim_headers = ["Template Version", "Instance version", "Author(s)", "Description of changes", "Date"]
-        table_find_result = self.find_tables(soup, file_path, aim_headers)
+        rows = sop.document_history_rows  # Table rows, without the header row
 
-        if not table_find_result:
-            self.report_issue("Document History table is missing or incorrectly formatted.", file_path, error=True)
+        if rows is None:
+            self.report_issue("Document History table is missing or incorrectly formatted.", file_path)
             return
         
-        document_history_table = table_find_result[0]        
-        rows = document_history_table.find_all('tr')[1:]  # Skip the header row
         previous_template_version = None
         previous_instance_version = None
 
         for row in rows:
-            columns = [col.text.strip('`').strip() for col in row.find_all('td')]
+            columns = [col.strip('`').strip() for col in row]
 
             if len(columns) != 5:
-                self.report_issue(f"Document History table row is incorrectly formatted (expected 5 columns). Row: '{' | '.join(columns)}'.", file_path, error=True)
+                self.report_issue(f"Document History table row is incorrectly formatted (expected 5 columns). Row: '{' | '.join(columns)}'.", file_path)
                 continue
 
             template_version = columns[0]
@@ -234,14 +438,14 @@ class SOPLinter:
             if self.is_valid_version(template_version):
                 current_template_version = Version(template_version)
             else:
-                self.report_issue(f"At the Document History table, Template Version ('{template_version}') is incorrectly formatted. Row: '{' | '.join(columns)}'.", file_path, error=True)
+                self.report_issue(f"At the Document History table, Template Version ('{template_version}') is incorrectly formatted. Row: '{' | '.join(columns)}'.", file_path)
                 continue
 
             if instance_version:
                 if self.is_valid_version(instance_version):
                     current_instance_version = Version(instance_version)                    
                 else:
-                    self.report_issue(f"At the Document History table, Instance Version ('{instance_version}') is incorrectly formatted. Row: '{' | '.join(columns)}'.", file_path, error=True)
+                    self.report_issue(f"At the Document History table, Instance Version ('{instance_version}') is incorrectly formatted. Row: '{' | '.join(columns)}'.", file_path)
                     continue
             else:
                 current_instance_version = None
@@ -249,13 +453,13 @@ class SOPLinter:
             if previous_template_version:
                 # Template versions should be equal or lower than the ones above (more recent)
                 if (current_template_version > previous_template_version) or (current_template_version == previous_template_version and not previous_instance_version):
-                    self.report_issue(f"At the Document History table, Template version ('{current_template_version}') should be lower than the version right above ('{previous_template_version}'). Notice the order of the table: from recent (top) to older (bottom) and address the versioning. Row: '{' | '.join(columns)}'.", file_path, error=True)
+                    self.report_issue(f"At the Document History table, Template version ('{current_template_version}') should be lower than the version right above ('{previous_template_version}'). Notice the order of the table: from recent (top) to older (bottom) and address the versioning. Row: '{' | '.join(columns)}'.", file_path)
 
                 # Instance versions are not always required, only when it's a node instance
                 if current_instance_version and previous_instance_version:
                     # Instance versions should always be higher than the previous one
                     if current_instance_version >= previous_instance_version:
-                        self.report_issue(f"At the Document History table, Instance Version ('{current_instance_version}') should be lower than the version right above ('{previous_instance_version}'). Notice the order of the table: from recent (top) to older (bottom) and address the versioning. Row: '{' | '.join(columns)}'.", file_path, error=True)
+                        self.report_issue(f"At the Document History table, Instance Version ('{current_instance_version}') should be lower than the version right above ('{previous_instance_version}'). Notice the order of the table: from recent (top) to older (bottom) and address the versioning. Row: '{' | '.join(columns)}'.", file_path)
 
             # Assigned for the next iteration to use for comparisons
             previous_template_version = current_template_version
@@ -263,45 +467,39 @@ class SOPLinter:
 
             # Check author name
             if not author:
-                self.report_issue(f"Author name is missing. Row: '{' | '.join(columns)}'.", file_path, error=True)
+                self.report_issue(f"Author name is missing. Row: '{' | '.join(columns)}'.", file_path)
 
             # Check description
             if not description:
-                self.report_issue(f"Description of changes is missing. Row: '{' | '.join(columns)}'.", file_path, error=True)
+                self.report_issue(f"Description of changes is missing. Row: '{' | '.join(columns)}'.", file_path)
 
             # Check date format
             if not re.match(r"\d{4}\.\d{2}\.\d{2}", date):
-                self.report_issue(f"Date is incorrectly formatted (expected format is YYYY.MM.DD): '{date}'. Row: '{' | '.join(columns)}'.", file_path, error=True)
-
-        if self.verbosity > 1:
-            print(f"{json.dumps(self.results[file_path], indent=2)}\n")
+                self.report_issue(f"Date is incorrectly formatted (expected format is YYYY.MM.DD): '{date}'. Row: '{' | '.join(columns)}'.", file_path)
 
-    def lr_check_roles_and_responsibilities(self, soup: BeautifulSoup, file_path: str):
+    @lint_rule("roles-and-responsibilities", requires=["tables"])
+    def lr_check_roles_and_responsibilities(self, sop: ParsedSOP, file_path: str):
         """
         Checks if the Roles and Responsibilities table exists and has at least one non-empty Full Name for roles Author, Reviewer, and Approver.
 
-        :param soup: BeautifulSoup object of the parsed SOP content.
+        :param sop: ParsedSOP object of the SOP file.
         :param file_path: Path to the SOP file.
         """
         if self.verbosity > 1:
             print("-- Linting rule: checking Roles and Responsibilities table...")
 
-        aim_headers = ["Role", "Full name", "GDI/node role", "Organisation"]
-        table_find_result = self.find_tables(soup, file_path, aim_headers)
+        rows = sop.roles_rows  # Table rows, without the header row
 
-        if not table_find_result:
-            self.report_issue("Roles and Responsibilities table is missing or incorrectly formatted.", file_path, error=True)
+        if rows is None:
+            self.report_issue("Roles and Responsibilities table is missing or incorrectly formatted.", file_path)
             return
         
-        roles_table = table_find_result[0]
         required_roles = ["Author", "Reviewer", "Approver"]
         found_roles = {role: False for role in required_roles}
 
-        rows = roles_table.find_all('tr')[1:]  # Skip the header row
-        for row in rows:
-            columns = [col.text.strip() for col in row.find_all('td')]
+        for columns in rows:
             if len(columns) != 4:
-                self.report_issue(f"Roles and Responsibilities table row is incorrectly formatted (expected 4 columns): '{' | '.join(columns)}'.", file_path, error=True)
+                self.report_issue(f"Roles and Responsibilities table row is incorrectly formatted (expected 4 columns): '{' | '.join(columns)}'.", file_path)
                 continue
 
             role, full_name = columns[0], columns[1]
@@ -313,67 +511,57 @@ class SOPLinter:
 
         for role, found in found_roles.items():
             if not found:
-                self.report_issue(f"Role '{role}' is missing a non-empty Full Name row in the Roles and Responsibilities table.", file_path, error=True)
-
-        if self.verbosity > 1:
-            print(f"{json.dumps(self.results[file_path], indent=2)}\n")
+                self.report_issue(f"Role '{role}' is missing a non-empty Full Name row in the Roles and Responsibilities table.", file_path)
 
-    def lr_check_non_empty_sections(self, soup: BeautifulSoup, file_path: str):
+    @lint_rule("non-empty-sections", requires=["sections"])
+    def lr_check_non_empty_sections(self, sop: ParsedSOP, file_path: str):
         """
         Checks if required sections are non-empty.
         
-        :param soup: BeautifulSoup object of the parsed SOP content.
+        :param sop: ParsedSOP object of the SOP file.
         :param file_path: Path to the SOP file.
         """
         if self.verbosity > 1:
             print("-- Linting rule: checking non-empty required sections...")
 
-        for section_title, selector in self.required_sections.items():
-            header = soup.select_one(selector)
-            if not header:
+        for section_title, (level, title) in self.required_sections.items():
+            section = sop.sections.find_containing(level, title)
+            if not section:
                 # No need to report the missing section as an error, since 
                 #   that's the role of a different linting rule
                 continue
 
-            # Get all siblings of the header until the next header of the same or higher level
-            section_content = []
-            for sibling in header.find_next_siblings(): # Create iterator of headers
-                # Only capture content within the current section and stop if we reach a new section of the same or higher level
-                if re.match(r'^h[1-6]$', sibling.name) and sibling.name <= header.name:
-                    break
-                section_content.append(sibling)
+            # All nodes after the header until the next header of the same or higher level
+            section_content = sop.sections.content(section)
 
             if not section_content or all(not sibling.text.strip() for sibling in section_content):
-                self.report_issue(f"The section '{section_title}' is empty.", file_path, error=True)
+                self.report_issue(f"The section '{section_title}' is empty.", file_path)
 
-        if self.verbosity > 1:
-            print(f"{json.dumps(self.results[file_path], indent=2)}\n")
-
-    def lr_check_procedure_step_numbering(self, soup: BeautifulSoup, file_path: str):
+    @lint_rule("procedure-step-numbering", requires=["sections"])
+    def lr_check_procedure_step_numbering(self, sop: ParsedSOP, file_path: str):
         """
         Checks that the headers under "### 8. Procedure" section are sequentially numbered 
         as "#### 8.1", "#### 8.2", etc., without skipping any numbers and ensure they start with "8.".
         
-        :param soup: BeautifulSoup object of the parsed SOP content.
+        :param sop: ParsedSOP object of the SOP file.
         :param file_path: Path to the SOP file.
         """
         if self.verbosity > 1:
             print("-- Linting rule: checking header numbering in Procedure section...")
 
-        # Locate the "### 8. Procedure" header
-        procedure_header = soup.find('h3', string=re.compile(r"^8\.\s*Procedure", re.IGNORECASE))
-        if not procedure_header:
-            self.report_issue("Missing '### 8. Procedure' section header.", file_path, error=True)
+        # Locate the "### 8. Procedure" section
+        procedure_section = sop.sections.get(3, "Procedure")
+        if not procedure_section or not re.match(r"^8\.\s*Procedure", procedure_section.title, re.IGNORECASE):
+            self.report_issue("Missing '### 8. Procedure' section header.", file_path)
             return
 
         # Initialize the expected step number
         current_step_number = 1
 
         # Iterate through all h4 headers within the Procedure section
-        for header in procedure_header.find_all_next('h4'):
-            # Stop if we reach a new section at the same or higher level than the Procedure header
-            if re.match(r'^h[1-3]$', header.name) and header.name <= procedure_header.name:
-                break
+        for header in sop.sections.content(procedure_section):
+            if header.name != 'h4':
+                continue
 
             # Check if the header starts with "8." followed by the expected step number
             match = re.match(r'^8\.(\d+)', header.text.strip())
@@ -381,16 +569,14 @@ class SOPLinter:
                 # If the header doesn't start with "8.", report it as an error
                 self.report_issue(
                     f"Header formatting error in '8. Procedure' section. Expected '#### 8.{current_step_number} ...' or similar correct numbering, but found '#### {header.text.strip()}'.",
-                    file_path,
-                    error=True
+                    file_path
                 )
             else:
                 step_number = int(match.group(1))
                 if step_number != current_step_number:
                     self.report_issue(
                         f"Step numbering error in '8. Procedure' section. Expected '#### 8.{current_step_number}' or similar correct numbering, but found '#### {header.text.strip()}'.",
-                        file_path,
-                        error=True
+                        file_path
                     )
                     # Update to the actual step number to attempt to continue checking from this point
                     current_step_number = step_number
@@ -398,25 +584,23 @@ class SOPLinter:
                 # Increment the expected step number for the next header
                 current_step_number += 1
 
-        if self.verbosity > 1:
-            print(f"{json.dumps(self.results[file_path], indent=2)}\n")
-
-    def lr_check_step_consistency(self, soup: BeautifulSoup, file_path: str):
+    @lint_rule("step-consistency", requires=["soup"])
+    def lr_check_step_consistency(self, sop: ParsedSOP, file_path: str):
         """
         Checks that each header in the "### 8. Procedure" section has a matching "Step identifier"
         in the following table, consistent with the step number in the header, allowing for complex 
         identifiers (e.g., 8.1, 8.2.1, 8.2.1.1) and capturing any header level.
         
-        :param soup: BeautifulSoup object of the parsed SOP content.
+        :param sop: ParsedSOP object of the SOP file.
         :param file_path: Path to the SOP file.
         """
         if self.verbosity > 1:
             print("-- Linting rule: checking step consistency in Procedure section...")
 
         # Locate the "### 8. Procedure" header
-        procedure_header = soup.find('h3', string=re.compile(r"^8\.\s*Procedure$", re.IGNORECASE))
+        procedure_header = sop.soup.find('h3', string=re.compile(r"^8\.\s*Procedure$", re.IGNORECASE))
         if not procedure_header:
-            self.report_issue("Missing '### 8. Procedure' section header.", file_path, error=True)
+            self.report_issue("Missing '### 8. Procedure' section header.", file_path)
             return
 
         # Iterate through all headers within the Procedure section that start with "8."
@@ -434,8 +618,7 @@ class SOPLinter:
                 # Report if a header in the Procedure section doesn't start with the expected format
                 self.report_issue(
                     f"Header formatting error in Procedure section. Expected a header starting with '8.' but found '{header.strip()}'.",
-                    file_path,
-                    error=True
+                    file_path
                 )
                 continue
 
@@ -447,8 +630,7 @@ class SOPLinter:
             if not next_table:
                 self.report_issue(
                     f"No table found immediately after step header '{header.strip()}'. Each step must have an associated table.",
-                    file_path,
-                    error=True
+                    file_path
                 )
                 continue
 
@@ -457,8 +639,7 @@ class SOPLinter:
             if not step_identifier_cell:
                 self.report_issue(
                     f"Table immediately following '{header.strip()}' does not contain a 'Step identifier' entry.",
-                    file_path,
-                    error=True
+                    file_path
                 )
                 continue
 
@@ -467,90 +648,71 @@ class SOPLinter:
             if table_step_identifier != step_identifier:
                 self.report_issue(
                     f"Step identifier mismatch for '{header.strip()}'. Expected 'Step identifier' '{step_identifier}', but found '{table_step_identifier}' in the table. Check that the table of that step is correct and existing.",
-                    file_path,
-                    error=True
+                    file_path
                 )
-
-        if self.verbosity > 1:
-            print(f"{json.dumps(self.results[file_path], indent=2)}\n")
     
-    def lr_check_glossary_in_charter(self, sop_soup: BeautifulSoup, file_path: str):
+    @lint_rule("glossary-in-charter", requires=["glossary", "charter_glossary"])
+    def lr_check_glossary_in_charter(self, sop: ParsedSOP, file_path: str):
         """
         Checks that all abbreviations and terms in the SOP's glossary are also present in the Charter glossary.
 
-        :param sop_soup: BeautifulSoup object of the SOP content.
+        :param sop: ParsedSOP object of the SOP file.
         :param file_path: Path to the SOP file.
         """
         if self.verbosity > 1:
             print("-- Linting rule: checking SOP glossary terms against Charter glossary...")
 
-        # Get the Charter soup, parsing if it hasn't been done already
-        charter_soup = self.get_charter_soup(file_path)
-
-        # Parse glossaries from SOP and Charter
-        sop_glossary = parse_glossary(sop_soup)
-        charter_glossary = parse_glossary(charter_soup)
+        # Glossary index of the Charter (and other reference documents), only compiled once per run
+        charter_glossary = self.get_charter_glossary(file_path)
 
         # Check if all items in the SOP glossary are also in the Charter glossary
-        for term in sop_glossary.keys():
+        for term in sop.glossary_index:
             if term not in charter_glossary:
                 self.report_issue(
                     f"Glossary mismatch: '{term}' in SOP glossary is not found in Charter glossary. Make sure that the Charter is updated accordingly with new acronyms from this SOP.",
-                    file_path,
-                    error=True
+                    file_path
                 )
 
-        if self.verbosity > 1:
-            print(f"{json.dumps(self.results[file_path], indent=2)}\n")
-
-    def lr_check_undefined_acronyms(self, sop_soup: BeautifulSoup, file_path: str):
+    @lint_rule("undefined-acronyms", severity="warning", requires=["soup", "glossary"])
+    def lr_check_undefined_acronyms(self, sop: ParsedSOP, file_path: str):
         """
         Detects any acronyms in the SOP content that are not defined in the SOP glossary.
 
-        :param sop_soup: BeautifulSoup object of the SOP content.
+        :param sop: ParsedSOP object of the SOP file.
         :param file_path: Path to the SOP file.
         """
         if self.verbosity > 1:
             print("-- Linting rule: checking for undefined acronyms in SOP...")
 
-        # Parse glossary from SOP
-        sop_glossary = parse_glossary(sop_soup)
+        # Glossary index of the SOP (only compiled once per document)
+        sop_glossary = sop.glossary_index
 
         # Identify any acronyms in SOP content
-        sop_text = sop_soup.get_text()
+        sop_text = sop.soup.get_text()
         # Regex for uppercase acronyms of 2+ characters, with possible "s" ending (e.g., SOPs)
         detected_acronyms = re.findall(r'\b[A-Z]{2,}s?\b', sop_text)
-        for acronym in set(detected_acronyms):
-            if acronym not in sop_glossary:
-                if acronym[-1] == 's' and acronym[:-1] in sop_glossary:
-                    # We skip acronym plurals (e.g., SOPs) that would be false positives (e.g., since SOP is already there)
-                    continue
+        for acronym in sorted(set(detected_acronyms)):  # Sorted, so that reports are reproducible across runs
+            # Acronym plurals (e.g., SOPs) are not reported if their singular is defined (e.g., since SOP is already there)
+            if sop_glossary.lookup(acronym, plural=True) is None:
                 self.report_issue(
                     f"Undefined acronym detected: '{acronym}' is used in the SOP but is not defined in the SOP glossary.",
-                    file_path,
-                    warning=True
+                    file_path
                 )
 
-        if self.verbosity > 1:
-            print(f"{json.dumps(self.results[file_path], indent=2)}\n")
-
-    def lr_check_resolvable_references(self, soup: BeautifulSoup, file_path: str):
+    @lint_rule("resolvable-references", requires=["links", "filesystem", "network"])
+    def lr_check_resolvable_references(self, sop: ParsedSOP, file_path: str):
         """
         Checks if GitHub references in the SOP content are resolvable.
         Relative paths are checked against the file system, and remote GitHub links are checked via HTTP.
 
-        :param soup: BeautifulSoup object of the SOP content.
+        :param sop: ParsedSOP object of the SOP file.
         :param file_path: Path to the SOP file.
         """
         if self.verbosity > 1:
             print("-- Linting rule: checking resolvable GitHub references...")
 
-        # Find all <a> tags with href attributes in the HTML content
-        links = soup.find_all('a', href=True)
-
-        # Check each link to classify and verify its resolvability
-        for link in links:
-            href = link['href']
+        # Check each link (href of <a> tags) to classify and verify its resolvability
+        for href in sop.links:
             
             # Relative path check (starts with ./ or ../)
             if href.startswith('./') or href.startswith('../'):
@@ -559,29 +721,34 @@ class SOPLinter:
                 if not os.path.exists(absolute_path):
                     self.report_issue(
                         f"Unresolvable relative reference: '{href}' cannot be resolved (i.e., the target file does not exist).",
-                        file_path,
-                        error=True
+                        file_path
                     )
             
             # Remote GitHub link check (starts with https://github.com/)
-            elif href.startswith('https://github.com/'):
-                if not is_remote_reference_resolvable(href):
+            # (usually already resolved for all files at once, see 'check_remote_links')
+            elif is_remote_github_link(href):
+                resolvable = self.link_checker.is_resolvable(href)
+                if resolvable is None:
                     self.report_issue(
-                        f"Unresolvable GitHub reference: '{href}' returns a 404 (not found).",
+                        f"Unchecked GitHub reference: '{href}' could not be checked in this run (i.e., the maximum number of requests was reached, it kept failing after all retries, or it is not cached in offline mode).",
                         file_path,
-                        error=True
+                        severity="warning"
+                    )
+                elif not resolvable:
+                    self.report_issue(
+                        f"Unresolvable GitHub reference: '{href}' returns a 404 (not found).",
+                        file_path
                     )
 
-        if self.verbosity > 1:
-            print(f"{json.dumps(self.results[file_path], indent=2)}\n")
-
-    def lr_check_identifier_and_casing(self, file_path: str, all_files: List[str]):
+    @lint_rule("identifier-and-casing")
+    def lr_check_identifier_and_casing(self, sop: ParsedSOP, file_path: str):
         """
-        Checks if the SOP filename has a unique SOP identifier, and follows proper casing rules:
+        Checks if the SOP filename has an SOP identifier, and follows proper casing rules:
         Identifier is uppercase, followed by an underscore-separated, lowercase title.
+        The uniqueness of the identifier is checked at the corpus level (see 'cr_check_duplicate_identifiers').
 
+        :param sop: ParsedSOP object of the SOP file (unused, only the filename is checked).
         :param file_path: Path to the current SOP file.
-        :param all_files: List of all SOP file paths for uniqueness checks.
         """
         filename = os.path.basename(file_path)
         filename_without_extension = os.path.splitext(filename)[0]
@@ -589,40 +756,27 @@ class SOPLinter:
         # Enforce filename structure with uppercase identifier and lowercase title
         sop_identifier_match = re.match(r"^(GDI-SOP\d{4})_(.+)$", filename_without_extension)
         if sop_identifier_match:
-            identifier = sop_identifier_match.group(1)
             title_part = sop_identifier_match.group(2)
             
             # Validate title format
             if title_part != title_part.lower():
                 self.report_issue(
                     f"Filename '{filename}' must be in lowercase after the identifier. See further details at 'docs/GDI-SOP_sop-accessioning.md'.",
-                    file_path,
-                    error=True
-                )
-
-            # Check for unique identifier
-            if sum(1 for f in all_files if identifier in f) > 1:
-                self.report_issue(
-                    f"Duplicate SOP identifier found among the SOPs filenames: '{identifier}'.",
-                    file_path,
-                    error=True
+                    file_path
                 )
         else:
             self.report_issue(
                 "Filename must follow the format 'GDI-SOPXXXX_lowercase-title.md'. See further details at 'docs/GDI-SOP_sop-accessioning.md'.", 
-                file_path, 
-                error=True
+                file_path
             )
 
-        if self.verbosity > 1:
-            print(f"{json.dumps(self.results[file_path], indent=2)}\n")
-
-    def lr_check_title_match(self, soup: BeautifulSoup, file_path: str):
+    @lint_rule("title-match", requires=["headings"])
+    def lr_check_title_match(self, sop: ParsedSOP, file_path: str):
         """
         Checks if the title in the SOP document matches the title implied by the filename,
         ensuring it starts with "European GDI - ".
 
-        :param soup: BeautifulSoup object of the SOP content.
+        :param sop: ParsedSOP object of the SOP file.
         :param file_path: Path to the SOP file.
         """
         filename = os.path.basename(file_path)
@@ -633,82 +787,291 @@ class SOPLinter:
         expected_document_title = f"European GDI - {title_from_filename}"
         
         # Find the first h1 header and check if it matches the expected format
-        title_header = soup.find('h1')
-        if title_header:
-            document_title = title_header.text.strip()
+        title_header = next((text for level, text in sop.headings if level == 1), None)
+        if title_header is not None:
+            document_title = title_header
             if document_title.lower() != expected_document_title.lower():
                 self.report_issue(
                     f"Title within the document ('{document_title}') does not match the expected format (regardless of upper/lowercase) based on the filename: '{expected_document_title}'",
-                    file_path,
-                    error=True
+                    file_path
                 )
         else:
-            self.report_issue("Document does not contain a title header (h1).", file_path, error=True)
-
-        if self.verbosity > 1:
-            print(f"{json.dumps(self.results[file_path], indent=2)}\n")
+            self.report_issue("Document does not contain a title header (h1).", file_path)
 
-    def lr_check_image_paths(self, soup: BeautifulSoup, file_path: str):
+    @lint_rule("image-paths", requires=["images"])
+    def lr_check_image_paths(self, sop: ParsedSOP, file_path: str):
         """
         Checks that all image references in the SOP contain the correct 'docs/images' folder in their file paths.
 
-        :param soup: BeautifulSoup object of the parsed SOP content.
+        :param sop: ParsedSOP object of the SOP file.
         :param file_path: Path to the SOP file.
         """
-        image_paths = get_image_paths(soup)
+        image_paths = sop.image_paths
         incorrect_images = [img_path for img_path in image_paths if "docs/images" not in img_path]
 
         for img_path in incorrect_images:
             self.report_issue(
                 f"Referenced image '{img_path}' should be located in the 'docs/images' folder or a subdirectory within it.",
-                file_path,
-                error=True
+                file_path
             )
 
-    def get_charter_soup(self, input_file: str) -> BeautifulSoup:
+    def lint_corpus(self, sop_files: List[str]):
+        """
+        Lints the SOP files as a whole, once all of them have been linted individually.
+        Cross-document checks are run against indexes of the corpus built in a single pass.
+
+        :param sop_files: List of all SOP files.
+        """
+        if self.verbosity > 1:
+            print("- Starting corpus-level linting")
+
+        # Only the indexes needed by the selected rules are built (e.g., SOPs are not read to check identifiers)
+        indexes = [index for artefact, index in CORPUS_INDEXES.items() if self.requires(artefact, corpus=True)]
+        corpus = CorpusIndex.build(sop_files, self.get_transient_sop, indexes)
+
+        # We iterate one by one over the selected corpus-level linting rules
+        for rule in self.rules:
+            if rule.corpus:
+                self.run_corpus_rule(rule, corpus)
+
+        if self.reporter:
+            for file_path in list(self.results):
+                self.reporter.report_file(file_path, self.results.pop(file_path), phase="corpus")
+
+        if self.verbosity > 1:
+            print("- Finished corpus-level linting")
+
+    @lint_rule("duplicate-identifiers", corpus=True)
+    def cr_check_duplicate_identifiers(self, corpus: CorpusIndex):
+        """
+        Checks that the SOP identifier of each filename is unique among all SOP files.
+
+        :param corpus: Index of the SOP files.
+        """
+        if self.verbosity > 1:
+            print("-- Linting rule: checking for duplicate SOP identifiers...")
+
+        for identifier, file_paths in corpus.by_identifier.items():
+            if len(file_paths) > 1:
+                for file_path in file_paths:
+                    self.report_issue(
+                        f"Duplicate SOP identifier found among the SOPs filenames: '{identifier}'.",
+                        file_path
+                    )
+
+    @lint_rule("duplicate-titles", requires=["headings"], corpus=True)
+    def cr_check_duplicate_titles(self, corpus: CorpusIndex):
+        """
+        Checks that the title (h1) of each SOP is unique among all SOP files (regardless of upper/lowercase).
+
+        :param corpus: Index of the SOP files.
+        """
+        if self.verbosity > 1:
+            print("-- Linting rule: checking for duplicate SOP titles...")
+
+        for file_paths in corpus.by_title.values():
+            if len(file_paths) > 1:
+                for file_path in file_paths:
+                    others = [os.path.basename(other) for other in file_paths if other != file_path]
+                    self.report_issue(
+                        f"Duplicate SOP title: '{corpus.titles[file_path]}' is also the title of {others}.",
+                        file_path
+                    )
+
+    @lint_rule("glossary-consistency", severity="warning", requires=["glossary"], corpus=True)
+    def cr_check_glossary_consistency(self, corpus: CorpusIndex):
+        """
+        Checks that glossary terms defined in several SOPs have the same description in all of them
+        (regardless of whitespace, upper/lowercase and trailing period).
+
+        :param corpus: Index of the SOP files.
+        """
+        if self.verbosity > 1:
+            print("-- Linting rule: checking glossary consistency across SOPs...")
+
+        for term, definitions in corpus.glossary_definitions.items():
+            if len(definitions) > 1:
+                for file_paths in definitions.values():
+                    others = [os.path.basename(other) for other_paths in definitions.values() if other_paths is not file_paths for other in other_paths]
+                    for file_path in file_paths:
+                        self.report_issue(
+                            f"Inconsistent glossary definition: '{term}' is described as '{corpus.glossary_descriptions[term][file_path]}', but differently in {others}.",
+                            file_path
+                        )
+
+    @lint_rule("template-references", severity="warning", requires=["tables"], corpus=True)
+    def cr_check_template_references(self, corpus: CorpusIndex):
+        """
+        Checks that the 'Template SOP number' of each node-specific SOP refers to an SOP identifier among the SOP files of the
+        repository (European-level SOPs are templates themselves). Templates that are not among the linted files (e.g., when
+        linting a single node-specific SOP) are looked up in the whole repository.
+
+        :param corpus: Index of the SOP files.
+        """
+        if self.verbosity > 1:
+            print("-- Linting rule: checking references to SOP templates...")
+
+        for template, file_paths in corpus.by_template.items():
+            # Malformed numbers are already reported by the metadata table checks
+            if re.fullmatch(r"GDI-SOP\d{4}", template) and template not in corpus.by_identifier and template not in self.get_repository_identifiers(file_paths[0]):
+                for file_path in file_paths:
+                    self.report_issue(
+                        f"At the metadata table, the template SOP number '{template}' does not match the identifier of any SOP file of the repository.",
+                        file_path
+                    )
+
+    def select_changed_files(self, sop_files: List[str], git_ref: str, local_resolver: LocalRepositoryResolver = None) -> List[str]:
+        """
+        Selects the SOP files to lint after the changes since the given git reference: the changed SOPs and the ones
+        depending on changed files (e.g., linked files or images, including renamed or removed ones). All SOPs are
+        selected if the Charter, the reference glossaries or the linter itself changed.
+
+        :param sop_files: List of all SOP files.
+        :param git_ref: Git reference to compare with (e.g., 'origin/main').
+        :param local_resolver: Resolver of the links to the local repository (optional).
+        :return: SOP files to lint, in input order.
         """
-        Parses the Charter document into a BeautifulSoup object if it hasn't been parsed already.
+        changed_paths = get_changed_paths(git_ref, find_repository_root(sop_files[0]))
+        changed_files = self.select_affected_files(sop_files, changed_paths, local_resolver)
+
+        if self.verbosity > 1:
+            print(f"- Linting '{len(changed_files)}' out of '{len(sop_files)}' SOPs affected by the changes since '{git_ref}'")
+        return changed_files
+
+    def select_affected_files(self, sop_files: List[str], changed_paths: Set[str], local_resolver: LocalRepositoryResolver = None) -> List[str]:
+        """
+        Selects the SOP files affected by the given changed files (see 'select_changed_files').
+
+        :param sop_files: List of all SOP files.
+        :param changed_paths: Absolute paths of the changed files.
+        :param local_resolver: Resolver of the links to the local repository (optional).
+        :return: Affected SOP files, in input order.
+        """
+        repo_root = find_repository_root(sop_files[0])
+        global_dependencies = [self.get_charter_sop(sop_files[0]).file_path, os.path.dirname(os.path.abspath(__file__))] + list(self.reference_glossaries)
+        return select_affected_files(sop_files, changed_paths, global_dependencies, self.get_transient_sop, repo_root, local_resolver)
+
+    def forget_files(self, changed_paths: Set[str]):
+        """
+        Forgets everything loaded from the given changed files (parsed SOPs, the Charter glossary and the
+        resolution of local links), so that they are loaded again when needed. The rest is kept in memory.
+
+        :param changed_paths: Absolute paths of the changed files.
+        """
+        for file_path in [file_path for file_path in self.sops if os.path.abspath(file_path) in changed_paths]:
+            self.release_sop(file_path)
+        for file_path in changed_paths:
+            forget_sop(file_path)
+
+        charter_sop = getattr(self, 'charter_sop', None)
+        glossary_paths = ([charter_sop.file_path] if charter_sop else []) + list(self.reference_glossaries)
+        if any(os.path.abspath(file_path) in changed_paths for file_path in glossary_paths):
+            self.charter_sop = None
+            self.charter_glossary = None
+        # SOP files may have been added, renamed or removed
+        self.repository_identifiers = None
+        self.link_checker.forget_local_results()
+
+    def check_remote_links(self, sop_files: List[str]):
+        """
+        Resolves the remote GitHub links of all the given SOP files at once, so that each unique link is only
+        requested once per run, and concurrently.
+        The links are usually read without rendering the SOPs, and the SOPs are not kept in memory (e.g., they are linted by worker processes).
+
+        :param sop_files: List of SOP files.
+        """
+        remote_links = [href for sop_file in sop_files for href in self.get_transient_sop(sop_file, keep=False).links if is_remote_github_link(href)]
+        self.link_checker.check(remote_links)
+
+    def get_sop(self, file_path: str) -> ParsedSOP:
+        """
+        Returns the ParsedSOP of the given file, loading it if it hasn't been done already.
+
+        :param file_path: Path to the SOP file.
+        :return: ParsedSOP object of the file.
+        """
+        if file_path not in self.sops:
+            self.sops[file_path] = load_sop(file_path)
+        return self.sops[file_path]
+
+    def get_transient_sop(self, file_path: str, keep: bool = None) -> ParsedSOP:
+        """
+        Returns the ParsedSOP of the given file for a one-off use (e.g., corpus indexes), without keeping it in memory afterwards
+        if releasing files.
+
+        :param file_path: Path to the SOP file.
+        :param keep: Whether to keep it in memory afterwards (optional, unless releasing files by default).
+        :return: ParsedSOP object of the file.
+        """
+        if not self.release_files if keep is None else keep:
+            return self.get_sop(file_path)
+        sop = self.sops.get(file_path) or load_sop(file_path)
+        if file_path not in self.sops:
+            forget_sop(file_path)
+        return sop
+
+    def get_repository_identifiers(self, input_file: str) -> Set[str]:
+        """
+        Collects the SOP identifiers of all the SOP files of the repository (from their filenames), if it hasn't been done already.
+
+        :param input_file: Path to one of the input SOP files, used to determine the repo root.
+        :return: SOP identifiers of the repository (empty if the file is not within a repository).
+        """
+        if self.repository_identifiers is None:
+            try:
+                repository_files = collect_sop_files([find_repository_root(input_file)])
+            except ValueError:
+                repository_files = []
+            self.repository_identifiers = {get_filename_identifier(file_path) for file_path in repository_files} - {None}
+        return self.repository_identifiers
+
+    def get_charter_sop(self, input_file: str) -> ParsedSOP:
+        """
+        Parses the Charter document into a ParsedSOP object if it hasn't been parsed already.
         Dynamically determines the Charter path based on the input file's repository structure.
         
         :param input_file: Path to one of the input SOP files, used to determine the repo root.
-        :return: BeautifulSoup object of the parsed Charter document.
+        :return: ParsedSOP object of the Charter document.
         """
-        if hasattr(self, 'charter_soup') and self.charter_soup:
-            return self.charter_soup
+        if hasattr(self, 'charter_sop') and self.charter_sop:
+            return self.charter_sop
 
         # Determine the repository root by searching for .git in parent directories
-        repo_root = os.path.dirname(os.path.abspath(input_file))
-        while not os.path.isdir(os.path.join(repo_root, '.git')):
-            parent_dir = os.path.dirname(repo_root)
-            if parent_dir == repo_root:  # We've reached the root of the file system
-                raise ValueError("Repository root not found. Ensure the script is run within a GitHub repository.")
-            repo_root = parent_dir
+        repo_root = find_repository_root(input_file)
 
         # Construct the Charter path relative to the repository root
         charter_path = os.path.join(repo_root, 'docs', 'GDI-SOP_charter.md')
 
         # Parse the Charter document
         try:
-            with open(charter_path, 'r') as charter_file:
-                charter_content = charter_file.read()
-            charter_html = markdown.markdown(charter_content, extensions=['tables'])
-            self.charter_soup = BeautifulSoup(charter_html, 'html.parser')
+            self.charter_sop = load_sop(charter_path)
         except FileNotFoundError:
             raise ValueError(f"Charter document not found at '{charter_path}'. Please verify the file path.")
         except Exception as e:
             raise ValueError(f"Error parsing the Charter document: {str(e)}")
 
-        return self.charter_soup
+        return self.charter_sop
 
-    def find_tables(self, soup: BeautifulSoup, file_path: str, aim_headers: List[str]) -> List[BeautifulSoup]:
+    def get_charter_glossary(self, input_file: str) -> GlossaryIndex:
         """
-        Uses imported function to find all tables by their set of headers
-        Returns a list of tables.
+        Compiles the glossary index of the Charter, along with the other reference glossaries, if it hasn't been done already.
+
+        :param input_file: Path to one of the input SOP files, used to determine the repo root.
+        :return: GlossaryIndex of the Charter and reference glossaries.
+        """
+        if self.charter_glossary is None:
+            charter_path = self.get_charter_sop(input_file).file_path
+            self.charter_glossary = load_glossary_index([charter_path] + list(self.reference_glossaries))
+        return self.charter_glossary
+
+    def get_charter_soup(self, input_file: str) -> BeautifulSoup:
+        """
+        Returns the BeautifulSoup object of the parsed Charter document.
+
+        :param input_file: Path to one of the input SOP files, used to determine the repo root.
+        :return: BeautifulSoup object of the parsed Charter document.
         """
-        if not self.tables[file_path]:
-            self.tables[file_path] = soup.find_all('table')
-        aim_tables = find_tables(soup=soup, aim_headers=aim_headers, tables=self.tables[file_path]) 
-        return aim_tables
+        return self.get_charter_sop(input_file).soup
 
     def is_valid_version(self, version: str) -> bool:
         """
@@ -723,35 +1086,249 @@ class SOPLinter:
         except InvalidVersion:
             return False
 
-    def report_issue(self, message: str, file_path: str, error: bool = False, warning: bool = False):
+    def report_issue(self, message: str, file_path: str, severity: str = None):
         """
         Reports an issue found during linting.
 
         :param message: Description of the issue.
         :param file_path: Path to the SOP file.
-        :param error: Whether the issue is an error (True) or a warning (False).
+        :param severity: Severity of the issue ('error' or 'warning'), if not the one of the linting rule being run
+                         (e.g., a rule of severity 'error' reporting a minor issue as a warning).
         """
-        issue_type = "errors" if error or self.strict else "warnings"
-        self.results[file_path][issue_type].append(message)
+        severity = severity or (self.current_rule.severity if self.current_rule else "error")
+        issue_type = "errors" if severity == "error" or self.strict else "warnings"
+        self.results.setdefault(file_path, {"errors": [], "warnings": []})[issue_type].append(message)
 
     def generate_report(self) -> str:
         """
         Generates a JSON formatted report of all linting results.
+        If streaming, the results were already reported, and only the summary is reported.
 
-        :return: JSON string of the linting results and a boolean on whether there are errors or not
+        :return: JSON string of the linting results (None if streaming) and a boolean on whether there are errors or not
         """
+        if self.reporter:
+            has_errors = self.reporter.report_summary(self.profiler.summary() if self.profiler else None)
+            return None, has_errors or (self.profiler is not None and self.profiler.has_failures())
+
         has_errors = any(file_results['errors'] for file_results in self.results.values())
-        return json.dumps(self.results, indent=2), has_errors
+        if not self.profiler:
+            return json.dumps(self.results, indent=2), has_errors
 
-def parse_args() -> Any:
+        # Profiling summary of the whole corpus, next to the results of each file (not among them, since files are keyed by path)
+        has_errors = has_errors or self.profiler.has_failures()
+        return json.dumps({"files": self.results, "profile": self.profiler.summary()}, indent=2), has_errors
+
+# Linter of each worker process, created once by '_init_lint_worker'
+_worker_linter = None
+
+def _init_lint_worker(linter_options: Dict, cache_dir: str, charter_input: str, resolved_links: Dict[str, bool]):
     """
-    Parses command-line arguments.
+    Initializes a worker process of the parallel linting, loading the Charter only once per worker.
 
-    :return: Parsed arguments.
+    :param linter_options: Keyword arguments of the SOPLinter.
+    :param cache_dir: Directory of the on-disk parse cache, if enabled.
+    :param charter_input: Path to one of the input SOP files, used to locate the Charter.
+    :param resolved_links: Remote links already resolved by the main process.
+    """
+    global _worker_linter
+    if cache_dir:
+        enable_parse_cache(cache_dir, evict=False)  # Eviction is already done by the main process
+    profiler_options = linter_options.pop("profiler_options", None)
+    _worker_linter = SOPLinter(**linter_options, profiler=RuleProfiler(**profiler_options) if profiler_options else None)
+    _worker_linter.link_checker.results.update(resolved_links)
+    if _worker_linter.requires("charter_glossary"):
+        try:
+            _worker_linter.get_charter_glossary(charter_input)
+        except ValueError:
+            pass  # The error is reported when linting the files, as in a sequential run
+
+def _lint_in_worker(file_path: str) -> Tuple[Dict, str, Dict]:
+    """
+    Lints a single SOP file within a worker process.
+
+    :param file_path: Path to the SOP file.
+    :return: Linting results of the file, the output printed while linting it, and its profiling record (if enabled).
+    """
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        _worker_linter.lint_sop(file_path)
+    profile_record = _worker_linter.profiler.pop(file_path) if _worker_linter.profiler else None
+    return _worker_linter.results.pop(file_path), output.getvalue(), profile_record
+
+def lint_in_parallel(linter: SOPLinter, sop_files: List[str], jobs: int, timeout: float = None, cache_dir: str = None):
+    """
+    Lints the SOP files over a pool of worker processes, merging their results into the linter in input order,
+    so that the report is the same as in a sequential run.
+    If linting a file takes longer than the timeout, an error is reported for it, and the (stuck) workers are replaced.
+
+    :param linter: SOPLinter where the results are merged.
+    :param sop_files: List of SOP files to lint.
+    :param jobs: Number of worker processes.
+    :param timeout: Maximum number of seconds to lint a single file (optional).
+    :param cache_dir: Directory of the on-disk parse cache, if enabled (optional).
+    """
+    linter_options = {
+        "verbosity": linter.verbosity,
+        "strict": linter.strict,
+        "required_sections": linter.required_sections,
+        "reference_glossaries": linter.reference_glossaries,
+        "profiler_options": linter.profiler.options() if linter.profiler else None,
+        "rules": [rule.id for rule in linter.rules],
+        "release_files": linter.release_files
+    }
+    sop_files = list(dict.fromkeys(sop_files))
+    outcomes = {}
+    pending = list(sop_files)
+    next_output = 0  # Outputs and results are added in input order as well
+
+    def flush_outputs():
+        nonlocal next_output
+        while next_output < len(sop_files) and sop_files[next_output] in outcomes:
+            results, output, profile_record = outcomes.pop(sop_files[next_output])
+            print(output, end="")
+            linter.add_results(sop_files[next_output], results, profile_record)
+            next_output += 1
+
+    while pending:
+        pool = multiprocessing.Pool(processes=jobs, initializer=_init_lint_worker, initargs=(linter_options, cache_dir, sop_files[0], linter.link_checker.results))
+        completed = queue.Queue()  # (file path, outcome, error) of each linted file, put by the result thread of the pool
+        # At most one file per worker is submitted, so that each file starts as soon as it's submitted
+        running = {}
+        try:
+            while pending or running:
+                while pending and len(running) < jobs:
+                    file_path = pending.pop(0)
+                    running[file_path] = time.monotonic()
+                    pool.apply_async(_lint_in_worker, (file_path,),
+                                     callback=lambda outcome, file_path=file_path: completed.put((file_path, outcome, None)),
+                                     error_callback=lambda error, file_path=file_path: completed.put((file_path, None, error)))
+
+                try:
+                    done = [completed.get(timeout=1 if timeout else None)]
+                    while not completed.empty():
+                        done.append(completed.get())
+                except queue.Empty:
+                    done = []
+                for file_path, outcome, error in done:
+                    if error:
+                        raise error
+                    del running[file_path]
+                    outcomes[file_path] = outcome
+                flush_outputs()
+
+                expired = [file_path for file_path, start in running.items() if timeout and time.monotonic() - start > timeout]
+                if expired:
+                    for file_path in expired:
+                        del running[file_path]
+                        outcomes[file_path] = ({"errors": [f"Linting timed out after {timeout} seconds. Some linting rule could not handle the content of this SOP."], "warnings": []}, "", None)
+                    # A worker stuck on a file can't be interrupted, so the pool is replaced and the other running files are linted again
+                    pending = list(running) + pending
+                    break
+        finally:
+            # Terminating the pool kills its workers, including the ones stuck on a file
+            pool.terminate()
+            pool.join()
+        flush_outputs()
+
+def lint_and_collect(linter: SOPLinter, inputs: List[str], lint_files: List[str], file_results: Dict[str, Dict]) -> Dict[str, Dict]:
+    """
+    Lints the given files and the whole corpus again, and collects the issues of every SOP file.
+
+    :param linter: SOPLinter, keeping the Charter and the unchanged SOPs in memory.
+    :param inputs: Input files or directories, to collect the current SOP files.
+    :param lint_files: SOP files to lint again.
+    :param file_results: Results of the SOP-level rules of each file, updated with the linted files.
+    :return: All the issues of each SOP file, as {file: {'errors': [...], 'warnings': [...]}}.
+    """
+    sop_files = collect_sop_files(inputs)
+    for file_path in set(file_results) - set(sop_files):
+        del file_results[file_path]
+
+    if linter.requires("network"):
+        linter.check_remote_links(lint_files)
+        linter.link_checker.save_cache()
+    linter.results = {}
+    for file_path in lint_files:
+        linter.lint_sop(file_path)
+    file_results.update(linter.results)
+
+    linter.results = {}
+    linter.lint_corpus(sop_files)
+    corpus_results, linter.results = linter.results, {}
+
+    issues = {}
+    for file_path in dict.fromkeys(list(file_results) + list(corpus_results)):
+        issues[file_path] = {issue_type: file_results.get(file_path, {}).get(issue_type, []) + corpus_results.get(file_path, {}).get(issue_type, [])
+                             for issue_type in ["errors", "warnings"]}
+    return issues
+
+def print_issue_changes(previous_issues: Dict[str, Dict], issues: Dict[str, Dict]):
+    """
+    Prints the issues added ('+') and fixed ('-') on each SOP file since the previous linting.
+
+    :param previous_issues: Issues of each SOP file in the previous linting.
+    :param issues: Issues of each SOP file in the current linting.
+    """
+    for file_path in dict.fromkeys(list(issues) + list(previous_issues)):
+        changes = []
+        for issue_type, label in [("errors", "error"), ("warnings", "warning")]:
+            previous = previous_issues.get(file_path, {}).get(issue_type, [])
+            current = issues.get(file_path, {}).get(issue_type, [])
+            changes += [f"  - {label}: {message}" for message in previous if message not in current]
+            changes += [f"  + {label}: {message}" for message in current if message not in previous]
+        if changes:
+            print(file_path)
+            print("\n".join(changes))
+
+def watch(linter: SOPLinter, inputs: List[str], lint_files: List[str], watch_paths: List[str], interval: float = 0.25, local_resolver: LocalRepositoryResolver = None):
+    """
+    Lints the given files, and then keeps watching for changes, linting again only the SOPs affected by each change and
+    printing the issues added or fixed. The Charter glossary and the unchanged SOPs are kept in memory between changes.
+    It runs until interrupted (e.g., Ctrl+C).
+
+    :param linter: SOPLinter to lint with.
+    :param inputs: Input files or directories, to collect the current SOP files after each change.
+    :param lint_files: SOP files to lint at first.
+    :param watch_paths: Files or directories to watch (e.g., the SOP directories and the one of the Charter).
+    :param interval: Seconds between polls for changes.
+    :param local_resolver: Resolver of the links to the local repository (optional).
+    """
+    watcher = PollingWatcher(watch_paths, interval=interval)
+    file_results = {}
+    issues = {}
+    try:
+        while True:
+            start = time.perf_counter()
+            previous_issues, issues = issues, lint_and_collect(linter, inputs, lint_files, file_results)
+            errors = sum(len(file_issues["errors"]) for file_issues in issues.values())
+            warnings = sum(len(file_issues["warnings"]) for file_issues in issues.values())
+            print(f"[{time.strftime('%H:%M:%S')}] Linted '{len(lint_files)}' SOPs in {time.perf_counter() - start:.3f}s "
+                  f"('{errors}' errors and '{warnings}' warnings in total)")
+            print_issue_changes(previous_issues, issues)
+            print(f"Watching for changes in {', '.join(watch_paths)}... (Ctrl+C to stop)", flush=True)
+
+            changed_paths = watcher.wait()
+            linter.forget_files(changed_paths)
+            sop_files = collect_sop_files(inputs)
+            lint_files = linter.select_affected_files(sop_files, changed_paths, local_resolver) if sop_files else []
+    except KeyboardInterrupt:
+        pass
+
+def is_remote_github_link(href: str) -> bool:
+    """
+    Checks if a link points to GitHub (i.e., it has to be checked remotely).
+    """
+    return href.startswith('https://github.com/')
+
+def add_arguments(parser: argparse.ArgumentParser) -> argparse.ArgumentParser:
+    """
+    Adds the command-line arguments of the SOP linter to a parser (e.g., the one of its subcommand in 'sop.py').
+
+    :param parser: Parser to add the arguments to.
+    :return: The same parser.
     """
-    parser = argparse.ArgumentParser(description="Lints SOP markdown files")
     parser.add_argument(
-        "inputs", nargs="+", help="SOP file(s) or directories to lint. Given directories will be explored, looking for markdown files following the SOP naming conventions"
+        "inputs", nargs="*", help="SOP file(s) or directories to lint. Given directories will be explored, looking for markdown files following the SOP naming conventions"
     )
     parser.add_argument(
         "-v", "--verbosity", type=int, default=0, help="Verbosity level (0-2). 0 prints nothing; 1 prints the end report; 2 prints the report of each file at each step"
@@ -759,32 +1336,191 @@ def parse_args() -> Any:
     parser.add_argument(
         "-s", "--strict", action="store_true", help="Treat warnings as errors."
     )
-    return parser.parse_args()
+    parser.add_argument(
+        "--cache-dir", type=str, help="Directory of the on-disk parse cache (e.g., '.sop-cache'). If given, unchanged SOPs are not parsed again across runs"
+    )
+    parser.add_argument(
+        "--reference-glossary", action="append", default=[], help="Other document(s) whose glossary terms are accepted besides the Charter ones. Can be given multiple times"
+    )
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=os.cpu_count() or 1, help="Number of files linted in parallel, each in its own process (default: number of CPUs). With 1, files are linted sequentially"
+    )
+    parser.add_argument(
+        "--timeout", type=float, default=300, help="Maximum number of seconds to lint a single file when linting in parallel, after which an error is reported for it (default: 300). 0 disables it"
+    )
+    parser.add_argument(
+        "--links-workers", type=int, default=8, help="Number of remote links checked concurrently (default: 8)"
+    )
+    parser.add_argument(
+        "--links-timeout", type=float, default=10, help="Timeout in seconds of each request to check a remote link (default: 10)"
+    )
+    parser.add_argument(
+        "--links-budget", type=int, default=1000, help="Maximum number of requests to check remote links per run (default: 1000). Links left unchecked are reported as warnings"
+    )
+    parser.add_argument(
+        "--links-cache", type=str, help="Path to the cache of remote links checked in previous runs (e.g., '.links-cache.json')"
+    )
+    parser.add_argument(
+        "--links-ttl", type=float, default=7, help="Days during which resolvable links are answered from the links cache (default: 7)"
+    )
+    parser.add_argument(
+        "--links-negative-ttl", type=float, default=1, help="Days during which unresolvable links are answered from the links cache (default: 1)"
+    )
+    parser.add_argument(
+        "--links-offline", action="store_true", help="Check remote links only from the links cache, without making any request. Links not cached are reported as warnings"
+    )
+    parser.add_argument(
+        "--github-server-url", type=str, help="Base URL of the GitHub web server to check the GitHub links against (e.g., the one of 'gh_stub_server.py'). Default: 'GITHUB_SERVER_URL' environment variable, or 'https://github.com'"
+    )
+    parser.add_argument(
+        "--local-repository", type=str, default="GenomicDataInfrastructure/standard-operating-procedures", help="GitHub repository (owner/name) of the local checkout, whose blob/tree links are checked locally instead of remotely. Empty to check all links remotely"
+    )
+    parser.add_argument(
+        "--local-branch", type=str, default="main", help="Branch whose links are checked against the local checkout (default: 'main')"
+    )
+    parser.add_argument(
+        "--local-ref", type=str, help="Git reference (e.g., 'origin/main') to check the local links against, instead of the working tree"
+    )
+    parser.add_argument(
+        "--rules", type=lambda value: value.split(","), help="Comma-separated IDs of the only linting rules to run (e.g., 'title,identifier-and-casing'). See --list-rules"
+    )
+    parser.add_argument(
+        "--skip-rules", type=lambda value: value.split(","), help="Comma-separated IDs of linting rules not to run (e.g., 'resolvable-references'). See --list-rules"
+    )
+    parser.add_argument(
+        "--list-rules", action="store_true", help="Lists the available linting rules and exits"
+    )
+    parser.add_argument(
+        "--changed-since", type=str, help="Git reference (e.g., 'origin/main'). Only the SOPs affected by the changes since then are linted, while corpus-level checks still cover all SOPs"
+    )
+    parser.add_argument(
+        "--profile-rules", action="store_true", help="Adds a profile to the report, with the time spent parsing the SOPs and by each linting rule, per file and in total. The report is then split into 'files' (the results of each file) and 'profile' (or, with '--output-format ndjson', a 'profile' record is added before the summary)"
+    )
+    parser.add_argument(
+        "--profile-top", type=int, default=10, help="Number of slowest rules and files listed in the profile (default: 10)"
+    )
+    parser.add_argument(
+        "--rule-budget", type=float, help="Maximum number of seconds a linting rule may take on a single file, reported as an issue of the file when exceeded. It also adds the profile to the report (see --profile-rules)"
+    )
+    parser.add_argument(
+        "--rule-budget-action", choices=["warn", "fail"], default="warn", help="Whether exceeding the rule time budget is reported as a warning or as an error (default: 'warn')"
+    )
+    parser.add_argument(
+        "--watch", action="store_true", help="Keep running, and lint again the SOPs affected by each change in the inputs, the Charter or the reference glossaries, printing the issues added or fixed. Files are linted in this process (i.e., '--jobs' is ignored), keeping the Charter and unchanged SOPs in memory"
+    )
+    parser.add_argument(
+        "--watch-interval", type=float, default=0.25, help="Seconds between polls for changes in watch mode (default: 0.25)"
+    )
+    parser.add_argument(
+        "--output-format", choices=["json", "ndjson"], default="json", help="Format of the report. 'json' reports all files at the end, while 'ndjson' streams one JSON record per line as soon as each file is linted, followed by a summary record (default: 'json')"
+    )
+    return parser
 
-def main():
+def parse_args() -> Any:
     """
-    Main function to run the SOP linter.
+    Parses command-line arguments.
+
+    :return: Parsed arguments.
     """
-    args = parse_args()
+    return add_arguments(argparse.ArgumentParser(description="Lints SOP markdown files")).parse_args()
+
+def run_linter(args: Any) -> Tuple[str, bool]:
+    """
+    Lints the given SOPs (or watches them, see 'watch'), according to the parsed arguments.
+    If streaming NDJSON records, anything else printed while linting (e.g., with verbosity 2) goes to the standard error,
+    so that the standard output can be consumed as NDJSON.
+
+    :param args: Parsed arguments (see 'add_arguments').
+    :return: JSON string of the linting results (None if streamed or watched) and a boolean on whether there are errors or not.
+    """
+    if args.output_format == "ndjson":
+        records = sys.stdout
+        with contextlib.redirect_stdout(sys.stderr):
+            return lint_inputs(args, records)
+    return lint_inputs(args)
+
+def lint_inputs(args: Any, records: TextIO = None) -> Tuple[str, bool]:
+    """
+    Lints the given SOPs (or watches them, see 'watch'), according to the parsed arguments (see 'run_linter').
+
+    :param args: Parsed arguments (see 'add_arguments').
+    :param records: Stream of the NDJSON records, if streaming them (optional).
+    :return: JSON string of the linting results (None if streamed or watched) and a boolean on whether there are errors or not.
+    """
+    if not args.inputs:
+        raise ValueError("At least one SOP file or directory to lint has to be given")
+    if args.watch and args.output_format == "ndjson":
+        raise ValueError("Watch mode reports the changes of the issues, and it can not be combined with the 'ndjson' output format")
+
+    if args.cache_dir:
+        enable_parse_cache(args.cache_dir, verbosity=args.verbosity)
     sop_files = collect_sop_files(args.inputs)
 
+    # Heading level and text contained in the title of each required section (e.g., '### 8. Procedure')
     required_sections = {
-        "## Index": "h2:contains('Index')",
-        "### Document History": "h3:contains('Document History')",
-        "### Glossary": "h3:contains('Glossary')",
-        "### Roles and Responsibilities": "h3:contains('Roles and Responsibilities')",
-        "### Purpose": "h3:contains('Purpose')",
-        "### Scope": "h3:contains('Scope')",
-        "### Procedure": "h3:contains('Procedure')",
-        "### References": "h3:contains('References')"
+        "## Index": (2, "Index"),
+        "### Document History": (3, "Document History"),
+        "### Glossary": (3, "Glossary"),
+        "### Roles and Responsibilities": (3, "Roles and Responsibilities"),
+        "### Purpose": (3, "Purpose"),
+        "### Scope": (3, "Scope"),
+        "### Procedure": (3, "Procedure"),
+        "### References": (3, "References")
     }
 
-    linter = SOPLinter(verbosity=args.verbosity, strict=args.strict, required_sections=required_sections)
-    for sop_file in sop_files:
-        linter.lint_sop(sop_file, sop_files)
+    links_cache = LinkCache(args.links_cache, positive_ttl_days=args.links_ttl, negative_ttl_days=args.links_negative_ttl) if args.links_cache else None
+    local_resolver = None
+    if args.local_repository and sop_files:
+        try:
+            local_resolver = LocalRepositoryResolver(find_repository_root(sop_files[0]), repository=args.local_repository, branch=args.local_branch, git_ref=args.local_ref)
+        except ValueError:
+            pass  # Not within a repository checkout, so all links are checked remotely
+    link_checker = RemoteLinkChecker(max_workers=args.links_workers, timeout=args.links_timeout, request_budget=args.links_budget,
+                                     cache=links_cache, offline=args.links_offline, local_resolver=local_resolver, server_url=args.github_server_url,
+                                     verbosity=args.verbosity)
+    profiler = RuleProfiler(top=args.profile_top, budget=args.rule_budget, budget_action=args.rule_budget_action) if args.profile_rules or args.rule_budget is not None else None
+    linter = SOPLinter(verbosity=args.verbosity, strict=args.strict, required_sections=required_sections, reference_glossaries=args.reference_glossary,
+                       link_checker=link_checker, profiler=profiler, rules=select_rules(args.rules, args.skip_rules),
+                       reporter=NDJSONReporter(records if args.verbosity > 0 else None) if args.output_format == "ndjson" else None)
+    lint_files = sop_files
+    if args.changed_since and sop_files:
+        lint_files = linter.select_changed_files(sop_files, args.changed_since, local_resolver)
+
+    if args.watch:
+        watch_paths = list(args.inputs) + list(args.reference_glossary)
+        if sop_files:
+            watch_paths.append(os.path.dirname(linter.get_charter_sop(sop_files[0]).file_path))
+        watch(linter, args.inputs, lint_files, watch_paths, interval=args.watch_interval, local_resolver=local_resolver)
+        return None, False
+
+    # All remote links are collected and resolved first, so that each of them is only requested once
+    if linter.requires("network"):
+        linter.check_remote_links(lint_files)
+        link_checker.save_cache()
+    if args.jobs > 1 and len(lint_files) > 1:
+        lint_in_parallel(linter, lint_files, jobs=min(args.jobs, len(lint_files)), timeout=args.timeout or None, cache_dir=args.cache_dir)
+    else:
+        for sop_file in lint_files:
+            linter.lint_sop(sop_file)
+    # Corpus-level checks always cover all SOPs (unchanged ones are usually answered from the parse cache)
+    linter.lint_corpus(sop_files)
+
+    return linter.generate_report()
+
+def main(args: Any = None):
+    """
+    Main function to run the SOP linter.
+
+    :param args: Parsed arguments (optional, parsed from the command line by default).
+    """
+    args = args or parse_args()
+    if args.list_rules:
+        for rule in RULES.values():
+            print(f"{rule.id} ({'corpus-level, ' if rule.corpus else ''}{rule.severity}, requires: {', '.join(rule.requires) or '-'}): {rule.description}")
+        exit(0)
 
-    report, has_errors = linter.generate_report()
-    if args.verbosity > 0:
+    report, has_errors = run_linter(args)
+    if args.verbosity > 0 and report is not None:
         print(report)
 
     # These exit codes will be interpreted downstream
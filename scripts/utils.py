@@ -1,10 +1,545 @@
 import os
 import re
-from bs4 import BeautifulSoup
-from typing import List, Dict
-import requests
+import html
+import time
+import hashlib
+import markdown
+import bs4
+from types import MappingProxyType
+from bs4 import BeautifulSoup, Tag
+from typing import List, Dict, Tuple, Optional, Iterable, Iterator, Set, Any, NamedTuple, TYPE_CHECKING
+from parse_cache import ParseCache
 
-def find_tables(soup: BeautifulSoup, aim_headers: List[str], tables: List[BeautifulSoup] = None) -> List[BeautifulSoup]:
+if TYPE_CHECKING:
+    import requests
+
+# Version of the artefact extraction below. Bump it whenever the extracted data changes,
+#   so that the on-disk parse caches built by previous versions are not used anymore
+EXTRACTOR_VERSION = "3"
+
+# Headers of the tables that are extracted from every SOP
+METADATA_HEADERS = ["Metadata", "Value"]
+DOCUMENT_HISTORY_HEADERS = ["Template Version", "Instance version", "Author(s)", "Description of changes", "Date"]
+ROLES_HEADERS = ["Role", "Full name", "GDI/node role", "Organisation"]
+
+# Names of all the artefacts extracted from an SOP, stored in the parse cache
+ARTEFACTS = ["metadata_rows", "document_history_rows", "roles_rows", "glossary", "headings", "links", "image_paths"]
+
+class ParsedSOP:
+    def __init__(self, file_path: str, content: str, content_hash: str, artefacts: Dict = None):
+        """
+        Holds the content of an SOP file, parsed only once and only when needed.
+        The rendered soup and the extracted artefacts (tables, glossary, headings) are computed lazily.
+
+        :param file_path: Path to the SOP file.
+        :param content: Raw markdown content of the file.
+        :param content_hash: SHA-256 hash of the raw file content.
+        :param artefacts: Already extracted artefacts (e.g., from the parse cache) (optional).
+        """
+        self.file_path = file_path
+        self.content = content
+        self.content_hash = content_hash
+        self._soup = None
+        self._sections = None
+        self._tables = None
+        self._glossary_index = None
+        self._structure = False  # Not extracted yet (None if it couldn't be extracted)
+        self._artefacts = dict(artefacts) if artefacts else {}
+        # Seconds spent in each parse phase (e.g., 'read', 'markdown', 'soup'), for profiling purposes
+        self.timings: Dict[str, float] = {}
+
+    def add_timing(self, phase: str, seconds: float):
+        """
+        Accounts time spent in a parse phase of the document.
+
+        :param phase: Name of the parse phase (e.g., 'markdown').
+        :param seconds: Seconds spent.
+        """
+        self.timings[phase] = self.timings.get(phase, 0) + seconds
+
+    def parse_seconds(self) -> float:
+        """
+        Total seconds spent parsing the document so far, across all phases.
+        """
+        return sum(self.timings.values())
+
+    @property
+    def soup(self) -> BeautifulSoup:
+        """
+        BeautifulSoup object of the rendered markdown content, created on first access.
+        """
+        if self._soup is None:
+            start = time.perf_counter()
+            html_content = markdown.markdown(self.content, extensions=['tables'])
+            rendered = time.perf_counter()
+            self._soup = BeautifulSoup(html_content, 'html.parser')
+            self.add_timing('markdown', rendered - start)
+            self.add_timing('soup', time.perf_counter() - rendered)
+        return self._soup
+
+    def _artefact(self, name: str, extractor):
+        """
+        Returns an extracted artefact, computing it on first access.
+        """
+        if name not in self._artefacts:
+            self._artefacts[name] = extractor()
+        return self._artefacts[name]
+
+    @property
+    def structure(self) -> Optional[Dict[str, List]]:
+        """
+        Headings, tables, links and images read directly from the markdown (fast path, see 'extract_markdown_structure'),
+        or None if the document can't be reliably read without rendering it.
+        """
+        if self._structure is False:
+            start = time.perf_counter()
+            self._structure = extract_markdown_structure(self.content)
+            self.add_timing('structure', time.perf_counter() - start)
+        return self._structure
+
+    @property
+    def tables(self) -> "TableRegistry":
+        """
+        Registry of all the tables of the document by their headers, built on first access.
+        Read directly from the markdown when possible, otherwise from the rendered soup (reference/fallback path).
+        """
+        if self._tables is None:
+            if self.structure is not None:
+                self._tables = TableRegistry.from_structure(self.structure)
+            else:
+                self._tables = TableRegistry.from_soup(self.soup)
+        return self._tables
+
+    def _table_rows(self, aim_headers: List[str]) -> Optional[List[List[str]]]:
+        """
+        Extracts the cell text of the rows (header excluded) of the first table matching the given headers.
+        Returns None if no such table exists.
+        """
+        tables_rows = self.tables.rows(aim_headers)
+        return tables_rows[0] if tables_rows else None
+
+    @property
+    def metadata_rows(self) -> Optional[List[List[str]]]:
+        """
+        Rows of the 'Metadata | Value' table, or None if the table is missing.
+        """
+        return self._artefact('metadata_rows', lambda: self._table_rows(METADATA_HEADERS))
+
+    @property
+    def document_history_rows(self) -> Optional[List[List[str]]]:
+        """
+        Rows of the Document History table (most recent first), or None if the table is missing.
+        """
+        return self._artefact('document_history_rows', lambda: self._table_rows(DOCUMENT_HISTORY_HEADERS))
+
+    @property
+    def roles_rows(self) -> Optional[List[List[str]]]:
+        """
+        Rows of the Roles and Responsibilities table, or None if the table is missing.
+        """
+        return self._artefact('roles_rows', lambda: self._table_rows(ROLES_HEADERS))
+
+    @property
+    def glossary(self) -> Dict[str, str]:
+        """
+        Glossary items of the SOP with their descriptions.
+        """
+        return self._artefact('glossary', lambda: parse_glossary(self._soup, registry=self.tables))
+
+    @property
+    def glossary_index(self) -> "GlossaryIndex":
+        """
+        Lookup index of the glossary of the SOP, compiled on first access.
+        """
+        if self._glossary_index is None:
+            self._glossary_index = GlossaryIndex(self.glossary)
+        return self._glossary_index
+
+    @property
+    def headings(self) -> List[Tuple[int, str]]:
+        """
+        Outline of the document as a list of (level, text) headings, in document order.
+        """
+        return self._artefact('headings', lambda: self.structure["headings"] if self.structure is not None else self._soup_headings())
+
+    def _soup_headings(self) -> List[Tuple[int, str]]:
+        """
+        Extracts the outline of the document from the rendered soup.
+        """
+        return [(int(header.name[1]), header.text.strip()) for header in self.soup.find_all(re.compile(r'^h[1-6]$'))]
+
+    @property
+    def sections(self) -> "SectionIndex":
+        """
+        Index of the sections of the document, built on first access (not stored in the parse cache).
+        """
+        if self._sections is None:
+            self._sections = SectionIndex(self.soup)
+        return self._sections
+
+    @property
+    def links(self) -> List[str]:
+        """
+        Targets (href) of all the links in the document, in document order.
+        """
+        return self._artefact('links', lambda: self._references("links", lambda soup: [link['href'] for link in soup.find_all('a', href=True)]))
+
+    @property
+    def image_paths(self) -> List[str]:
+        """
+        Paths (src) of all the images referenced in the document.
+        """
+        return self._artefact('image_paths', lambda: self._references("image_paths", get_image_paths))
+
+    def _references(self, name: str, soup_extractor) -> List[str]:
+        """
+        Extracts the links or images of the document, directly from the markdown when possible, otherwise from the rendered soup.
+        """
+        if self.structure is not None and self.structure[name] is not None:
+            return self.structure[name]
+        return soup_extractor(self.soup)
+
+    def extract_artefacts(self) -> Dict:
+        """
+        Extracts all the artefacts of the document.
+
+        :return: Dictionary of all artefacts, by name.
+        """
+        return {name: getattr(self, name) for name in ARTEFACTS}
+
+class TableRegistry:
+    def __init__(self):
+        """
+        Registry of the tables of a document, by their normalized (lowercase) header tuple.
+        Each table is stored with the text of the cells of its rows (header row excluded), so that
+        looking tables up or reading them does not require walking them again.
+        """
+        self._by_headers = {}
+
+    def add(self, headers: List[str], rows: List[List[str]], table: Tag = None):
+        """
+        Adds a table to the registry.
+
+        :param headers: Text of the header cells.
+        :param rows: Text of the cells of each row (header row excluded).
+        :param table: Table node, if read from a soup (optional).
+        """
+        key = tuple(header.strip().lower() for header in headers)
+        self._by_headers.setdefault(key, []).append((rows, table))
+
+    @classmethod
+    def from_soup(cls, soup: BeautifulSoup) -> "TableRegistry":
+        """
+        Builds the registry of all tables of a soup, in a single pass.
+
+        :param soup: BeautifulSoup object of the parsed content.
+        :return: Registry of the tables.
+        """
+        registry = cls()
+        for table in soup.find_all('table'):
+            headers = [header.text for header in table.find_all('th')]
+            rows = [[col.text.strip() for col in row.find_all('td')] for row in table.find_all('tr')[1:]]
+            registry.add(headers, rows, table)
+        return registry
+
+    @classmethod
+    def from_structure(cls, structure: Dict[str, List]) -> "TableRegistry":
+        """
+        Builds the registry of the tables read directly from the markdown (see 'extract_markdown_structure').
+
+        :param structure: Structure of the markdown document.
+        :return: Registry of the tables.
+        """
+        registry = cls()
+        for headers, rows in structure["tables"]:
+            registry.add(headers, rows)
+        return registry
+
+    def rows(self, aim_headers: List[str]) -> List[List[List[str]]]:
+        """
+        Gets the rows of all tables matching the given headers (regardless of upper/lowercase).
+
+        :param aim_headers: List of headers to match.
+        :return: List with the rows of each matching table, in document order.
+        """
+        return [rows for rows, _ in self._by_headers.get(tuple(header.lower() for header in aim_headers), [])]
+
+    def find(self, aim_headers: List[str]) -> List[Tag]:
+        """
+        Gets the table nodes matching the given headers (only for registries built from a soup).
+
+        :param aim_headers: List of headers to match.
+        :return: List of tables that match the headers.
+        """
+        return [table for _, table in self._by_headers.get(tuple(header.lower() for header in aim_headers), []) if table is not None]
+
+class GlossaryIndex:
+    __slots__ = ('_terms', '_by_lowercase')
+
+    def __init__(self, glossary: Dict[str, str]):
+        """
+        Immutable lookup structure of the terms of one or more glossaries, compiled once and shared
+        by all the checks (e.g., the Charter glossary is compiled once per run instead of once per SOP).
+
+        :param glossary: Glossary items with their descriptions.
+        """
+        terms = dict(glossary)
+        by_lowercase = {}
+        for term in terms:
+            by_lowercase.setdefault(term.lower(), term)  # First term wins among case variants
+        object.__setattr__(self, '_terms', MappingProxyType(terms))
+        object.__setattr__(self, '_by_lowercase', MappingProxyType(by_lowercase))
+
+    def __setattr__(self, name: str, value: Any):
+        raise AttributeError("GlossaryIndex is immutable")
+
+    @classmethod
+    def from_glossaries(cls, *glossaries: Dict[str, str]) -> "GlossaryIndex":
+        """
+        Compiles several glossaries into a single index. If a term is defined more than once,
+        the definition of the first glossary is kept.
+
+        :param glossaries: Glossaries with their descriptions, by priority.
+        :return: Index of all glossary terms.
+        """
+        terms = {}
+        for glossary in glossaries:
+            for term, description in glossary.items():
+                terms.setdefault(term, description)
+        return cls(terms)
+
+    def __contains__(self, term: str) -> bool:
+        return term in self._terms
+
+    def __len__(self) -> int:
+        return len(self._terms)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._terms)
+
+    def lookup(self, term: str, ignore_case: bool = False, plural: bool = False) -> Optional[str]:
+        """
+        Looks a term up in the glossary.
+
+        :param term: Term to look up (e.g., 'SOPs').
+        :param ignore_case: Whether the match is case-insensitive (optional).
+        :param plural: Whether a term ending in 's' also matches its singular form, e.g., 'SOPs' matches 'SOP' (optional).
+        :return: Term as defined in the glossary, or None if it is not found.
+        """
+        candidates = [term]
+        if plural and term.endswith('s'):
+            candidates.append(term[:-1])
+
+        for candidate in candidates:
+            if candidate in self._terms:
+                return candidate
+            if ignore_case and candidate.lower() in self._by_lowercase:
+                return self._by_lowercase[candidate.lower()]
+        return None
+
+    def definition(self, term: str, ignore_case: bool = False, plural: bool = False) -> Optional[str]:
+        """
+        Gets the description of a term (see 'lookup' for the matching options).
+
+        :return: Description of the term, or None if it is not found.
+        """
+        match = self.lookup(term, ignore_case=ignore_case, plural=plural)
+        return self._terms[match] if match is not None else None
+
+    def to_dict(self) -> Dict[str, str]:
+        """
+        Returns the glossary items of the index, in a JSON serializable form (e.g., to store it in the parse cache).
+        """
+        return dict(self._terms)
+
+class Section(NamedTuple):
+    """
+    Section of a document: its heading and the range of top-level nodes it spans.
+    """
+    level: int  # Level of the heading (e.g., 3 for "### 8. Procedure")
+    title: str  # Text of the heading (e.g., "8. Procedure")
+    normalized_title: str  # Lowercase title without numbering (e.g., "procedure")
+    heading: Tag  # Heading node
+    start: int  # Index of the first top-level node after the heading
+    end: int  # Index of the next heading of the same or higher level (or the end of the document)
+
+class SectionIndex:
+    def __init__(self, soup: BeautifulSoup):
+        """
+        Index of the sections of a document, built in a single pass over its top-level nodes.
+        Each section spans until the next heading of the same or higher level.
+
+        :param soup: BeautifulSoup object of the parsed content.
+        """
+        self.nodes = [node for node in soup.children if isinstance(node, Tag)]
+        self.sections = []
+        self._by_title = {}
+
+        open_sections = []  # Stack of (level, title, heading, start) of the sections not closed yet
+        for i, node in enumerate(self.nodes):
+            if node.name and re.match(r'^h[1-6]$', node.name):
+                level = int(node.name[1])
+                while open_sections and open_sections[-1][0] >= level:
+                    self._add_section(*open_sections.pop(), end=i)
+                open_sections.append((level, node.text.strip(), node, i + 1))
+        while open_sections:
+            self._add_section(*open_sections.pop(), end=len(self.nodes))
+
+        self.sections.sort(key=lambda section: section.start)
+
+    def _add_section(self, level: int, title: str, heading: Tag, start: int, end: int):
+        section = Section(level, title, normalize_section_title(title), heading, start, end)
+        self.sections.append(section)
+        # Only the first section with a given title is kept for lookups
+        if (level, section.normalized_title) not in self._by_title or self._by_title[(level, section.normalized_title)].start > start:
+            self._by_title[(level, section.normalized_title)] = section
+
+    def get(self, level: int, title: str) -> Optional[Section]:
+        """
+        Gets the first section of the given level and title (regardless of numbering and upper/lowercase).
+
+        :param level: Level of the section heading (e.g., 3).
+        :param title: Title of the section (e.g., "Procedure").
+        :return: The section, or None if not found.
+        """
+        return self._by_title.get((level, normalize_section_title(title)))
+
+    def find_containing(self, level: int, text: str) -> Optional[Section]:
+        """
+        Finds the first section of the given level whose title contains some text (e.g., "### 5. Roles and Responsibilities
+        of the DAC" for "Roles and Responsibilities"), as the CSS selector 'h3:contains(...)' would.
+
+        :param level: Level of the section heading (e.g., 3).
+        :param text: Text contained in the title (case-sensitive).
+        :return: The section, or None if not found.
+        """
+        return next((section for section in self.sections if section.level == level and text in section.title), None)
+
+    def content(self, section: Section) -> List[Tag]:
+        """
+        Gets the top-level nodes within a section (i.e., between its heading and the end of the section).
+
+        :param section: Section of this index.
+        :return: List of nodes of the section, including the ones of its subsections.
+        """
+        return self.nodes[section.start:section.end]
+
+def normalize_section_title(title: str) -> str:
+    """
+    Normalizes a section title for lookups, removing its numbering (e.g., "8. Procedure" -> "procedure").
+
+    :param title: Title of the section.
+    :return: Normalized title.
+    """
+    title = re.sub(r'^\d+(?:\.\d+)*\.?\s*', '', title.strip())
+    return re.sub(r'\s+', ' ', title).lower()
+
+# Per-process memo of parsed SOPs, keyed by absolute file path (and validated against the content hash)
+_parsed_sops: Dict[str, ParsedSOP] = {}
+
+# On-disk parse cache, only used if enabled through 'enable_parse_cache'
+_parse_cache: Optional[ParseCache] = None
+
+def enable_parse_cache(cache_dir: str, verbosity: int = 0, evict: bool = True) -> ParseCache:
+    """
+    Enables the on-disk parse cache for all SOPs loaded afterwards through 'load_sop'.
+    On a cache hit, the artefacts of an SOP are read from the cache, and its markdown is not rendered
+    unless something needs the soup itself.
+
+    :param cache_dir: Directory of the parse cache (e.g., '.sop-cache').
+    :param verbosity: Level of verbosity for output messages.
+    :param evict: Whether to evict old entries right away (e.g., not in worker processes sharing the cache) (optional).
+    :return: The enabled ParseCache.
+    """
+    global _parse_cache
+    # Changes in the parsing libraries may change the extracted data as well
+    version = f"{EXTRACTOR_VERSION}:markdown-{markdown.__version__}:bs4-{bs4.__version__}"
+    _parse_cache = ParseCache(cache_dir, version=version, verbosity=verbosity)
+    if evict:
+        _parse_cache.evict()
+    return _parse_cache
+
+def load_sop(file_path: str, raw_content: bytes = None) -> ParsedSOP:
+    """
+    Reads an SOP file and returns its ParsedSOP, reusing the one already created during this run
+    if the file content has not changed. This way each file is only rendered and parsed once per run,
+    regardless of how many scripts or linting rules make use of it.
+
+    :param file_path: Path to the SOP file.
+    :param raw_content: Content of the file, if already read (optional), so that it is not read again.
+    :return: ParsedSOP object of the file.
+    """
+    start = time.perf_counter()
+    if raw_content is None:
+        with open(file_path, 'rb') as file:
+            raw_content = file.read()
+    content_hash = hashlib.sha256(raw_content).hexdigest()
+
+    key = os.path.abspath(file_path)
+    parsed_sop = _parsed_sops.get(key)
+    if parsed_sop is None or parsed_sop.content_hash != content_hash:
+        # Same decoding as reading the file in text mode (i.e., universal newlines)
+        content = raw_content.decode('utf-8').replace('\r\n', '\n').replace('\r', '\n')
+        read_seconds = time.perf_counter() - start
+        if _parse_cache:
+            start = time.perf_counter()
+            artefacts = _parse_cache.get(content_hash)
+            parsed_sop = ParsedSOP(file_path, content, content_hash, artefacts)
+            parsed_sop.add_timing('cache', time.perf_counter() - start)
+            if artefacts is None:
+                artefacts = parsed_sop.extract_artefacts()
+                start = time.perf_counter()
+                _parse_cache.put(content_hash, artefacts)
+                parsed_sop.add_timing('cache', time.perf_counter() - start)
+        else:
+            parsed_sop = ParsedSOP(file_path, content, content_hash)
+        parsed_sop.add_timing('read', read_seconds)
+        _parsed_sops[key] = parsed_sop
+    return parsed_sop
+
+def load_glossary_index(file_paths: List[str]) -> GlossaryIndex:
+    """
+    Compiles the glossaries of the given reference documents (e.g., the Charter) into a single index.
+    If the parse cache is enabled, the compiled index is stored in it, keyed by the content hash of the documents.
+
+    :param file_paths: Paths to the reference documents, by priority.
+    :return: Index of the glossary terms of all documents.
+    """
+    reference_sops = [load_sop(file_path) for file_path in file_paths]
+    index_hash = hashlib.sha256(("glossary-index:" + ":".join(sop.content_hash for sop in reference_sops)).encode('utf-8')).hexdigest()
+
+    cached = _parse_cache.get(index_hash) if _parse_cache else None
+    if cached is not None:
+        return GlossaryIndex(cached)
+
+    glossary_index = GlossaryIndex.from_glossaries(*[sop.glossary for sop in reference_sops])
+    if _parse_cache:
+        _parse_cache.put(index_hash, glossary_index.to_dict())
+    return glossary_index
+
+def hash_file(file_path: str, chunk_size: int = 1 << 16) -> str:
+    """
+    Computes the SHA-256 hash of a file, reading it in chunks (i.e., the same hash as the 'content_hash' of its ParsedSOP).
+
+    :param file_path: Path to the file.
+    :param chunk_size: Number of bytes read at a time.
+    :return: Hexadecimal digest of the file content.
+    """
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as file:
+        for chunk in iter(lambda: file.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def forget_sop(file_path: str):
+    """
+    Removes an SOP from the per-process memo of 'load_sop', so that its memory can be released once it is not needed anymore.
+
+    :param file_path: Path to the SOP file.
+    """
+    _parsed_sops.pop(os.path.abspath(file_path), None)
+
+def find_tables(soup: BeautifulSoup, aim_headers: List[str], tables: List[BeautifulSoup] = None, registry: "TableRegistry" = None) -> List[BeautifulSoup]:
     """
     Finds all tables by their set of headers, among all tables in the given file content (soup).
     Returns a list of tables.
@@ -12,8 +547,12 @@ def find_tables(soup: BeautifulSoup, aim_headers: List[str], tables: List[Beauti
     :param soup: BeautifulSoup object of the parsed content.
     :param aim_headers: List of headers to match.
     :param tables: List of tables in the soup (optional).
+    :param registry: Table registry of the soup, to look the tables up without walking them again (optional).
     :return: List of tables that match the headers.
     """
+    if registry is not None:
+        return registry.find(aim_headers)
+
     if not tables:
         tables = soup.find_all('table')
 
@@ -45,26 +584,62 @@ def collect_sop_files(inputs: List[str]) -> List[str]:
                         sop_files.append(os.path.join(root, file))
     return sop_files
 
-def count_procedure_steps(soup: BeautifulSoup, procedure_header: str = "Procedure") -> int:
+def find_repository_root(file_path: str) -> str:
+    """
+    Finds the root of the git repository containing the given file, by searching for .git in parent directories
+    (a directory, or a file in worktrees and submodules).
+
+    :param file_path: Path to a file within the repository.
+    :return: Path to the repository root.
+    """
+    repo_root = os.path.dirname(os.path.abspath(file_path))
+    while not os.path.exists(os.path.join(repo_root, '.git')):
+        parent_dir = os.path.dirname(repo_root)
+        if parent_dir == repo_root:  # We've reached the root of the file system
+            raise ValueError("Repository root not found. Ensure the script is run within a GitHub repository.")
+        repo_root = parent_dir
+    return repo_root
+
+def count_procedure_steps(soup: BeautifulSoup, procedure_header: str = "Procedure", sections: "SectionIndex" = None) -> int:
     """
     Counts the number of steps in the 'Procedure' section of an SOP.
 
     :param soup: BeautifulSoup object of the parsed SOP content.
     :param procedure_header: Keyword to identify the procedure header (optional)
+    :param sections: Section index of the SOP, to avoid building it again (optional)
     :return: Number of steps in the 'Procedure' section.
     """
-    procedure_section = soup.find(re.compile('^h3$'), text=re.compile(rf'^\d*\.*\s*{procedure_header}$', re.IGNORECASE))
-    num_steps = 0
-    if procedure_section:
-        for sibling in procedure_section.find_next_siblings():
-            if re.match(r'^h[1-6]$', sibling.name) and sibling.name <= procedure_section.name:
-                break
-            if re.match(r'^h4$', sibling.name):
-                # We count as steps the headers of each step "#### ..." in the SOP
-                num_steps += 1
-    else:
+    if sections is None:
+        sections = SectionIndex(soup)
+
+    procedure_section = sections.get(3, procedure_header)
+    if not procedure_section:
         return None
-    
+
+    # We count as steps the headers of each step "#### ..." in the SOP
+    return sum(1 for node in sections.content(procedure_section) if node.name == 'h4')
+
+def count_procedure_steps_in_headings(headings: List[Tuple[int, str]], procedure_header: str = "Procedure") -> int:
+    """
+    Counts the number of steps in the 'Procedure' section of an SOP, based on the outline of its headings.
+    Equivalent to 'count_procedure_steps', but without requiring the parsed content.
+
+    :param headings: List of (level, text) headings of the SOP, in document order.
+    :param procedure_header: Keyword to identify the procedure header (optional)
+    :return: Number of steps in the 'Procedure' section.
+    """
+    procedure_regex = re.compile(rf'^\d*\.*\s*{procedure_header}$', re.IGNORECASE)
+    num_steps = None
+    for level, text in headings:
+        if num_steps is None:
+            if level == 3 and procedure_regex.match(text):
+                num_steps = 0
+        elif level <= 3:
+            break
+        elif level == 4:
+            # We count as steps the headers of each step "#### ..." in the SOP
+            num_steps += 1
+
     return num_steps
 
 def build_hyperlink(file_path: str, relative_directory: str = "sops"):
@@ -87,62 +662,60 @@ def build_hyperlink(file_path: str, relative_directory: str = "sops"):
 
 def get_gh_issues(gh_repo: str, gh_token: str, issue_params: Dict):
     """
-    Gets all GH issues of the given repository with specific criteria
+    Gets all GH issues of the given repository with specific criteria, across all pages (see 'gh_client.GitHubClient')
 
     :param gh_repo: GitHub repository path (e.g., 'GenomicDataInfrastructure/standard-operating-procedures')
     :param gh_token: GitHub token to authorize
     :param issue_params: Parameters used to filter the GH issues (e.g., '{"state": "open", "labels": "SOP-Review"}')
     """
-    url = f"https://api.github.com/repos/{gh_repo}/issues"
-    headers = {"Authorization": f"token {gh_token}"}
-
-    response = requests.get(url, headers=headers, params=issue_params)
-    if response.status_code != 200:
-        raise ValueError(f"Failed to fetch GH issues: {response.status_code}, {response.text}")
-    
-    # GH's API treats issues and pull requests similarly, so we filter them here
-    all_issues = [issue for issue in response.json() if "pull_request" not in issue]
-    
-    return all_issues
+    from gh_client import GitHubClient  # Only imported when needed, so that offline scripts don't load the network stack
+    return GitHubClient(token=gh_token).list_issues(gh_repo, issue_params)
 
-def parse_glossary(soup: BeautifulSoup) -> Dict[str, str]:
+def parse_glossary(soup: BeautifulSoup, registry: "TableRegistry" = None) -> Dict[str, str]:
     """
     Parses glossary tables in a BeautifulSoup object, looking for tables that 
     contain headers such as 'Abbreviation' or 'Term' and extracts them into a dictionary.
     
     :param soup: BeautifulSoup object of the SOP or Charter content.
+    :param registry: Table registry of the content, used instead of the soup if given (optional).
     :return: Dictionary of glossary items with their descriptions.
     """
     glossary = {}
+    if registry is None:
+        registry = TableRegistry.from_soup(soup)
 
     # Define headers to match glossary tables
     aim_headers_list = [["Abbreviation", "Description"], ["Term", "Definition"]]
 
     # Loop through possible glossary header types
     for aim_headers in aim_headers_list:
-        tables = find_tables(soup, aim_headers)
-        for table in tables:
-            rows = table.find_all('tr')
-            for row in rows[1:]:  # Skip the header row
-                columns = row.find_all('td')
+        for rows in registry.rows(aim_headers):
+            for columns in rows:  # Header row is already skipped
                 if len(columns) >= 2:
                     # First column is the term, second is the description
-                    key = columns[0].text.strip()
-                    description = columns[1].text.strip()
+                    key = columns[0]
+                    description = columns[1]
                     if key:
                         glossary[key] = description
 
     return glossary
 
-def is_remote_reference_resolvable(url: str) -> bool:
+def is_remote_reference_resolvable(url: str, timeout: float = 10, session: "requests.Session" = None) -> bool:
     """
-    Checks if a remote reference URL is resolvable (does not return 404).
+    Checks if a remote reference URL is resolvable (does not return 404). GitHub URLs are requested from the
+    GitHub web server set in 'GITHUB_SERVER_URL', if any (see 'gh_client.to_server_url').
+    To check many URLs, see 'link_checker.RemoteLinkChecker' instead.
     
     :param url: The URL to check.
+    :param timeout: Timeout of the request, in seconds (optional).
+    :param session: HTTP session to reuse its connections (optional).
     :return: True if the URL is reachable and does not return 404, False otherwise.
     """
+    import requests  # Only imported when needed, so that offline scripts don't load the network stack
+    from gh_client import to_server_url
+
     try:
-        response = requests.head(url, allow_redirects=True)
+        response = (session or requests).head(to_server_url(url), allow_redirects=True, timeout=timeout)
         return response.status_code != 404
     except requests.RequestException:
         return False
@@ -154,4 +727,407 @@ def get_image_paths(soup: BeautifulSoup) -> List[str]:
     :param soup: BeautifulSoup object of the parsed SOP content.
     :return: List of image paths.
     """
-    return [img['src'] for img in soup.find_all('img') if 'src' in img.attrs]
\ No newline at end of file
+    return [img['src'] for img in soup.find_all('img') if 'src' in img.attrs]
+
+class MarkdownStructureError(ValueError):
+    """
+    Raised when the structure of a markdown document cannot be reliably extracted
+    without rendering it (e.g., nested tables, raw HTML blocks, blockquotes or setext headers).
+    """
+
+# Characters that can be backslash-escaped in markdown (with the 'tables' extension)
+MARKDOWN_ESCAPABLE = "\\`*_{}[]()>#+-.!|"
+
+ATX_HEADING_RE = re.compile(r'^(#{1,6})((?:\\.|[^\\])*?)#*$')
+SETEXT_UNDERLINE_RE = re.compile(r'^[=-]+ *$')
+HTML_BLOCK_RE = re.compile(r'^ {0,3}<[a-zA-Z/!?]')
+BLOCKQUOTE_RE = re.compile(r'^ {0,3}>')
+LIST_ITEM_RE = re.compile(r'^ *(?:[-*+]|\d+[.)])\s')
+LIST_ITEM_STRUCTURE_RE = re.compile(r'^ {0,3}(?:[-*+]|\d+[.)])\s+[#|]')
+TABLE_END_BORDER_RE = re.compile(r'(?<!\\)(?:\\\\)*\|$')
+TABLE_CODE_PIPES_RE = re.compile(r'(?:(\\\\)|(\\`+)|(`+)|(\\\|)|(\|))')
+INLINE_HTML_TAG_RE = re.compile(r'<(?:/?[a-zA-Z][^\s"\'<>@]*(?:\s+[^\s"\'=<>]+(?:\s*=\s*(?:"[^"]*"|\'[^\']*\'|[^\s"\'=<>]+))?)*\s*/?|!--(?:(?!<!--|-->).)*--)>')
+INLINE_AUTOLINK_RE = re.compile(r'<((?:[Ff]|[Hh][Tt])[Tt][Pp][Ss]?://[^<>]*)>')
+INLINE_IMAGE_RE = re.compile(r'!\[([^\[\]]*)\]\(([^()]*)\)')
+INLINE_LINK_RE = re.compile(r'\[([^\[\]]*)\]\(([^()]*)\)')
+INLINE_REFERENCE_SYNTAX_RE = re.compile(r'\]\s*\(|<(?:(?:[Ff]|[Hh][Tt])[Tt][Pp][Ss]?://|[^<> !]+@|(?:a|img)\b)', re.IGNORECASE)
+LINK_DEFINITION_RE = re.compile(r'\[[^\]]*\]:')
+INLINE_ENTITY_RE = re.compile(r'&(?:#[0-9]+|#x[0-9a-fA-F]+|[a-zA-Z0-9]+);')
+INLINE_ASTERISK_RE = re.compile(r'(\*{1,3})(?!\s)(.+?)(?<!\s)\1')
+INLINE_UNDERSCORE_RE = re.compile(r'(?<!\w)(_{1,3})(?!\s)(.+?)(?<!\s)\1(?!\w)')
+
+def stash_inline_literals(text: str) -> Tuple[str, List[str], Set[int]]:
+    """
+    Stashes away the literal parts of inline markdown (backslash-escaped characters and code spans) behind
+    placeholders, so that they don't take part in the rest of the inline markup.
+
+    :param text: Inline markdown text.
+    :return: Markup with the placeholders, the stashed literals (by placeholder number) and the placeholder numbers of the code spans.
+    :raises MarkdownStructureError: If a code span is not closed.
+    """
+    if '\x02' in text or '\x03' in text:
+        raise MarkdownStructureError(f"Unexpected control characters in '{text}'")
+
+    literals = []
+    code_spans = set()
+    markup = ""
+    i = 0
+    while i < len(text):
+        char = text[i]
+        if char == '\\' and i + 1 < len(text) and text[i + 1] in MARKDOWN_ESCAPABLE:
+            literals.append(text[i + 1])
+            markup += f"\x02{len(literals) - 1}\x03"
+            i += 2
+        elif char == '`':
+            n_ticks = len(text[i:]) - len(text[i:].lstrip('`'))
+            closing = re.compile(rf'(?<!`)`{{{n_ticks}}}(?!`)').search(text, i + n_ticks)
+            if not closing:
+                raise MarkdownStructureError(f"Unmatched code span in '{text}'")
+            literals.append(text[i + n_ticks:closing.start()].strip())
+            code_spans.add(len(literals) - 1)
+            markup += f"\x02{len(literals) - 1}\x03"
+            i = closing.end()
+        else:
+            markup += char
+            i += 1
+    return markup, literals, code_spans
+
+def markdown_inline_text(text: str) -> str:
+    """
+    Returns the plain text that rendering the given inline markdown would produce (i.e., the '.text'
+    of its HTML), handling backslash escapes, code spans, links, images, autolinks, entities and emphasis.
+
+    :param text: Inline markdown text (e.g., the content of a table cell or header).
+    :return: Plain text of the rendered markdown.
+    :raises MarkdownStructureError: If the text contains markup that is not handled (e.g., inline HTML).
+    """
+    markup, literals, _ = stash_inline_literals(text)
+
+    markup = INLINE_AUTOLINK_RE.sub(lambda m: m.group(1), markup)
+    if re.search(r'<[^<> !]+@|</?(?:table|thead|tbody|tr|th|td|h[1-6])\b', markup, re.IGNORECASE):
+        raise MarkdownStructureError(f"Inline HTML that changes the structure of '{text}'")
+    # Inline HTML tags (e.g., '<br>') and comments have no text of their own
+    markup = INLINE_HTML_TAG_RE.sub('', markup)
+    if re.search(r'<[a-zA-Z/!?]', markup):
+        raise MarkdownStructureError(f"Inline HTML in '{text}'")
+
+    # Images have no text, while links keep their text
+    markup = INLINE_IMAGE_RE.sub('', markup)
+    markup = INLINE_LINK_RE.sub(lambda m: m.group(1), markup)
+    if re.search(r'\[[^\]]*\]', markup):
+        raise MarkdownStructureError(f"Reference link in '{text}'")
+
+    markup = INLINE_ENTITY_RE.sub(lambda m: html.unescape(m.group(0)), markup)
+
+    # Emphasis markers are dropped, any leftover (unpaired) marker is ambiguous
+    markup = INLINE_ASTERISK_RE.sub(lambda m: m.group(2), markup)
+    markup = INLINE_UNDERSCORE_RE.sub(lambda m: m.group(2), markup)
+    if '*' in markup or re.search(r'(?<!\w)_|_(?!\w)', markup):
+        raise MarkdownStructureError(f"Ambiguous emphasis in '{text}'")
+
+    return re.sub(r'\x02(\d+)\x03', lambda m: literals[int(m.group(1))], markup)
+
+def markdown_inline_references(text: str) -> Tuple[List[str], List[str]]:
+    """
+    Returns the targets of the links (href) and images (src) that rendering the given inline markdown would produce,
+    in document order, handling backslash escapes, code spans, inline links and images, and autolinks.
+
+    :param text: Inline markdown text (e.g., a paragraph or the content of a table cell).
+    :return: Link targets and image paths of the text.
+    :raises MarkdownStructureError: If the text contains references that are not handled (e.g., inline HTML links or link titles).
+        Reference links are not handled either, so documents with link definitions should not be read with this function.
+    """
+    # Without any link or image syntax, the text has no references however its code spans are read (e.g., unclosed ones)
+    if not INLINE_REFERENCE_SYNTAX_RE.search(text):
+        return [], []
+    markup, literals, code_spans = stash_inline_literals(text)
+
+    def target(value: str) -> str:
+        # Escaped characters are unescaped in targets, while code spans, titles, entities and spaces are not handled
+        value = value.strip()
+        if re.search(r'[\s<>"\']', value) or INLINE_ENTITY_RE.search(value) or any(int(n) in code_spans for n in re.findall(r'\x02(\d+)\x03', value)):
+            raise MarkdownStructureError(f"Unhandled link target in '{text}'")
+        return re.sub(r'\x02(\d+)\x03', lambda m: literals[int(m.group(1))], value)
+
+    if re.search(r'<[^<> !]+@|<(?:a|img)\b', markup, re.IGNORECASE):
+        raise MarkdownStructureError(f"Inline HTML reference in '{text}'")
+
+    # Images are read first, since they may be nested within the text of links
+    image_paths = [target(m.group(2)) for m in INLINE_IMAGE_RE.finditer(markup)]
+    markup = INLINE_IMAGE_RE.sub('', markup)
+
+    links = []
+    for m in re.finditer(f"{INLINE_AUTOLINK_RE.pattern}|{INLINE_LINK_RE.pattern}", markup):
+        if m.group(1) is not None:
+            links.append(target(m.group(1)))
+        elif '<' in m.group(2):
+            raise MarkdownStructureError(f"Markup within the text of a link in '{text}'")
+        else:
+            links.append(target(m.group(3)))
+    # Other brackets are plain text, unless they are followed by a target (e.g., nested brackets)
+    markup = INLINE_LINK_RE.sub('', markup)
+    if re.search(r'\]\s*\(', markup):
+        raise MarkdownStructureError(f"Unhandled link in '{text}'")
+
+    return links, image_paths
+
+def split_table_row(row: str, border: bool) -> List[str]:
+    """
+    Splits a row of a markdown pipe table into its cells, the same way the 'tables' extension does:
+    pipes within code spans and escaped pipes are not treated as cell delimiters.
+
+    :param row: Row of the table, stripped of surrounding spaces.
+    :param border: Whether the table has leading/trailing pipes (based on its header row).
+    :return: List of (unstripped) cells of the row.
+    """
+    if border:
+        if row.startswith('|'):
+            row = row[1:]
+        row = TABLE_END_BORDER_RE.sub('', row)
+
+    pipes = []
+    tics = []
+    tic_points = []
+    for m in TABLE_CODE_PIPES_RE.finditer(row):
+        if m.group(2):
+            # Escaped tics: \`+ (the escape does not count towards the tic length)
+            tics.append(len(m.group(2)) - 1)
+            tic_points.append((m.start(2), m.end(2) - 1, 1))
+        elif m.group(3):
+            tics.append(len(m.group(3)))
+            tic_points.append((m.start(3), m.end(3) - 1, 0))
+        elif m.group(5):
+            pipes.append(m.start(5))
+
+    # Pair up tics of the same size to find the code regions
+    tic_regions = []
+    pos = 0
+    while pos < len(tics):
+        tic_size = tics[pos] - tic_points[pos][2]
+        if tic_size and tic_size in tics[pos + 1:]:
+            index = tics[pos + 1:].index(tic_size) + 1
+            tic_regions.append((tic_points[pos][0], tic_points[pos + index][1]))
+            pos += index + 1
+        else:
+            pos += 1
+
+    # Pipes within code regions are not delimiters
+    delimiters = [pipe for pipe in pipes if not any(start <= pipe <= end for start, end in tic_regions)]
+
+    cells = []
+    pos = 0
+    for pipe in delimiters:
+        cells.append(row[pos:pipe])
+        pos = pipe + 1
+    cells.append(row[pos:])
+    return cells
+
+def is_table_separator_like(line: str) -> bool:
+    """
+    Checks if a line looks like the alignment row of a markdown pipe table (e.g., '|:---|---:|').
+    """
+    return '|' in line and '-' in line and set(line) <= set('|:- ')
+
+def iter_markdown_structure(lines: Iterable[str], references: bool = False) -> Iterator[Tuple[str, Any]]:
+    """
+    Reads markdown line by line, yielding its ATX headings and top-level pipe tables without rendering it,
+    with the same semantics as 'markdown' (with the 'tables' extension) + BeautifulSoup. Yields events:
+        - ("heading", (level, text)) for each heading
+        - ("table", header_cells) at the start of each table
+        - ("row", cells) for each row of the last started table
+        - ("link", href) and ("image", src) for each link and image, if reading references
+        - ("references", None) if the rest of the links and images can't be reliably read without rendering
+    Since it is a generator, consumers can stop reading as soon as they found what they needed.
+
+    :param lines: Iterable of lines of the markdown document (e.g., an open file).
+    :param references: Whether to read the links and images of the document as well (optional).
+    :raises MarkdownStructureError: If the document has structures that can't be reliably read without rendering.
+    """
+    lines = iter(lines)
+    next_line = None
+    block_start = True  # Whether the current line starts a new markdown block
+    table_columns = 0  # Number of columns of the table being read (0 if not reading a table)
+    table_has_rows = False
+    paragraph = []  # Lines of the paragraphs and list items being read, for their links and images
+
+    def reference_events(texts: List[str]) -> List[Tuple[str, Any]]:
+        events = []
+        for text in texts:
+            links, image_paths = markdown_inline_references(text)
+            events += [("link", href) for href in links] + [("image", src) for src in image_paths]
+        return events
+
+    def read_references(texts: List[str], alternative_texts: List[str] = None) -> List[Tuple[str, Any]]:
+        nonlocal references
+        if not references:
+            return []
+        try:
+            events = reference_events(texts)
+            # Only the order of the links among themselves and of the images among themselves matters
+            by_kind = lambda events: sorted(events, key=lambda event: event[0])
+            if alternative_texts is not None and by_kind(reference_events(alternative_texts)) != by_kind(events):
+                raise MarkdownStructureError(f"Ambiguous list items: '{texts[0]}'")
+        except MarkdownStructureError:
+            references = False
+            return [("references", None)]
+        return events
+
+    def read_paragraph() -> List[Tuple[str, Any]]:
+        # Lines starting like list items may be list items (inline blocks of their own) or not (e.g., right after a paragraph),
+        #   so the references are only read if they are the same either way
+        items = []
+        for paragraph_line in paragraph:
+            if not items or LIST_ITEM_RE.match(paragraph_line):
+                items.append(paragraph_line)
+            else:
+                items[-1] += "\n" + paragraph_line
+        events = read_references(["\n".join(paragraph)], items if len(items) > 1 else None) if paragraph else []
+        paragraph.clear()
+        return events
+
+    def read_line():
+        line = next(lines, None)
+        if line is None:
+            return None
+        line = line.rstrip('\r\n').expandtabs(4)
+        return line if line.strip() else ""  # Whitespace-only lines are blank lines
+
+    line = read_line()
+    while line is not None:
+        next_line = read_line()
+
+        if line and HTML_BLOCK_RE.match(line):
+            raise MarkdownStructureError(f"Raw HTML: '{line}'")
+        # Headings and tables within blockquotes or list items are rendered as well, but nested in them
+        if line and BLOCKQUOTE_RE.match(line):
+            raise MarkdownStructureError(f"Blockquote: '{line}'")
+        if line and LIST_ITEM_STRUCTURE_RE.match(line):
+            raise MarkdownStructureError(f"Heading or table within a list item: '{line}'")
+        if references and LINK_DEFINITION_RE.search(line):
+            # Link definitions (also within list items) apply to the reference links of the whole document
+            references = False
+            yield "references", None
+
+        if table_columns:
+            if line:
+                cells = table_row(line)
+                yield from read_references(cells)
+                yield "row", [markdown_inline_text(cell.strip(' ')).strip() for cell in cells]
+                table_has_rows = True
+                line = next_line
+                continue
+            if not table_has_rows:
+                # An empty table still has an empty row
+                yield "row", [""] * table_columns
+            table_columns = 0
+
+        if not line:
+            yield from read_paragraph()
+            block_start = True
+
+        elif ATX_HEADING_RE.match(line):
+            m = ATX_HEADING_RE.match(line)
+            yield from read_paragraph()
+            yield from read_references([m.group(2)])
+            yield "heading", (len(m.group(1)), markdown_inline_text(m.group(2).strip()).strip())
+            block_start = True  # The rest of the block after a heading is a block of its own
+
+        elif block_start and len(line) - len(line.lstrip(' ')) >= 4:
+            # Indented code, or content of a list item: only plain content is expected there
+            if is_table_separator_like(line.strip(' ')):
+                raise MarkdownStructureError(f"Table-like content within an indented block: '{line}'")
+            indented_lines = [line]
+            while next_line and next_line.startswith('    '):
+                if is_table_separator_like(next_line.strip(' ')):
+                    raise MarkdownStructureError(f"Table-like content within an indented block: '{next_line}'")
+                indented_lines.append(next_line)
+                next_line = read_line()
+            if references and INLINE_REFERENCE_SYNTAX_RE.search("\n".join(indented_lines)):
+                # Whether its links are rendered depends on the indented block being code or not
+                references = False
+                yield "references", None
+            block_start = False
+
+        elif block_start and next_line is not None and '|' in line:
+            header = line.strip(' ')
+            border = header.startswith('|') or TABLE_END_BORDER_RE.search(header) is not None
+            header_cells = split_table_row(header, border)
+            separator_cells = split_table_row(next_line.strip(' '), border)
+            if len(header_cells) == 1 and border:
+                raise MarkdownStructureError(f"Single column table: '{line}'")
+            if len(header_cells) > 1 and len(separator_cells) == len(header_cells) and set(''.join(separator_cells)) <= set('|:- '):
+                table_row = lambda row: (split_table_row(row.strip(' '), border) + [""] * len(header_cells))[:len(header_cells)]
+                yield from read_references(header_cells)
+                yield "table", [markdown_inline_text(cell.strip(' ')).strip() for cell in header_cells]
+                table_columns = len(header_cells)
+                table_has_rows = False
+                next_line = read_line()  # Skip the alignment row
+            elif is_table_separator_like(line.strip(' ')):
+                raise MarkdownStructureError(f"Table-like content outside of a table: '{line}'")
+            else:
+                paragraph.append(line)
+            block_start = False
+
+        else:
+            if is_table_separator_like(line.strip(' ')):
+                raise MarkdownStructureError(f"Table-like content outside of a table: '{line}'")
+            if not block_start and SETEXT_UNDERLINE_RE.match(line):
+                raise MarkdownStructureError(f"Setext header: '{line}'")
+            paragraph.append(line)
+            block_start = False
+
+        line = next_line
+
+    if table_columns and not table_has_rows:
+        yield "row", [""] * table_columns
+    yield from read_paragraph()
+
+def extract_markdown_structure(content: str) -> Optional[Dict[str, List]]:
+    """
+    Extracts the headings, the top-level pipe tables, the links and the images of a markdown document, without rendering it.
+
+    :param content: Markdown content of the document.
+    :return: Dictionary with the "headings" (list of (level, text)), the "tables" (list of (header cells, rows)),
+        the "links" (list of href) and the "image_paths" (list of src), or None if the document can't be reliably read
+        without rendering it. The links and images are None if only them can't be reliably read.
+    """
+    structure = {"headings": [], "tables": [], "links": [], "image_paths": []}
+    try:
+        for event, value in iter_markdown_structure(content.split('\n'), references=True):
+            if event == "heading":
+                structure["headings"].append(value)
+            elif event == "table":
+                structure["tables"].append((value, []))
+            elif event == "row":
+                structure["tables"][-1][1].append(value)
+            elif event == "link":
+                structure["links"].append(value)
+            elif event == "image":
+                structure["image_paths"].append(value)
+            elif event == "references":
+                structure["links"] = structure["image_paths"] = None
+    except MarkdownStructureError:
+        return None
+    return structure
+
+def read_first_table_row(file_path: str, aim_headers: List[str]) -> Optional[List[str]]:
+    """
+    Reads the first row of the first table matching the given headers (regardless of upper/lowercase) directly from
+    an SOP file, line by line, and stops reading as soon as it is found. Same result as the first row of 'TableRegistry.rows',
+    without reading, rendering or parsing the rest of the document.
+
+    :param file_path: Path to the SOP file.
+    :param aim_headers: List of headers to match.
+    :return: Cell text of the first row (header row excluded), or None if no table matches the headers.
+    :raises MarkdownStructureError: If the document can't be reliably read up to the row without rendering it
+        (e.g., raw HTML before the table), in which case the full parse ('load_sop') should be used instead.
+    """
+    aim_key = [header.lower() for header in aim_headers]
+    with open(file_path, 'r', encoding='utf-8') as file:
+        matched = False
+        for event, value in iter_markdown_structure(file):
+            if event == "table":
+                matched = [header.strip().lower() for header in value] == aim_key
+            elif event == "row" and matched:
+                return value
+    return None
@@ -0,0 +1,77 @@
+import os
+import subprocess
+import pytest
+
+from change_tracking import get_changed_paths, get_sop_dependencies, select_affected_files
+from utils import ParsedSOP, find_repository_root
+
+def git(repo_root, *args: str):
+    subprocess.run(["git", "-c", "user.name=test", "-c", "user.email=test@example.com"] + list(args), cwd=repo_root, check=True, capture_output=True)
+
+def write(path, content: str = "") -> str:
+    os.makedirs(os.path.dirname(str(path)), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as file:
+        file.write(content)
+    return str(path)
+
+def parsed_sop(file_path: str, content: str) -> ParsedSOP:
+    return ParsedSOP(file_path, content, "")
+
+@pytest.fixture
+def repository(tmp_path):
+    for path in ["sops/GDI-SOP0001_señal.md", "sops/GDI-SOP0002_with space.md", "sops/GDI-SOP0003_renamed.md", "docs/images/diagram.png"]:
+        write(tmp_path / path, path)
+    git(tmp_path, "init", "-q")
+    git(tmp_path, "add", ".")
+    git(tmp_path, "commit", "-q", "-m", "SOPs")
+    return tmp_path
+
+def test_changed_paths_are_not_quoted(repository):
+    write(repository / "sops" / "GDI-SOP0001_señal.md", "changed")
+    write(repository / "sops" / "GDI-SOP0002_with space.md", "changed")
+    git(repository, "mv", "sops/GDI-SOP0003_renamed.md", "sops/GDI-SOP0003_renombrado ñ.md")
+    write(repository / "sops" / "GDI-SOP0004_untracked ü.md")
+
+    assert get_changed_paths("HEAD", str(repository)) == {os.path.join(str(repository), "sops", name) for name in [
+        "GDI-SOP0001_señal.md", "GDI-SOP0002_with space.md", "GDI-SOP0003_renamed.md", "GDI-SOP0003_renombrado ñ.md", "GDI-SOP0004_untracked ü.md"
+    ]}
+
+def test_repository_root_of_worktrees(tmp_path):
+    # In worktrees and submodules, '.git' is a file pointing to the git directory
+    write(tmp_path / ".git", "gitdir: /elsewhere/.git/worktrees/sops\n")
+    sop_path = write(tmp_path / "sops" / "european-level" / "GDI-SOP0001_sop.md")
+    assert find_repository_root(sop_path) == str(tmp_path)
+
+def test_sop_dependencies_are_local_files_and_images(tmp_path):
+    file_path = str(tmp_path / "sops" / "GDI-SOP0001_sop.md")
+    sop = parsed_sop(file_path, "\n".join([
+        "See [the charter](../docs/GDI-SOP_charter.md#glossary), [the root](/README.md?plain=1) and [a section](#procedure).",
+        "Not [remote](https://example.org/a.md) nor [mail](mailto:sops@example.org) links.",
+        "![Diagram](../docs/images/diagram.png)",
+    ]))
+
+    assert get_sop_dependencies(file_path, sop, str(tmp_path)) == {
+        str(tmp_path / "docs" / "GDI-SOP_charter.md"), str(tmp_path / "README.md"), str(tmp_path / "docs" / "images" / "diagram.png")
+    }
+
+def test_affected_files_are_the_changed_sops_and_their_dependents(tmp_path):
+    sops = {
+        "changed": str(tmp_path / "sops" / "GDI-SOP0001_changed.md"),
+        "linking": str(tmp_path / "sops" / "GDI-SOP0002_linking.md"),
+        "unrelated": str(tmp_path / "sops" / "GDI-SOP0003_unrelated.md"),
+    }
+    contents = {
+        sops["changed"]: "# Changed\n",
+        sops["linking"]: "# Linking\n\nSee [the removed image](../docs/images/removed.png).\n",
+        sops["unrelated"]: "# Unrelated\n\nSee [another SOP](./GDI-SOP0004_other.md).\n",
+    }
+    get_sop = lambda file_path: parsed_sop(file_path, contents[file_path])
+    charter_path = str(tmp_path / "docs" / "GDI-SOP_charter.md")
+    changed_paths = {sops["changed"], str(tmp_path / "docs" / "images" / "removed.png")}
+
+    affected_files = select_affected_files(list(sops.values()), changed_paths, [charter_path], get_sop, str(tmp_path))
+    assert affected_files == [sops["changed"], sops["linking"]]
+
+    # All SOPs depend on the global dependencies (e.g., the Charter, or the directory of the linter)
+    assert select_affected_files(list(sops.values()), {charter_path}, [charter_path], get_sop, str(tmp_path)) == list(sops.values())
+    assert select_affected_files(list(sops.values()), {str(tmp_path / "scripts" / "utils.py")}, [str(tmp_path / "scripts")], get_sop, str(tmp_path)) == list(sops.values())
@@ -0,0 +1,136 @@
+import os
+import argparse
+from datetime import datetime
+import pytest
+
+import check_sop_reviews
+from utils import collect_sop_files, load_sop, forget_sop, read_first_table_row, MarkdownStructureError, DOCUMENT_HISTORY_HEADERS
+
+SOPS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "sops")
+TEMPLATE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "GDI-SOP0000_sop-template-for-linting.md")
+
+def parse_args(*arguments: str):
+    return check_sop_reviews.add_arguments(argparse.ArgumentParser()).parse_args([SOPS_DIR, *arguments])
+
+def test_dry_run_without_token_does_not_fetch_issues(monkeypatch):
+    monkeypatch.setattr(check_sop_reviews, "gh_token", None)
+    # Any request would fail, since nothing listens at this URL
+    report = check_sop_reviews.run_review_check(parse_args("-ct", "--dry-run", "--github-api-url", "http://127.0.0.1:9"))
+
+    assert report["reconciliation"]["issues_fetched"] is False
+    due_files = [individual_report["filepath"] for individual_report in report["all_files"] if individual_report["due_review"]]
+    assert [action["filepath"] for action in report["reconciliation"]["plan"]] == due_files
+    assert all(action["action"] == "create" for action in report["reconciliation"]["plan"])
+
+def test_changing_issues_requires_a_token(monkeypatch):
+    monkeypatch.setattr(check_sop_reviews, "gh_token", None)
+    with pytest.raises(EnvironmentError, match="GITHUB_TOKEN"):
+        check_sop_reviews.run_review_check(parse_args("-ct"))
+
+class FakeClient:
+    """
+    Stand-in of the GitHub client, recording the changes of the issues, and failing the first 'failures' updates.
+    """
+    def __init__(self, failures: int = 0):
+        self.failures = failures
+        self.comments = []
+        self.updates = []
+
+    def list_comments(self, gh_repo, issue_number):
+        return [{"body": body} for _, body in self.comments]
+
+    def add_comment(self, gh_repo, issue_number, body):
+        self.comments.append((issue_number, body))
+        return {"body": body}
+
+    def update_issue(self, gh_repo, issue_number, fields):
+        if self.failures:
+            self.failures -= 1
+            raise ValueError("Failed to update GH issue (injected)")
+        self.updates.append((issue_number, fields))
+        return {"html_url": f"https://github.com/issues/{issue_number}"}
+
+def plan_for(issue):
+    sop_file = os.path.join(SOPS_DIR, "european-level", "GDI-SOP0007_sop-template-creation.md")
+    report = {"all_files": [{"filepath": sop_file, "last_edit_date": "2020-01-01 00:00:00", "due_review": True}]}
+    return check_sop_reviews.plan_reconciliation(report, {"GDI-SOP0007": issue}, parse_args("-ct"))
+
+def test_issues_created_by_hand_only_get_the_missing_labels():
+    issue = {"number": 1, "html_url": "https://github.com/issues/1", "body": "Please review it", "labels": [{"name": "documentation"}]}
+    plan = plan_for(issue)
+    assert [action["action"] for action in plan] == ["relabel"]
+
+    client = FakeClient()
+    check_sop_reviews.execute_plan(plan, client, "owner/repo", {"GDI-SOP0007": issue}, 365)
+    assert client.updates == [(1, {"labels": ["documentation", "SOP-Review"]})]
+
+def test_issues_created_by_the_script_get_the_key_of_their_due_date():
+    body = check_sop_reviews.set_issue_key(f"{check_sop_reviews.created_by_script_text}.", "GDI-SOP0007:2019-06-01")
+    issue = {"number": 1, "html_url": "https://github.com/issues/1", "body": body, "labels": ["SOP-Review"]}
+    plan = plan_for(issue)
+    assert [(action["action"], action["previous_key"]) for action in plan] == [("rekey", "GDI-SOP0007:2019-06-01")]
+
+    client = FakeClient()
+    check_sop_reviews.execute_plan(plan, client, "owner/repo", {"GDI-SOP0007": issue}, 365)
+    assert client.updates == [(1, {"body": check_sop_reviews.set_issue_key(body, plan[0]["key"])})]
+
+def test_closing_comment_is_added_once_across_retries():
+    action = {"action": "close", "sop_id": "GDI-SOP0007", "filepath": "GDI-SOP0007_sop-template-creation.md", "key": "GDI-SOP0007:closed:1",
+              "last_edit_date": "2025-01-01 00:00:00", "issue_number": 1, "issue_url": "https://github.com/issues/1"}
+    client = FakeClient(failures=1)
+    check_sop_reviews.apply_action(action, client, "owner/repo", {}, 365, backoff_factor=0)
+
+    assert len(client.comments) == 1 and "GDI-SOP0007:closed:1" in client.comments[0][1]
+    assert client.updates == [(1, {"state": "closed", "state_reason": "completed"})]
+    # A later run (e.g., one that failed before journaling the closing) doesn't comment again either
+    check_sop_reviews.apply_action(action, client, "owner/repo", {}, 365, backoff_factor=0)
+    assert len(client.comments) == 1
+
+def test_last_edit_date_is_read_as_the_full_parse_does():
+    for sop_file in collect_sop_files([SOPS_DIR]) + [TEMPLATE_PATH]:
+        sop = load_sop(sop_file)
+        assert read_first_table_row(sop_file, DOCUMENT_HISTORY_HEADERS) == sop.document_history_rows[0]
+        assert check_sop_reviews.read_last_edit_date(sop_file) == check_sop_reviews.get_last_edit_date(sop, sop_file)
+        forget_sop(sop_file)
+
+def write_document_history(tmp_path, old: str, new: str) -> str:
+    """
+    Writes a copy of the template for linting, replacing a part before or within its Document History table.
+    """
+    with open(TEMPLATE_PATH, 'r') as file:
+        content = file.read()
+    assert old in content
+    sop_file = str(tmp_path / "GDI-SOP0000_sop-template-for-linting.md")
+    with open(sop_file, 'w') as file:
+        file.write(content.replace(old, new, 1))
+    return sop_file
+
+def test_last_edit_date_is_read_without_the_full_parse(tmp_path, monkeypatch):
+    sop_file = write_document_history(tmp_path, "| ``v1`` | ``v2`` | Bruce Wayne |", "| **``v1``** | *v2* | Bruce [Wayne](https://example.org) |")
+    monkeypatch.setattr(check_sop_reviews, "load_sop", lambda file_path: pytest.fail("The SOP was parsed in full"))
+
+    assert read_first_table_row(sop_file, [header.upper() for header in DOCUMENT_HISTORY_HEADERS]) == ["v1", "v2", "Bruce Wayne", "Modified node's instance at ...", "2024.07.23"]
+    assert check_sop_reviews.read_last_edit_date(sop_file) == datetime(2024, 7, 23)
+
+@pytest.mark.parametrize("old, new, error", [
+    # Not readable without rendering: raw HTML before the table
+    ("### 1. Document History\n", "### 1. Document History\n<div>\n\n| Date |\n|---|\n| 2020.01.01 |\n\n</div>\n", None),
+    # Missing table, and first rows with missing (i.e., empty) or invalid dates: the errors of the full parse
+    ("| Template Version |", "| Template |", "No Document History table was found"),
+    ("| Bruce Wayne | Modified node's instance at ... |", "| Bruce Wayne |", "Invalid date format ''"),
+    ("``2024.07.23``", "23/07/2024", "Invalid date format '23/07/2024'"),
+])
+def test_last_edit_date_falls_back_to_the_full_parse(tmp_path, monkeypatch, old, new, error):
+    sop_file = write_document_history(tmp_path, old, new)
+    full_parses = []
+    monkeypatch.setattr(check_sop_reviews, "load_sop", lambda file_path: full_parses.append(file_path) or load_sop(file_path))
+
+    if error is None:
+        with pytest.raises(MarkdownStructureError):
+            read_first_table_row(sop_file, DOCUMENT_HISTORY_HEADERS)
+        assert check_sop_reviews.read_last_edit_date(sop_file) == check_sop_reviews.get_last_edit_date(load_sop(sop_file), sop_file)
+    else:
+        with pytest.raises(ValueError, match=error):
+            check_sop_reviews.read_last_edit_date(sop_file)
+    assert full_parses == [sop_file]
+    forget_sop(sop_file)
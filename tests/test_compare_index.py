@@ -0,0 +1,66 @@
+import os
+import json
+import shutil
+import argparse
+import subprocess
+import pytest
+
+import compare_index
+from utils import hash_file
+
+SOPS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "sops")
+
+@pytest.fixture
+def repository(tmp_path):
+    """
+    Repository with a copy of the SOPs, their index table and its sidecar file, all committed.
+    """
+    shutil.copytree(SOPS_DIR, tmp_path / "sops")
+    for command in [["init", "-q"], ["add", "."], ["-c", "user.name=test", "-c", "user.email=test@example.com", "commit", "-q", "-m", "SOPs"]]:
+        subprocess.run(["git"] + command, cwd=tmp_path, check=True)
+    return tmp_path
+
+def compare(repository, *arguments: str):
+    sops_dir = str(repository / "sops")
+    args = compare_index.add_arguments(argparse.ArgumentParser()).parse_args(
+        [os.path.join(sops_dir, "README.md"), sops_dir, "--sidecar", os.path.join(sops_dir, "index-sidecar.json"), *arguments]
+    )
+    return compare_index.run_comparison(args)
+
+def tamper_topic(repository):
+    """
+    Changes the topic of an SOP, and its hash in the sidecar file, so that the (old) row of the sidecar would be reused.
+    """
+    sop_path = repository / "sops" / "european-level" / "GDI-SOP0007_sop-template-creation.md"
+    sop_path.write_text(sop_path.read_text().replace("| Topic                | Helpdesk & operations |", "| Topic                | Tampered |"))
+    sidecar_path = repository / "sops" / "index-sidecar.json"
+    sidecar = json.loads(sidecar_path.read_text())
+    sidecar["sops"]["GDI-SOP0007"]["hash"] = hash_file(str(sop_path))
+    sidecar_path.write_text(json.dumps(sidecar))
+
+def test_unchanged_sidecar_is_trusted(repository):
+    assert compare(repository, "--changed-since", "HEAD")["differences"] == []
+
+def test_changed_sidecar_is_checked_against_the_sops(repository):
+    tamper_topic(repository)
+    # Trusting the sidecar, the changed topic goes unnoticed
+    assert compare(repository)["differences"] == []
+    with pytest.raises(ValueError, match="records rows that do not match their SOPs"):
+        compare(repository, "--changed-since", "HEAD")
+
+@pytest.mark.parametrize("sidecar", [True, False], ids=["reused-rows", "parsed-rows"])
+def test_each_sop_is_read_once(repository, monkeypatch, sidecar):
+    if not sidecar:
+        os.remove(repository / "sops" / "index-sidecar.json")
+    reads = []
+    original_open = open
+    def counting_open(file, *args, **kwargs):
+        if os.path.basename(str(file)).startswith("GDI-SOP"):
+            reads.append(os.path.abspath(file))
+        return original_open(file, *args, **kwargs)
+    monkeypatch.setattr("builtins.open", counting_open)
+
+    assert compare(repository)["differences"] == []
+
+    # Whether the row of each SOP is reused from the sidecar or parsed, its file is only read once (e.g., to hash it)
+    assert sorted(reads) == sorted(set(reads)) and len(reads) == 3
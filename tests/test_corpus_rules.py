@@ -0,0 +1,76 @@
+import os
+import io
+import json
+import pytest
+
+import sop_linter
+from sop_linter import SOPLinter, NDJSONReporter
+from utils import load_sop
+
+TEMPLATE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "GDI-SOP0000_sop-template-for-linting.md")
+
+def write_sop(directory: str, file_name: str, template: str, tb_description: str = "Top to Bottom") -> str:
+    """
+    Writes an SOP based on the template for linting, with the given template SOP number and description of 'TB'
+    (as a node-specific SOP within a 'node-specific' directory).
+    """
+    with open(TEMPLATE_PATH, 'r') as file:
+        content = file.read()
+    content = content.replace("| Template SOP number  | GDI-SOP0001 |", f"| Template SOP number  | ``{template}`` |")
+    if os.path.basename(directory) == "node-specific":
+        content = content.replace("| Template SOP Type    | European-level SOP |", "| Template SOP Type    | Node-specific SOP |")
+    content = content.replace("| TB           | Top to Bottom                                       |", f"| TB | {tb_description} |")
+    os.makedirs(directory, exist_ok=True)
+    file_path = os.path.join(directory, file_name)
+    with open(file_path, 'w') as file:
+        file.write(content)
+    return file_path
+
+@pytest.fixture
+def repository(tmp_path):
+    os.makedirs(tmp_path / ".git")
+    european = write_sop(str(tmp_path / "sops" / "european-level"), "GDI-SOP0001_template.md", "GDI-SOP0001")
+    instance = write_sop(str(tmp_path / "sops" / "node-specific"), "GDI-SOP0002_instance.md", "GDI-SOP0001", tb_description="Top-down")
+    orphan = write_sop(str(tmp_path / "sops" / "node-specific"), "GDI-SOP0003_orphan.md", "GDI-SOP0099")
+    return {"european": european, "instance": instance, "orphan": orphan}
+
+def lint_corpus(sop_files, rule: str, **options):
+    linter = SOPLinter(rules=[rule], **options)
+    linter.lint_corpus(sop_files)
+    return linter
+
+def test_templates_are_looked_up_in_the_whole_repository(repository):
+    # The template of the instance is not among the linted files, but it is in the repository
+    linter = lint_corpus([repository["instance"], repository["orphan"]], "template-references")
+    assert not linter.results.get(repository["instance"], {}).get("warnings")
+    assert linter.results[repository["orphan"]]["warnings"] == [
+        "At the metadata table, the template SOP number 'GDI-SOP0099' does not match the identifier of any SOP file of the repository."
+    ]
+
+def test_templates_of_european_level_sops_are_not_looked_up(repository):
+    # European-level SOPs are templates themselves (e.g., the template for linting, whose template SOP number is not in the repository)
+    linter = lint_corpus([TEMPLATE_PATH], "template-references")
+    assert linter.results == {}
+
+def test_inconsistent_glossary_definitions_are_reported_as_written(repository, monkeypatch):
+    # When streaming, each SOP is only loaded once, to build the corpus index
+    loaded_files = []
+    monkeypatch.setattr(sop_linter, "load_sop", lambda file_path: loaded_files.append(file_path) or load_sop(file_path))
+    stream = io.StringIO()
+    lint_corpus([repository["european"], repository["instance"]], "glossary-consistency", reporter=NDJSONReporter(stream))
+    records = {record["file"]: record for record in map(json.loads, stream.getvalue().splitlines())}
+    assert sorted(loaded_files) == sorted([repository["european"], repository["instance"]])
+
+    assert records[repository["instance"]]["warnings"] == [
+        "Inconsistent glossary definition: 'TB' is described as 'Top-down', but differently in ['GDI-SOP0001_template.md']."
+    ]
+    assert records[repository["european"]]["warnings"] == [
+        "Inconsistent glossary definition: 'TB' is described as 'Top to Bottom', but differently in ['GDI-SOP0002_instance.md']."
+    ]
+
+def test_issues_take_the_severity_of_their_rule(repository):
+    # 'template-references' is a warning rule, unless linting strictly
+    linter = lint_corpus([repository["orphan"]], "template-references")
+    assert len(linter.results[repository["orphan"]]["warnings"]) == 1 and not linter.results[repository["orphan"]]["errors"]
+    linter = lint_corpus([repository["orphan"]], "template-references", strict=True)
+    assert len(linter.results[repository["orphan"]]["errors"]) == 1 and not linter.results[repository["orphan"]]["warnings"]
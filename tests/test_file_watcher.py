@@ -0,0 +1,67 @@
+import os
+import threading
+import time
+
+from file_watcher import PollingWatcher
+
+def write(path, content: str):
+    os.makedirs(os.path.dirname(str(path)), exist_ok=True)
+    with open(path, 'w') as file:
+        file.write(content)
+    return str(path)
+
+def test_modified_added_and_removed_files_are_changes(tmp_path):
+    modified_path = write(tmp_path / "sops" / "GDI-SOP0001_modified.md", "SOP")
+    touched_path = write(tmp_path / "sops" / "GDI-SOP0002_touched.md", "SOP")
+    removed_path = write(tmp_path / "sops" / "GDI-SOP0003_removed.md", "SOP")
+    charter_path = write(tmp_path / "docs" / "GDI-SOP_charter.md", "Charter")
+    watcher = PollingWatcher([str(tmp_path / "sops"), charter_path, str(tmp_path / "sops")])
+    assert watcher.poll() == set()
+
+    write(modified_path, "Modified SOP")
+    os.utime(touched_path, ns=(0, 0))
+    os.remove(removed_path)
+    added_path = write(tmp_path / "sops" / "node-specific" / "GDI-SOP0004_added.md", "SOP")
+    write(charter_path, "Modified Charter")
+    # Files out of the watched paths are not watched
+    write(tmp_path / "docs" / "GDI-SOP_other.md", "Other")
+
+    assert watcher.poll() == {modified_path, touched_path, removed_path, added_path, charter_path}
+    assert watcher.poll() == set()
+
+def test_hidden_files_and_directories_are_ignored(tmp_path):
+    write(tmp_path / ".git" / "index", "index")
+    watcher = PollingWatcher([str(tmp_path)])
+
+    write(tmp_path / ".git" / "index", "new index")
+    write(tmp_path / ".git" / "objects" / "ab" / "cdef", "object")
+    write(tmp_path / "sops" / ".GDI-SOP0001_sop.md.swp", "swap file")
+    write(tmp_path / ".sop-cache" / "entry.json", "{}")
+    assert watcher.poll() == set()
+
+    sop_path = write(tmp_path / "sops" / "GDI-SOP0001_sop.md", "SOP")
+    assert watcher.poll() == {sop_path}
+
+def test_changes_are_collected_until_a_poll_finds_no_more(tmp_path, monkeypatch):
+    paths = [str(tmp_path / f"GDI-SOP000{i}_sop.md") for i in range(1, 4)]
+    watcher = PollingWatcher([str(tmp_path)], interval=0)
+    polls = iter([set(), set(), {paths[0]}, {paths[1]}, {paths[0], paths[2]}, set(), {paths[1]}])
+    monkeypatch.setattr(watcher, "poll", lambda: next(polls))
+
+    # Polls without changes are waited through, and the ones with changes are debounced into one
+    assert watcher.wait() == set(paths)
+    assert next(polls) == {paths[1]}
+
+def test_changes_are_waited_for(tmp_path):
+    watcher = PollingWatcher([str(tmp_path)], interval=0.05)
+    paths = [str(tmp_path / "GDI-SOP0001_sop.md"), str(tmp_path / "GDI-SOP0002_sop.md")]
+
+    def save():
+        time.sleep(0.2)
+        for path in paths:
+            write(path, "SOP")
+
+    thread = threading.Thread(target=save)
+    thread.start()
+    assert watcher.wait() == set(paths)
+    thread.join()
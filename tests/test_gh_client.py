@@ -0,0 +1,77 @@
+import time
+import pytest
+
+from gh_client import GitHubClient, ResponseCache
+from gh_stub_server import StubServer, StubState, generate_issues
+
+REPOSITORY = "GenomicDataInfrastructure/standard-operating-procedures"
+
+@pytest.fixture
+def start_server():
+    servers = []
+
+    def start(**state_options) -> StubServer:
+        server = StubServer(StubState(**state_options)).start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+def test_issues_are_listed_across_pages(start_server):
+    server = start_server(issues=generate_issues(250) + [{"title": "A pull request", "pull_request": True}])
+    client = GitHubClient(api_url=server.api_url)
+    issues = client.list_issues(REPOSITORY, {"state": "open", "labels": "SOP-Review"})
+
+    # 3 pages of 100 issues, following the 'next' links; the pull request is filtered out by its label
+    assert [issue["number"] for issue in issues] == list(range(250, 0, -1))
+    assert client.requests_made == 3
+    assert len(client.list_issues(REPOSITORY)) == 250  # Without the label, the pull request is listed and filtered out
+
+def test_unchanged_pages_are_revalidated_with_their_etag(start_server, tmp_path):
+    server = start_server(issues=generate_issues(150))
+    cache_path = str(tmp_path / "gh-cache.json")
+    client = GitHubClient(api_url=server.api_url, cache=ResponseCache(cache_path))
+    issues = client.list_issues(REPOSITORY)
+    client.save_cache()
+    assert server.state.stats["not_modified"] == 0
+
+    # A later run revalidates both pages from the cache on disk, and gets the same issues
+    client = GitHubClient(api_url=server.api_url, cache=ResponseCache(cache_path))
+    assert client.list_issues(REPOSITORY) == issues
+    assert server.state.stats["not_modified"] == 2
+    # 304 responses don't count against the rate limit
+    assert server.state.rate_limit_used == 2
+
+    # Changed pages are downloaded again
+    server.state.add_issue({"title": "[SOP Review] Review due: 'GDI-SOP0999_new.md'", "labels": ["SOP-Review"]})
+    issues = client.list_issues(REPOSITORY)
+    assert len(issues) == 151 and issues[0]["number"] == 151
+    assert server.state.stats["not_modified"] == 2
+
+def test_requests_wait_for_the_rate_limit_to_reset(start_server):
+    server = start_server(issues=generate_issues(300), rate_limit=2, rate_limit_window=1)
+    client = GitHubClient(api_url=server.api_url, max_wait=10)
+    start = time.time()
+    issues = client.list_issues(REPOSITORY)
+
+    assert len(issues) == 300
+    # The client waits for the reset once no requests are left, instead of being rejected
+    assert time.time() - start >= 0.5
+    assert server.state.stats["rate_limited"] == 0
+
+def test_rate_limit_longer_than_the_maximum_wait_fails(start_server):
+    server = start_server(issues=generate_issues(300), rate_limit=1, rate_limit_window=600)
+    client = GitHubClient(api_url=server.api_url, max_wait=1)
+    with pytest.raises(ValueError, match="rate limit exceeded"):
+        client.list_issues(REPOSITORY)
+
+def test_server_errors_and_secondary_rate_limits_are_retried(start_server):
+    server = start_server(issues=generate_issues(500), error_rate=0.2, secondary_rate_limit_rate=0.1, seed=1)
+    client = GitHubClient(api_url=server.api_url, max_retries=5, backoff_factor=0)
+    issues = client.list_issues(REPOSITORY)
+
+    assert len(issues) == 500
+    assert server.state.stats["errors"] + server.state.stats["rate_limited"] > 0
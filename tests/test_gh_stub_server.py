@@ -0,0 +1,85 @@
+import pytest
+import requests
+
+from gh_stub_server import StubServer, StubState, generate_issues
+
+ISSUES_PATH = "/repos/owner/repo/issues"
+
+@pytest.fixture
+def start_server():
+    servers = []
+
+    def start(**state_options) -> StubServer:
+        server = StubServer(StubState(**state_options)).start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+def test_issues_are_paginated_and_filtered(start_server):
+    server = start_server(issues=generate_issues(5) + [{"title": "Other", "labels": ["bug"]}, {"title": "Closed", "labels": ["SOP-Review"], "state": "closed"}])
+    response = requests.get(server.api_url + ISSUES_PATH, params={"labels": "SOP-Review", "per_page": 2})
+
+    # Newest first, without the issues of other labels or states
+    assert [issue["number"] for issue in response.json()] == [5, 4]
+    assert response.json()[0]["html_url"] == f"{server.server_url}/owner/repo/issues/5"
+    assert set(response.links) == {"next", "last"}
+    last_page = requests.get(response.links["last"]["url"])
+    assert [issue["number"] for issue in last_page.json()] == [1]
+    assert set(last_page.links) == {"prev", "first"}
+    assert len(requests.get(server.api_url + ISSUES_PATH, params={"state": "all"}).json()) == 7
+
+def test_unchanged_pages_are_not_modified(start_server):
+    server = start_server(issues=generate_issues(3), rate_limit=10)
+    response = requests.get(server.api_url + ISSUES_PATH)
+    assert response.headers["X-RateLimit-Remaining"] == "9"
+
+    not_modified = requests.get(server.api_url + ISSUES_PATH, headers={"If-None-Match": response.headers["ETag"]})
+    assert not_modified.status_code == 304 and not_modified.content == b""
+    assert server.state.stats["not_modified"] == 1 and server.state.rate_limit_used == 1
+
+    server.state.add_issue({"title": "New issue"})
+    assert requests.get(server.api_url + ISSUES_PATH, headers={"If-None-Match": response.headers["ETag"]}).status_code == 200
+
+def test_issues_are_created_updated_and_commented(start_server):
+    server = start_server()
+    issue = requests.post(server.api_url + ISSUES_PATH, json={"title": "Review", "body": "Body", "labels": ["SOP-Review"]})
+    assert issue.status_code == 201 and issue.json()["number"] == 1
+
+    updated = requests.patch(f"{server.api_url}{ISSUES_PATH}/1", json={"labels": ["SOP-Review", "urgent"], "state": "closed", "number": 5})
+    assert [label["name"] for label in updated.json()["labels"]] == ["SOP-Review", "urgent"]
+    assert updated.json()["state"] == "closed" and updated.json()["number"] == 1  # Only the writable fields are changed
+
+    assert requests.post(f"{server.api_url}{ISSUES_PATH}/1/comments", json={"body": "Done"}).status_code == 201
+    assert [comment["body"] for comment in requests.get(f"{server.api_url}{ISSUES_PATH}/1/comments").json()] == ["Done"]
+    assert requests.post(f"{server.api_url}{ISSUES_PATH}/2/comments", json={"body": "Done"}).status_code == 404
+    assert requests.patch(f"{server.api_url}{ISSUES_PATH}/2", json={"state": "closed"}).status_code == 404
+    assert requests.get(server.server_url + "/_stub/stats").json() == dict(server.state.stats, issues=1)
+
+def test_rate_limit_and_injected_errors(start_server):
+    server = start_server(rate_limit=1)
+    assert requests.post(server.api_url + ISSUES_PATH, json={"title": "First"}).status_code == 201
+    response = requests.post(server.api_url + ISSUES_PATH, json={"title": "Second"})
+    assert response.status_code == 403 and response.headers["X-RateLimit-Remaining"] == "0"
+    assert len(server.state.issues) == 1
+
+    server = start_server(error_rate=1)
+    assert requests.get(server.api_url + ISSUES_PATH).status_code == 502
+    server = start_server(secondary_rate_limit_rate=1)
+    response = requests.get(server.api_url + ISSUES_PATH)
+    assert response.status_code == 403 and response.headers["Retry-After"] == "1"
+
+def test_blob_urls_are_resolved_against_the_blob_root(start_server, tmp_path):
+    (tmp_path / "docs").mkdir()
+    (tmp_path / "docs" / "charter.md").write_text("Charter")
+    server = start_server(blob_root=str(tmp_path))
+
+    assert requests.head(f"{server.server_url}/owner/repo/blob/main/docs/charter.md").status_code == 200
+    assert requests.get(f"{server.server_url}/owner/repo/tree/dev/docs").status_code == 200
+    assert requests.head(f"{server.server_url}/owner/repo/blob/main/docs/missing.md").status_code == 404
+    assert requests.head(f"{server.server_url}/owner/repo/blob/main/%2E%2E/outside.md").status_code == 404
+    # Without a blob root, every blob URL exists
+    assert requests.head(f"{start_server().server_url}/owner/repo/blob/main/any.md").status_code == 200
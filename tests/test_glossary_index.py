@@ -0,0 +1,53 @@
+import os
+import pytest
+
+import sop_linter
+from sop_linter import SOPLinter
+from utils import GlossaryIndex, collect_sop_files, load_sop, load_glossary_index
+
+SOPS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "sops")
+
+def test_charter_glossary_is_compiled_once(monkeypatch):
+    compiled = []
+    monkeypatch.setattr(sop_linter, "load_glossary_index", lambda file_paths: compiled.append(file_paths) or load_glossary_index(file_paths))
+    linter = SOPLinter()
+
+    sop_files = collect_sop_files([SOPS_DIR])
+    for file_path in sop_files:
+        sop = load_sop(file_path)
+        linter.results[file_path] = {"errors": [], "warnings": []}
+        linter.lr_check_glossary_in_charter(sop, file_path)
+        linter.lr_check_undefined_acronyms(sop, file_path)
+
+    # Both glossary rules of all the SOPs share the same index
+    assert len(sop_files) > 1
+    assert len(compiled) == 1 and os.path.basename(compiled[0][0]) == "GDI-SOP_charter.md"
+    assert linter.get_charter_glossary(sop_files[0]) is linter.get_charter_glossary(sop_files[-1])
+
+def test_glossary_index_is_immutable():
+    glossary = {"SOP": "Standard Operating Procedure", "GDI": "Genomic Data Infrastructure"}
+    index = GlossaryIndex(glossary)
+
+    # Neither the compiled glossary nor the index can be changed afterwards
+    glossary["DAC"] = "Data Access Committee"
+    index.to_dict()["EDIC"] = "European Digital Infrastructure Consortium"
+    assert list(index) == ["SOP", "GDI"]
+    with pytest.raises(AttributeError):
+        index._terms = {}
+    with pytest.raises(AttributeError):
+        index.terms = {}
+    with pytest.raises(TypeError):
+        index._terms["DAC"] = "Data Access Committee"
+    assert "DAC" not in index and len(index) == 2
+
+def test_glossary_index_lookups():
+    index = GlossaryIndex.from_glossaries({"SOP": "Standard Operating Procedure"}, {"SOP": "Other", "Sop": "Variant", "NCP": "National Contact Point"})
+
+    # The first glossary wins, and so does the first term among case variants
+    assert index.definition("SOP") == "Standard Operating Procedure"
+    assert index.lookup("sop") is None
+    assert index.lookup("sop", ignore_case=True) == "SOP"
+    assert index.lookup("NCPs") is None
+    assert index.lookup("NCPs", plural=True) == "NCP"
+    assert index.definition("ncps", ignore_case=True, plural=True) == "National Contact Point"
+    assert GlossaryIndex(index.to_dict()).to_dict() == index.to_dict()
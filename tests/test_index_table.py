@@ -0,0 +1,44 @@
+import io
+import os
+import pytest
+
+from index_table import IndexTable
+
+GOLDEN_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "golden")
+EXTENSIONS = {"markdown": "md", "csv": "csv", "json": "json"}
+
+# Index records covering what pandas (and tabulate) format in their own way: numbers parsed from strings, decimal
+# alignment, missing values, booleans, numbers with thousands separators, quoting, slashes and non-ASCII characters
+RECORDS = [
+    {"Identifier": "GDI-SOP0002", "Title": "NCPs' veto of EDIC decisions", "Type": "Node-specific", "Version": "1.10", "Nº steps": 12,
+     "Last edit date": "2026-07-01", "Score": 0.5, "Reviewed": True, "Words": "1,250", "Link": "./node-specific/GDI-SOP0002_ncps-veto-edic-decision.md"},
+    {"Identifier": "GDI-SOP0001", "Title": "Template, \"quoted\"", "Type": "European-level", "Version": "2.0", "Nº steps": 3,
+     "Last edit date": None, "Score": 10, "Reviewed": False, "Words": "980.75", "Link": "./european-level/GDI-SOP0001_sop-template.md"},
+    {"Identifier": "GDI-SOP0003", "Title": "Solicitud de acceso à données", "Type": "", "Version": "", "Nº steps": None,
+     "Last edit date": "2025-12-31", "Score": 123.456, "Reviewed": None, "Words": "", "Link": None},
+]
+
+@pytest.mark.parametrize("output_format", EXTENSIONS)
+def test_tables_match_the_golden_files(output_format):
+    # The golden files keep the outputs checked against pandas' 'to_markdown', 'to_csv' and 'to_json' when pandas was dropped
+    table = IndexTable.from_records(RECORDS)
+    with open(os.path.join(GOLDEN_DIR, f"index_table.{EXTENSIONS[output_format]}"), 'r', encoding='utf-8', newline='') as file:
+        golden = file.read()
+
+    output = {"markdown": table.to_markdown, "csv": table.to_csv, "json": table.to_json}[output_format]()
+    assert output == golden
+    # Streamed outputs are the same
+    stream = io.StringIO()
+    table.write(stream, output_format)
+    assert stream.getvalue() == golden
+
+def test_empty_tables_have_only_the_header():
+    table = IndexTable(["Identifier", "Title"])
+    assert table.to_markdown() == "| Identifier   | Title   |\n|--------------|---------|"
+    assert table.to_csv() == "Identifier,Title\n"
+    assert table.to_json() == "[]"
+
+def test_rows_are_sorted_stably_with_missing_values_last():
+    table = IndexTable.from_records([{"Identifier": None, "n": 1}, {"Identifier": "GDI-SOP0002", "n": 2}, {"Identifier": "GDI-SOP0001", "n": 3}, {"Identifier": "GDI-SOP0001", "n": 4}])
+    table.sort_by("Identifier")
+    assert table.column("n") == [3, 4, 2, 1]
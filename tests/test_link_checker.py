@@ -0,0 +1,252 @@
+import os
+import time
+import threading
+import subprocess
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+import pytest
+
+from link_checker import LinkCache, LocalRepositoryResolver, RemoteLinkChecker
+
+DAY = 24 * 60 * 60
+
+LAST_MODIFIED = "Wed, 01 Jul 2026 10:00:00 GMT"
+
+class LinkServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), LinkRequestHandler)
+        self.lock = threading.Lock()
+        self.requests = []  # (path, time) of each request
+        self.headers = []  # (path, headers) of each request
+        self.active = 0
+        self.max_active = 0
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def count(self, path: str) -> int:
+        return sum(1 for request_path, _ in self.requests if request_path == path)
+
+class LinkRequestHandler(BaseHTTPRequestHandler):
+    """
+    Answers HEAD requests according to their path and query:
+        - /ok, /missing: 200 and 404
+        - /failing?status=S&times=N: status S for the first N requests (always if not given), then 200
+        - /slow?seconds=S: 200 after S seconds
+        - /validated?etag=E: 200 with the ETag E and a Last-Modified date, or 304 if the request has the ETag E
+    """
+    def do_HEAD(self):
+        url = urlsplit(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        server = self.server
+        with server.lock:
+            server.requests.append((self.path, time.monotonic()))
+            server.headers.append((self.path, dict(self.headers)))
+            n_requests = server.count(self.path)
+            server.active += 1
+            server.max_active = max(server.max_active, server.active)
+        try:
+            status = 200
+            if url.path == "/missing":
+                status = 404
+            elif url.path == "/failing" and n_requests <= int(query.get("times", 1 << 30)):
+                status = int(query["status"])
+            elif url.path == "/slow":
+                time.sleep(float(query["seconds"]))
+            elif url.path == "/validated" and self.headers.get("If-None-Match") == query["etag"]:
+                status = 304
+            self.send_response(status)
+            if url.path == "/validated":
+                self.send_header("ETag", query["etag"])
+                self.send_header("Last-Modified", LAST_MODIFIED)
+            if status == 429:
+                self.send_header("Retry-After", query.get("retry_after", "0"))
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+        finally:
+            with server.lock:
+                server.active -= 1
+
+    def log_message(self, format, *args):
+        pass
+
+@pytest.fixture
+def server():
+    server = LinkServer()
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+def test_duplicate_links_are_requested_once(server):
+    checker = RemoteLinkChecker(backoff_factor=0)
+    results = checker.check([f"{server.url}/ok", f"{server.url}/missing", f"{server.url}/ok", f"{server.url}/ok"])
+
+    assert results == {f"{server.url}/ok": True, f"{server.url}/missing": False}
+    assert server.count("/ok") == 1 and server.count("/missing") == 1
+    # Already resolved links are not requested again
+    assert checker.is_resolvable(f"{server.url}/ok") is True
+    assert len(server.requests) == 2
+
+def test_concurrent_requests_are_limited_per_host(server):
+    checker = RemoteLinkChecker(max_workers=8, per_host_limit=2)
+    results = checker.check([f"{server.url}/slow?seconds=0.2&i={i}" for i in range(6)])
+
+    assert all(results.values())
+    assert server.max_active == 2
+
+@pytest.mark.parametrize("status", [429, 500, 503])
+def test_rate_limited_or_failing_links_are_retried(server, status):
+    checker = RemoteLinkChecker(max_retries=3, backoff_factor=0)
+    assert checker.is_resolvable(f"{server.url}/failing?status={status}&times=2") is True
+    assert len(server.requests) == 3
+
+@pytest.mark.parametrize("status", [429, 503])
+def test_links_failing_after_all_retries_are_unchecked(server, status):
+    checker = RemoteLinkChecker(max_retries=2, backoff_factor=0)
+    assert checker.is_resolvable(f"{server.url}/failing?status={status}") is None
+    assert len(server.requests) == 3
+
+def test_links_timing_out_after_all_retries_are_unchecked(server):
+    checker = RemoteLinkChecker(max_retries=1, backoff_factor=0, timeout=0.05)
+    assert checker.is_resolvable(f"{server.url}/slow?seconds=0.3") is None
+    assert len(server.requests) == 2
+
+def test_retry_waits_do_not_hold_the_host(server):
+    # While the first link waits to be retried, the other link to the same host is resolved
+    checker = RemoteLinkChecker(max_workers=2, per_host_limit=1, max_retries=1)
+    failing_path = "/failing?status=429&times=1&retry_after=0.5"
+    results = checker.check([f"{server.url}{failing_path}", f"{server.url}/ok"])
+
+    assert all(results.values())
+    request_times = {path: [at for request_path, at in server.requests if request_path == path] for path in [failing_path, "/ok"]}
+    assert request_times["/ok"][0] < request_times[failing_path][1]
+
+def test_requests_are_limited_by_the_budget(server):
+    checker = RemoteLinkChecker(max_workers=1, request_budget=3)
+    results = checker.check([f"{server.url}/ok?i={i}" for i in range(5)])
+
+    assert list(results.values()) == [True, True, True, None, None]
+    assert len(server.requests) == 3 and checker.requests_made == 3
+
+def set_checked_at(cache_path: str, url: str, seconds_ago: float):
+    cache = LinkCache(cache_path)
+    cache.entries[url]["checked_at"] = time.time() - seconds_ago
+    cache.save()
+
+def test_cached_links_are_requested_again_once_their_ttl_expires(server, tmp_path):
+    cache_path = str(tmp_path / ".links-cache.json")
+    urls = [f"{server.url}/ok", f"{server.url}/missing"]
+    checker = RemoteLinkChecker(cache=LinkCache(cache_path))
+    assert checker.check(urls) == {urls[0]: True, urls[1]: False}
+    checker.save_cache()
+
+    # Fresh entries of a later run answer without any request
+    set_checked_at(cache_path, urls[0], 6 * DAY)
+    set_checked_at(cache_path, urls[1], 0.5 * DAY)
+    assert RemoteLinkChecker(cache=LinkCache(cache_path)).check(urls) == {urls[0]: True, urls[1]: False}
+    assert len(server.requests) == 2
+
+    # Unresolvable links expire sooner than resolvable ones
+    set_checked_at(cache_path, urls[1], 2 * DAY)
+    checker = RemoteLinkChecker(cache=LinkCache(cache_path))
+    assert checker.check(urls) == {urls[0]: True, urls[1]: False}
+    checker.save_cache()
+    assert server.count("/ok") == 1 and server.count("/missing") == 2
+
+    set_checked_at(cache_path, urls[0], 8 * DAY)
+    assert RemoteLinkChecker(cache=LinkCache(cache_path)).check(urls) == {urls[0]: True, urls[1]: False}
+    assert server.count("/ok") == 2 and server.count("/missing") == 2
+
+def test_stale_links_are_revalidated_with_their_validators(server, tmp_path):
+    cache_path = str(tmp_path / ".links-cache.json")
+    url = f"{server.url}/validated?etag=%22v1%22"
+    checker = RemoteLinkChecker(cache=LinkCache(cache_path))
+    assert checker.is_resolvable(url) is True
+    checker.save_cache()
+    set_checked_at(cache_path, url, 8 * DAY)
+
+    cache = LinkCache(cache_path)
+    assert RemoteLinkChecker(cache=cache).is_resolvable(url) is True
+
+    # The conditional request is answered with a 304, which only refreshes the check time
+    headers = server.headers[-1][1]
+    assert headers["If-None-Match"] == '"v1"' and headers["If-Modified-Since"] == LAST_MODIFIED
+    entry = cache.get(url)
+    assert cache.is_fresh(entry)
+    assert (entry["status"], entry["resolvable"], entry["etag"], entry["last_modified"]) == (200, True, '"v1"', LAST_MODIFIED)
+
+def test_offline_checks_answer_only_from_the_cache(server, tmp_path):
+    cache_path = str(tmp_path / ".links-cache.json")
+    checker = RemoteLinkChecker(cache=LinkCache(cache_path))
+    checker.check([f"{server.url}/missing"])
+    checker.save_cache()
+    set_checked_at(cache_path, f"{server.url}/missing", 30 * DAY)
+
+    # Even stale entries are used, and uncached links are unchecked
+    results = RemoteLinkChecker(cache=LinkCache(cache_path), offline=True).check([f"{server.url}/missing", f"{server.url}/ok"])
+    assert results == {f"{server.url}/missing": False, f"{server.url}/ok": None}
+    assert len(server.requests) == 1
+
+def test_links_failing_after_all_retries_are_not_cached(server, tmp_path):
+    cache = LinkCache(str(tmp_path / ".links-cache.json"))
+    assert RemoteLinkChecker(cache=cache, max_retries=1, backoff_factor=0).is_resolvable(f"{server.url}/failing?status=503") is None
+    assert cache.get(f"{server.url}/failing?status=503") is None
+
+REPOSITORY_URL = "https://github.com/GenomicDataInfrastructure/standard-operating-procedures"
+
+@pytest.fixture
+def checkout(tmp_path):
+    for path in ["sops/european-level/GDI-SOP0001_sop.md", "docs/GDI-SOP_charter.md", "docs/images/my diagram.png"]:
+        os.makedirs(os.path.dirname(str(tmp_path / path)), exist_ok=True)
+        with open(tmp_path / path, 'w') as file:
+            file.write(path)
+    git = ["git", "-c", "user.name=test", "-c", "user.email=test@example.com"]
+    subprocess.run(git + ["init", "-q"], cwd=tmp_path, check=True)
+    subprocess.run(git + ["add", "."], cwd=tmp_path, check=True)
+    subprocess.run(git + ["commit", "-q", "-m", "SOPs"], cwd=tmp_path, check=True)
+    return tmp_path
+
+@pytest.mark.parametrize("url, resolvable", [
+    (f"{REPOSITORY_URL}/blob/main/docs/GDI-SOP_charter.md", True),
+    (f"{REPOSITORY_URL}/blob/main/docs/GDI-SOP_charter.md#glossary", True),
+    (f"{REPOSITORY_URL}/blob/main/docs/images/my%20diagram.png?raw=true", True),
+    (f"{REPOSITORY_URL}/tree/main/sops/european-level", True),
+    (f"{REPOSITORY_URL}/tree/main", True),
+    (f"{REPOSITORY_URL}/blob/main/docs/GDI-SOP_removed.md", False),
+    (f"{REPOSITORY_URL}/tree/main/sops/../../outside", False),
+    # Owner and repository names are case-insensitive, branch names are not
+    ("https://github.com/genomicdatainfrastructure/Standard-Operating-Procedures/blob/main/docs/GDI-SOP_charter.md", True),
+    (f"{REPOSITORY_URL}/blob/Main/docs/GDI-SOP_charter.md", None),
+    (f"{REPOSITORY_URL}/blob/develop/docs/GDI-SOP_charter.md", None),
+    (f"{REPOSITORY_URL}/issues/1", None),
+    ("https://github.com/GenomicDataInfrastructure/other-repository/blob/main/README.md", None),
+])
+def test_links_to_the_repository_are_resolved_against_the_working_tree(checkout, url, resolvable):
+    assert LocalRepositoryResolver(str(checkout)).resolve(url) is resolvable
+
+def test_links_to_the_repository_are_resolved_against_a_git_ref(checkout):
+    os.remove(checkout / "docs" / "GDI-SOP_charter.md")
+    with open(checkout / "docs" / "GDI-SOP_uncommitted.md", 'w') as file:
+        file.write("Uncommitted")
+    resolver = LocalRepositoryResolver(str(checkout), git_ref="HEAD")
+
+    # Only the files and directories of the ref count, whatever the working tree has
+    assert resolver.resolve(f"{REPOSITORY_URL}/blob/main/docs/GDI-SOP_charter.md") is True
+    assert resolver.resolve(f"{REPOSITORY_URL}/blob/main/docs/GDI-SOP_uncommitted.md") is False
+    assert resolver.resolve(f"{REPOSITORY_URL}/blob/main/docs/images/my%20diagram.png") is True
+    assert resolver.resolve(f"{REPOSITORY_URL}/tree/main/sops/european-level") is True
+    assert resolver.resolve(f"{REPOSITORY_URL}/tree/main") is True
+    assert LocalRepositoryResolver(str(checkout), git_ref="no-such-ref").resolve(f"{REPOSITORY_URL}/tree/main") is False
+
+def test_links_to_the_repository_are_resolved_without_requests(checkout, server):
+    checker = RemoteLinkChecker(local_resolver=LocalRepositoryResolver(str(checkout)))
+    results = checker.check([f"{REPOSITORY_URL}/blob/main/docs/GDI-SOP_charter.md", f"{REPOSITORY_URL}/blob/main/docs/GDI-SOP_removed.md", f"{server.url}/ok"])
+
+    assert list(results.values()) == [True, False, True]
+    assert checker.requests_made == 1 and len(server.requests) == 1
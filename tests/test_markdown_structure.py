@@ -0,0 +1,86 @@
+import os
+import re
+import pytest
+from bs4 import BeautifulSoup
+import markdown
+
+from utils import TableRegistry, ParsedSOP, collect_sop_files, extract_markdown_structure, get_image_paths
+
+REPOSITORY_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+SOP_FILES = sorted(collect_sop_files([os.path.join(REPOSITORY_ROOT, "sops"), os.path.join(REPOSITORY_ROOT, "tests", "GDI-SOP0000_sop-template-for-linting.md")]))
+
+def render(content: str) -> BeautifulSoup:
+    """
+    Renders markdown the same way 'ParsedSOP.soup' does (reference path).
+    """
+    return BeautifulSoup(markdown.markdown(content, extensions=['tables']), 'html.parser')
+
+def soup_headings(soup: BeautifulSoup):
+    return [(int(header.name[1]), header.text.strip()) for header in soup.find_all(re.compile(r'^h[1-6]$'))]
+
+def soup_links(soup: BeautifulSoup):
+    return [link['href'] for link in soup.find_all('a', href=True)]
+
+def registry_tables(registry: TableRegistry):
+    return {headers: [rows for rows, _ in tables] for headers, tables in registry._by_headers.items()}
+
+@pytest.mark.parametrize("sop_file", SOP_FILES, ids=os.path.basename)
+def test_fast_path_matches_soup_path(sop_file):
+    with open(sop_file, 'r', encoding='utf-8') as file:
+        content = file.read()
+    structure = extract_markdown_structure(content)
+    soup = render(content)
+
+    assert structure is not None, "The SOPs of the repository are expected to be read through the fast path"
+    assert structure["headings"] == soup_headings(soup)
+    assert registry_tables(TableRegistry.from_structure(structure)) == registry_tables(TableRegistry.from_soup(soup))
+    assert structure["links"] == soup_links(soup)
+    assert structure["image_paths"] == get_image_paths(soup)
+
+@pytest.mark.parametrize("content", [
+    "# Title\n\n> ### Quoted\n\nText\n",
+    "# Title\n\n- ### In list\n- Other item\n",
+    "# Title\n\n1. ### In ordered list\n",
+    "# Title\n\n> | Metadata | Value |\n> |---|---|\n> | Topic | Security |\n",
+    "# Title\n\n- | Metadata | Value |\n  |---|---|\n  | Topic | Security |\n",
+], ids=["blockquote-heading", "list-heading", "ordered-list-heading", "blockquote-table", "list-table"])
+def test_nested_structures_fall_back_to_soup_path(content):
+    # Headings and tables nested in blockquotes or lists are not read through the fast path...
+    assert extract_markdown_structure(content) is None
+
+    # ...so the parsed SOP gives the same headings and tables as the reference path
+    sop = ParsedSOP("nested.md", content, "")
+    soup = render(content)
+    assert sop.headings == soup_headings(soup)
+    assert registry_tables(sop.tables) == registry_tables(TableRegistry.from_soup(soup))
+
+@pytest.mark.parametrize("content, links, image_paths", [
+    ("Text with [a link](./a.md) and <https://example.org/b>.\n", ["./a.md", "https://example.org/b"], []),
+    ("[![Badge](badge.png)](https://example.org/c?a=1&b=2)\n", ["https://example.org/c?a=1&b=2"], ["badge.png"]),
+    ("| Link | Image |\n|---|---|\n| [d](d\\_e.md) | ![f](f.png) |\n", ["d_e.md"], ["f.png"]),
+    ("`[Not a link](x.md)` and [a link](g.md)\n", ["g.md"], []),
+    ("````mermaid\ngraph TB\n\n    A[Start] --> B[End]\n````\n", [], []),
+], ids=["paragraph", "image-in-link", "table", "code-span", "unclosed-code-span"])
+def test_links_and_images_are_read_without_rendering(content, links, image_paths):
+    structure = extract_markdown_structure(content)
+    soup = render(content)
+    assert (soup_links(soup), get_image_paths(soup)) == (links, image_paths)
+    assert (structure["links"], structure["image_paths"]) == (links, image_paths)
+
+@pytest.mark.parametrize("content", [
+    "# Title\n\nSee [the docs][docs].\n\n[docs]: https://example.org/docs\n",
+    "# Title\n\n[A link](https://example.org/a \"With a title\")\n",
+    "# Title\n\n[A [nested] link](https://example.org/b)\n",
+    "# Title\n\n- Item\n\n    [Code or list content](h.md)\n",
+    "# Title\n\nA paragraph\n- [Not a list item\n- but a link](i.md)\n",
+], ids=["reference-link", "link-title", "nested-brackets", "indented-block", "list-item-like-lines"])
+def test_ambiguous_links_fall_back_to_soup_path(content):
+    # Headings and tables are still read through the fast path...
+    structure = extract_markdown_structure(content)
+    assert structure["headings"] == [(1, "Title")]
+    assert structure["links"] is None and structure["image_paths"] is None
+
+    # ...while the links and images of the parsed SOP are the ones of the reference path
+    sop = ParsedSOP("ambiguous.md", content, "")
+    soup = render(content)
+    assert (sop.links, sop.image_paths) == (soup_links(soup), get_image_paths(soup))
@@ -0,0 +1,103 @@
+import os
+import time
+import threading
+import pytest
+
+from parse_cache import ParseCache
+
+DAY = 24 * 60 * 60
+
+def set_last_use(path: str, seconds_ago: float):
+    timestamp = time.time() - seconds_ago
+    os.utime(path, (timestamp, timestamp))
+
+@pytest.fixture
+def cache(tmp_path):
+    return ParseCache(str(tmp_path / "cache"), version="1", max_age_days=30)
+
+def test_entries_are_keyed_by_content_and_version(cache):
+    cache.put("a" * 64, {"headings": [[1, "Title"]]})
+    assert cache.get("a" * 64) == {"headings": [[1, "Title"]]}
+    assert cache.get("b" * 64) is None
+    assert ParseCache(cache.cache_dir, version="2").get("a" * 64) is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+def test_entries_not_used_for_too_long_are_evicted(cache):
+    cache.put("old", {"n": 1})
+    cache.put("recent", {"n": 2})
+    set_last_use(cache.entry_path("old"), 31 * DAY)
+    set_last_use(cache.entry_path("recent"), 29 * DAY)
+
+    cache.evict()
+
+    assert cache.get("old") is None
+    assert cache.get("recent") == {"n": 2}
+
+def test_least_recently_used_entries_are_evicted_to_fit_the_size(tmp_path):
+    cache = ParseCache(str(tmp_path / "cache"), max_size_mb=2.5 * 1024 / (1024 * 1024))  # Room for two 1 KB entries
+    for i, name in enumerate(["first", "second", "third"]):
+        cache.put(name, {"data": "x" * 1000})
+        set_last_use(cache.entry_path(name), 3 - i)
+    # Reading an entry makes it the most recently used one
+    assert cache.get("first") is not None
+
+    cache.evict()
+
+    assert sorted(os.listdir(cache.cache_dir)) == sorted(os.path.basename(cache.entry_path(name)) for name in ["first", "third"])
+
+def test_leftovers_of_interrupted_writes_are_cleaned_up(cache):
+    leftover_path = os.path.join(cache.cache_dir, "interrupted.tmp")
+    writing_path = os.path.join(cache.cache_dir, "writing.tmp")
+    for path in [leftover_path, writing_path]:
+        with open(path, 'w') as file:
+            file.write('{"partial')
+    set_last_use(leftover_path, 2 * 60 * 60)
+
+    cache.evict()
+
+    # Recent temporary files may still be written by a concurrent process
+    assert not os.path.exists(leftover_path)
+    assert os.path.exists(writing_path)
+
+def test_corrupt_entries_are_misses(cache):
+    with open(cache.entry_path("corrupt"), 'w') as file:
+        file.write('{"headings": [[1, "Tit')
+    assert cache.get("corrupt") is None
+    assert cache.misses == 1
+
+    cache.put("corrupt", {"n": 1})
+    assert cache.get("corrupt") == {"n": 1}
+
+def test_failed_writes_leave_no_temporary_files(cache):
+    with pytest.raises(TypeError):
+        cache.put("unserializable", {"n": object()})
+    assert os.listdir(cache.cache_dir) == []
+    assert cache.get("unserializable") is None
+
+def test_concurrent_writes_are_never_seen_partially_written(cache):
+    payloads = [{"writer": i, "data": str(i) * 100000} for i in range(4)]
+    seen = []
+    stop = threading.Event()
+
+    def write(payload):
+        for _ in range(20):
+            cache.put("shared", payload)
+
+    def read():
+        while not stop.is_set():
+            seen.append(cache.get("shared"))
+
+    readers = [threading.Thread(target=read) for _ in range(2)]
+    writers = [threading.Thread(target=write, args=(payload,)) for payload in payloads]
+    for thread in readers + writers:
+        thread.start()
+    for thread in writers:
+        thread.join()
+    stop.set()
+    for thread in readers:
+        thread.join()
+
+    # Readers get either no entry (yet) or a whole entry of one of the writers
+    assert all(data is None or data in payloads for data in seen)
+    assert cache.get("shared") in payloads
+    assert os.listdir(cache.cache_dir) == [os.path.basename(cache.entry_path("shared"))]
@@ -0,0 +1,52 @@
+import pytest
+import markdown
+from bs4 import BeautifulSoup
+
+from utils import SectionIndex, normalize_section_title
+
+CONTENT = """# European GDI - SOP Title
+
+### 3. Roles and Responsibilities of the DAC
+Roles.
+
+### 8. Procedure
+#### 8.1. First step
+First.
+
+#### 8.2. Second step
+Second.
+
+## Annex
+### Procedure
+Second procedure.
+"""
+
+@pytest.fixture
+def sections():
+    return SectionIndex(BeautifulSoup(markdown.markdown(CONTENT, extensions=['tables']), 'html.parser'))
+
+@pytest.mark.parametrize("title, normalized_title", [
+    ("8. Procedure", "procedure"),
+    ("8.1. First step", "first step"),
+    ("8.1 First  step", "first step"),
+    ("  Glossary ", "glossary"),
+    ("GDI-SOP0001 v2.0", "gdi-sop0001 v2.0"),
+])
+def test_section_titles_are_normalized_without_numbering(title, normalized_title):
+    assert normalize_section_title(title) == normalized_title
+
+def test_sections_are_found_by_level_and_title(sections):
+    procedure = sections.get(3, "PROCEDURE")
+    assert procedure.title == "8. Procedure"
+    # The section spans its subsections, until the next heading of the same or higher level
+    assert [node.text for node in sections.content(procedure) if node.name == "h4"] == ["8.1. First step", "8.2. Second step"]
+    assert "Second procedure." not in [node.text for node in sections.content(procedure)]
+    assert sections.get(2, "Procedure") is None
+
+def test_sections_are_found_by_the_text_of_their_title(sections):
+    # As the CSS selector 'h3:contains(...)': the first section of the level whose title contains the text (case-sensitive)
+    assert sections.find_containing(3, "Roles and Responsibilities").title == "3. Roles and Responsibilities of the DAC"
+    assert sections.find_containing(3, "Procedure").title == "8. Procedure"
+    assert sections.find_containing(4, "step").title == "8.1. First step"
+    assert sections.find_containing(3, "procedure") is None
+    assert sections.find_containing(2, "Roles") is None
@@ -0,0 +1,214 @@
+import io
+import argparse
+import os
+import json
+import time
+import shutil
+import multiprocessing
+import pytest
+
+import sop_linter
+from sop_linter import SOPLinter, NDJSONReporter, lint_in_parallel, add_arguments, run_linter, select_rules, watch, RULES
+from rule_profiler import RuleProfiler
+from utils import ParsedSOP
+
+TEMPLATE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "GDI-SOP0000_sop-template-for-linting.md")
+CHARTER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "docs", "GDI-SOP_charter.md")
+REQUIRED_SECTIONS = {"### Roles and Responsibilities": (3, "Roles and Responsibilities"), "### Procedure": (3, "Procedure")}
+
+def lint_section_heading(tmp_path, heading: str, rule: str):
+    """
+    Lints the template for linting with a different heading of its 'Roles and Responsibilities' section.
+    """
+    with open(TEMPLATE_PATH, 'r') as file:
+        content = file.read().replace("### 3. Roles and Responsibilities\n", f"{heading}\n")
+    file_path = str(tmp_path / "GDI-SOP0000_sop-template-for-linting.md")
+    with open(file_path, 'w') as file:
+        file.write(content)
+    linter = SOPLinter(required_sections=REQUIRED_SECTIONS, rules=[rule])
+    linter.lint_sop(file_path)
+    return linter.results[file_path]["errors"]
+
+@pytest.mark.parametrize("rule", ["required-sections", "non-empty-sections"])
+def test_required_sections_are_found_by_the_text_of_their_title(tmp_path, rule):
+    # As with the selector 'h3:contains(...)', the title only needs to contain the text of the required section
+    assert lint_section_heading(tmp_path, "### 3. Roles and Responsibilities of the DAC", rule) == []
+
+def test_required_sections_are_missing_with_other_titles(tmp_path):
+    assert lint_section_heading(tmp_path, "### 3. Roles", "required-sections") == ["Required section '### Roles and Responsibilities' is missing."]
+    assert lint_section_heading(tmp_path, "#### 3. Roles and Responsibilities", "required-sections") == ["Required section '### Roles and Responsibilities' is missing."]
+
+def lint_with_arguments(tmp_path, *arguments: str):
+    """
+    Lints a copy of the template for linting with a title that does not match its filename (an error of 'title-match')
+    and an undefined acronym (a warning of 'undefined-acronyms'), with the given command-line arguments.
+    """
+    with open(TEMPLATE_PATH, 'r') as file:
+        content = file.read().replace("# European GDI", "# Other title - European GDI", 1) + "\nThe XYZW committee.\n"
+    file_path = str(tmp_path / "GDI-SOP0000_sop-template-for-linting.md")
+    with open(file_path, 'w') as file:
+        file.write(content)
+    args = add_arguments(argparse.ArgumentParser()).parse_args([file_path, "-j", "1", *arguments])
+    report, _ = run_linter(args)
+    return json.loads(report)[file_path]
+
+def test_rules_are_selected_in_their_running_order():
+    assert select_rules(["undefined-acronyms", "title"]) == ["title", "undefined-acronyms"]
+    assert select_rules(skip_rules=["title"]) == [rule_id for rule_id in RULES if rule_id != "title"]
+    assert select_rules(["title", "title-match"], skip_rules=["title"]) == ["title-match"]
+    with pytest.raises(ValueError, match="Unknown linting rules: \\['no-such-rule'\\]"):
+        select_rules(["title", "no-such-rule"])
+
+def test_issues_of_the_selected_rules_take_their_severity(tmp_path):
+    results = lint_with_arguments(tmp_path, "--rules", "title-match,undefined-acronyms")
+    assert [issue.split(" ")[0] for issue in results["errors"]] == ["Title"]
+    assert results["warnings"] == ["Undefined acronym detected: 'XYZW' is used in the SOP but is not defined in the SOP glossary."]
+
+    results = lint_with_arguments(tmp_path, "--rules", "title-match,undefined-acronyms", "--skip-rules", "title-match")
+    assert results == {"errors": [], "warnings": ["Undefined acronym detected: 'XYZW' is used in the SOP but is not defined in the SOP glossary."]}
+
+    # Linting strictly, warnings are errors
+    results = lint_with_arguments(tmp_path, "--rules", "undefined-acronyms", "--strict")
+    assert results == {"errors": ["Undefined acronym detected: 'XYZW' is used in the SOP but is not defined in the SOP glossary."], "warnings": []}
+
+def test_files_stuck_in_a_worker_time_out(tmp_path, monkeypatch):
+    # Fork: the workers keep this rule, which never ends on the stuck file
+    file_paths = [str(tmp_path / f"GDI-SOP000{i}_sop-template-for-linting.md") for i in range(1, 4)]
+    for file_path in file_paths:
+        with open(TEMPLATE_PATH, 'r') as template, open(file_path, 'w') as file:
+            file.write(template.read())
+    # The last file has an issue of its own
+    with open(TEMPLATE_PATH, 'r') as template, open(file_paths[2], 'w') as file:
+        file.write(template.read().replace("# European GDI", "# Other title - European GDI", 1))
+    stuck_path = file_paths[1]
+    check_title_match = SOPLinter.lr_check_title_match
+    monkeypatch.setattr(SOPLinter, "lr_check_title_match", lambda self, sop, file_path: time.sleep(3600) if file_path == stuck_path else check_title_match(self, sop, file_path))
+
+    linter = SOPLinter(rules=["title-match"])
+    start = time.monotonic()
+    lint_in_parallel(linter, file_paths, jobs=2, timeout=1)
+
+    assert time.monotonic() - start < 10
+    assert linter.results[stuck_path]["errors"] == ["Linting timed out after 1 seconds. Some linting rule could not handle the content of this SOP."]
+    # The other files, including the ones running along with the stuck one, still have their own results, in input order
+    assert list(linter.results) == file_paths
+    assert linter.results[file_paths[0]] == {"errors": [], "warnings": []}
+    assert len(linter.results[file_paths[2]]["errors"]) == 1 and linter.results[file_paths[2]]["errors"][0].startswith("Title within the document")
+    assert multiprocessing.active_children() == []
+
+@pytest.mark.parametrize("output_format", ["json", "ndjson"])
+def test_profile_is_reported_apart_from_the_files(tmp_path, monkeypatch, output_format):
+    # A file path can't collide with the profile
+    monkeypatch.chdir(tmp_path)
+    file_path = "profile"
+    with open(TEMPLATE_PATH, 'r') as template, open(file_path, 'w') as file:
+        file.write(template.read())
+    stream = io.StringIO()
+    linter = SOPLinter(required_sections=REQUIRED_SECTIONS, rules=["required-sections"], profiler=RuleProfiler(), reporter=NDJSONReporter(stream) if output_format == "ndjson" else None)
+    linter.lint_sop(file_path)
+    report, _ = linter.generate_report()
+
+    if output_format == "json":
+        report = json.loads(report)
+        assert list(report) == ["files", "profile"]
+        assert list(report["files"]) == [file_path] and "rules" in report["profile"]
+    else:
+        records = [json.loads(line) for line in stream.getvalue().splitlines()]
+        assert [record["type"] for record in records] == ["file", "profile", "summary"]
+        assert records[0]["file"] == file_path and "rules" in records[1]["profile"] and "profile" not in records[2]
+
+def test_remote_links_are_collected_without_rendering_the_sops(tmp_path, monkeypatch):
+    file_path = str(tmp_path / "GDI-SOP0000_sop-template-for-linting.md")
+    with open(TEMPLATE_PATH, 'r') as template, open(file_path, 'w') as file:
+        file.write(template.read() + "\nSee [GDI-SOP0001](https://github.com/GenomicDataInfrastructure/standard-operating-procedures/blob/main/README.md).\n")
+    monkeypatch.setattr(ParsedSOP, "soup", property(lambda self: pytest.fail("The SOP was rendered")))
+
+    class LinkChecker:
+        def check(self, links):
+            self.links = links
+
+    linter = SOPLinter(link_checker=LinkChecker())
+    linter.check_remote_links([file_path])
+
+    assert linter.link_checker.links[-1] == "https://github.com/GenomicDataInfrastructure/standard-operating-procedures/blob/main/README.md"
+    # The SOPs are linted afterwards (e.g., by worker processes), so they are not kept in memory
+    assert linter.sops == {}
+
+@pytest.mark.parametrize("jobs", ["1", "2"])
+def test_ndjson_output_only_has_records(tmp_path, capsys, jobs):
+    file_paths = [str(tmp_path / f"GDI-SOP000{i}_sop-template-for-linting.md") for i in range(1, 3)]
+    for file_path in file_paths:
+        with open(TEMPLATE_PATH, 'r') as template, open(file_path, 'w') as file:
+            file.write(template.read())
+    args = add_arguments(argparse.ArgumentParser()).parse_args(file_paths + ["-v", "2", "-j", jobs, "--rules", "title-match", "--output-format", "ndjson"])
+
+    run_linter(args)
+
+    # The progress of each file (verbosity 2) goes to the standard error
+    output = capsys.readouterr()
+    records = [json.loads(line) for line in output.out.splitlines()]
+    assert [record["type"] for record in records] == ["file", "file", "summary"]
+    assert all(f"- Finished linting for {file_path}" in output.err for file_path in file_paths)
+
+def test_watch_relints_only_the_sops_affected_by_each_change(tmp_path, monkeypatch, capsys):
+    os.makedirs(tmp_path / ".git")
+    os.makedirs(tmp_path / "docs")
+    charter_path = shutil.copy(CHARTER_PATH, tmp_path / "docs" / "GDI-SOP_charter.md")
+    sops_dir = tmp_path / "sops"
+    os.makedirs(sops_dir)
+    file_paths = [str(sops_dir / f"GDI-SOP000{i}_sop-template-for-linting.md") for i in range(1, 4)]
+    with open(TEMPLATE_PATH, 'r') as template:
+        content = template.read()
+    for file_path in file_paths:
+        with open(file_path, 'w') as file:
+            file.write(content)
+    # The second SOP links to the first one
+    with open(file_paths[1], 'a') as file:
+        file.write("\nSee [GDI-SOP0001](./GDI-SOP0001_sop-template-for-linting.md).\n")
+
+    def append(file_path: str, text: str):
+        with open(file_path, 'a') as file:
+            file.write(text)
+
+    changes = [
+        lambda: append(file_paths[0], "\nThe XYZW committee.\n") or {file_paths[0]},
+        lambda: append(file_paths[2], "\nMore text.\n") or {file_paths[2]},
+        lambda: append(charter_path, "\nMore text.\n") or {charter_path},
+        lambda: append(file_paths[0], "\nSee [GDI-SOP0002](./GDI-SOP0002_sop-template-for-linting.md).\n") or {file_paths[0]},
+        lambda: shutil.copy(TEMPLATE_PATH, file_paths[0]) and {file_paths[0]},
+    ]
+
+    class ScriptedWatcher:
+        """
+        Makes one of the changes on each wait, and stops the watch (as Ctrl+C) once all of them were made.
+        """
+        def __init__(self, paths, interval):
+            self.paths = paths
+
+        def wait(self):
+            if not changes:
+                raise KeyboardInterrupt
+            return {os.path.abspath(path) for path in changes.pop(0)()}
+
+    monkeypatch.setattr(sop_linter, "PollingWatcher", ScriptedWatcher)
+    linter = SOPLinter(rules=["undefined-acronyms"])
+    linted_files = []
+    lint_sop = linter.lint_sop
+    monkeypatch.setattr(linter, "lint_sop", lambda file_path, *args, **kwargs: linted_files.append(file_path) or lint_sop(file_path, *args, **kwargs))
+
+    watch(linter, [str(sops_dir)], file_paths, [str(sops_dir), str(tmp_path / "docs")], interval=0)
+
+    # The first SOP and the one linking to it, the third SOP alone, all of them once the Charter changed, and then
+    # both SOPs linking to each other
+    rounds = [file_paths, file_paths[:2], file_paths[2:], file_paths, file_paths[:2], file_paths[:2]]
+    assert len(linted_files) == sum(len(files) for files in rounds)
+    for files in rounds:
+        assert sorted(linted_files[:len(files)]) == files
+        del linted_files[:len(files)]
+
+    # Each issue is printed when it is added and when it is fixed, but not while it stays
+    output = capsys.readouterr().out
+    acronym_warning = "warning: Undefined acronym detected: 'XYZW' is used in the SOP but is not defined in the SOP glossary."
+    assert output.count(f"+ {acronym_warning}") == 1 and output.count(f"- {acronym_warning}") == 1
+    assert output.index(f"+ {acronym_warning}") < output.index(f"- {acronym_warning}")
+    assert output.count("Linted '") == len(rounds)